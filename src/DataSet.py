@@ -1,100 +1,555 @@
 import os
+import io
+import sys
+import gzip
 import zipfile
 import csv
+import tracemalloc
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from operator import itemgetter
 from pathlib import Path
 
+import pandas as pd
 
-def dataset_indi_hogares(zip_individuos, zip_hogares):
-    """Leo todos los archivos individuos.txt dentro de los zips por cada año-trimestre
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src import almacen_columnar, esquema, manifiesto, publicacion, rendimiento
+from src.registro import Encabezado, Registro, leer_registros
+from utils.constantes import MEDIR_MEMORIA_INGESTA
+
+# Entidad a la que corresponde cada txt de los zips
+ENTIDADES = {"usu_individual": "individuos", "usu_hogar": "hogares"}
+PREFIJOS = {entidad: prefijo for prefijo, entidad in ENTIDADES.items()}
+# Csv consolidado de cada txt de los zips
+CSV_POR_PREFIJO = {"usu_individual": "IndividuosTotal", "usu_hogar": "HogaresTotal"}
+
+# Buffer de escritura de los csv y cantidad de filas que se mandan juntas al writer
+BUFFER_ESCRITURA = 1 << 20
+FILAS_POR_BLOQUE = 20_000
+
+
+def leer_txt_zip(all_txt, nombre_txt):
+    """Genera las filas de un txt dentro del zip sin cargarlo entero en memoria.
+        El archivo se decodifica de a partes con un TextIOWrapper en lugar de
+        hacer .read().decode() sobre todo el contenido. Cada fila es un Registro (se usa
+        como un diccionario pero comparte los nombres de columnas con el resto del txt).
+
+    Args:
+        all_txt (zipfile.ZipFile): zip ya abierto
+        nombre_txt (str): nombre del txt dentro del zip
+
+    Yields:
+        Registro: una fila del txt
+    """
+    with all_txt.open(nombre_txt) as binario:
+        texto = io.TextIOWrapper(binario, encoding="utf-8", newline="")
+        yield from leer_registros(csv.reader(texto, delimiter=";"))
+
+
+def buscar_txt(all_txt, prefijo):
+    """Devuelve los nombres de los txt del zip cuyo nombre contiene el prefijo (usu_individual o usu_hogar)"""
+    return [
+        nombre_txt
+        for nombre_txt in all_txt.namelist()
+        if prefijo in nombre_txt.lower() and nombre_txt.endswith(".txt")
+    ]
+
+
+def periodo_zip(zip_path, prefijo):
+    """Devuelve la tupla (año, trimestre) de un zip leyendo solo la primera fila de su txt.
+        Si el zip no tiene un txt con el prefijo devuelve None."""
+    with zipfile.ZipFile(zip_path) as all_txt:
+        for nombre_txt in buscar_txt(all_txt, prefijo):
+            for fila in leer_txt_zip(all_txt, nombre_txt):
+                return int(fila["ANO4"]), int(fila["TRIMESTRE"])
+    return None
+
+
+def periodos_de_zips(zip_folder, prefijo):
+    """Devuelve la lista de (periodo, ruta) de los zips de la carpeta que tienen un txt con el
+        prefijo, ordenada por (año, trimestre)"""
+    zips = []
+    for file in os.listdir(zip_folder):
+        if file.endswith(".zip"):
+            zip_path = Path(zip_folder) / file
+            periodo = periodo_zip(zip_path, prefijo)
+            if periodo is not None:
+                zips.append((periodo, file, zip_path))
+    return [(periodo, zip_path) for periodo, _, zip_path in sorted(zips)]
+
+
+def zips_por_periodo(zip_folder, prefijo):
+    """Devuelve las rutas de los zips de la carpeta ordenadas por (año, trimestre),
+        asi la carga serial y la paralela generan las filas en el mismo orden."""
+    return [zip_path for _, zip_path in periodos_de_zips(zip_folder, prefijo)]
+
+
+def valores_aceptados(valor):
+    """Textos con los que se compara una condicion: un valor o una lista de valores"""
+    if isinstance(valor, (list, tuple, set, frozenset)):
+        return {str(v) for v in valor}
+    return {str(valor)}
+
+
+def filtrar_txt(all_txt, nombre_txt, columnas=None, aceptados=None):
+    """Genera las filas de un txt del zip que cumplen las condiciones, solo con las columnas
+        pedidas. Las condiciones se revisan sobre la linea ya separada, antes de armar la fila,
+        y solo se arman los valores de las columnas pedidas.
+
+    Args:
+        columnas (list): columnas a devolver, None para todas
+        aceptados (dict): {columna: conjunto de textos aceptados}
+
+    Yields:
+        Registro: una fila con las columnas pedidas (None en las que el txt no tiene)
+    """
+    with all_txt.open(nombre_txt) as binario:
+        reader = csv.reader(io.TextIOWrapper(binario, encoding="utf-8", newline=""), delimiter=";")
+        nombres = next(reader, None)
+        if nombres is None:
+            return
+        posicion = {nombre: i for i, nombre in enumerate(nombres) if nombre}
+        salida = list(posicion) if columnas is None else list(columnas)
+        filtros = [(posicion.get(columna), valores) for columna, valores in (aceptados or {}).items()]
+        if any(i is None for i, _ in filtros):
+            return  # el txt no tiene la columna de una condicion: ninguna fila la cumple
+        indices = [posicion.get(columna) for columna in salida]
+        encabezado = Encabezado(salida)
+        for fila in reader:
+            if not fila:
+                continue
+            if any(i >= len(fila) or fila[i] not in valores for i, valores in filtros):
+                continue
+            yield Registro(encabezado, [fila[i] if i is not None and i < len(fila) else None for i in indices])
+
+
+def iterar_filas(zip_folder, entidad, periodos=None, columnas=None, condiciones=None):
+    """Consulta los zips directamente, sin armar los csv consolidados: abre solo los zips de
+        los periodos pedidos y genera de a una las filas que cumplen las condiciones, con las
+        columnas pedidas. Sirve para preguntas puntuales sobre algunos trimestres.
+        Las columnas son las del txt original (sin las que agrega src/funciones) y los valores
+        quedan como texto, igual que en el txt.
+
+    Args:
+        zip_folder (carpeta): donde estan los archivos zip
+        entidad (str): "individuos" o "hogares"
+        periodos (list[tuple]): (año, trimestre) a leer, None para todos
+        columnas (list): columnas a devolver, None para todas
+        condiciones (dict): {columna: valor o lista de valores} que deben cumplir las filas;
+            se compara como texto (ej. {"AGLOMERADO": 32, "CH04": [1, 2]})
+
+    Yields:
+        Registro: una fila con las columnas pedidas, en orden de (año, trimestre)
+
+    Ejemplo:
+        for fila in iterar_filas(DATA_PATH, "individuos", periodos=[(2024, 1)],
+                                 columnas=["CH06", "PONDERA"], condiciones={"AGLOMERADO": 32}):
+            ...
+    """
+    prefijo = PREFIJOS[entidad]
+    buscados = None if periodos is None else {tuple(map(int, periodo)) for periodo in periodos}
+    aceptados = {columna: valores_aceptados(valor) for columna, valor in (condiciones or {}).items()}
+    for periodo, zip_path in periodos_de_zips(zip_folder, prefijo):
+        if buscados is not None and periodo not in buscados:
+            continue
+        with zipfile.ZipFile(zip_path) as all_txt:
+            for nombre_txt in buscar_txt(all_txt, prefijo):
+                yield from filtrar_txt(all_txt, nombre_txt, columnas, aceptados)
+
+
+def cargar_zip_entidades(zip_path, prefijos):
+    """Abre el zip una sola vez y carga las filas de los txt de cada prefijo.
+        Se usa como tarea de cada proceso en la carga paralela.
+
+    Returns:
+        dict: {prefijo: lista de filas}
+    """
+    cargadas = {}
+    with zipfile.ZipFile(zip_path) as all_txt:
+        for prefijo in prefijos:
+            filas = []
+            for nombre_txt in buscar_txt(all_txt, prefijo):
+                filas.extend(leer_txt_zip(all_txt, nombre_txt))
+            cargadas[prefijo] = filas
+    return cargadas
+
+
+def cargar_zip(zip_path, prefijo):
+    """Carga en una lista todas las filas de un zip (un año-trimestre)"""
+    return cargar_zip_entidades(zip_path, [prefijo])[prefijo]
+
+
+def iterar_registros(zip_folder, prefijo, medir_memoria=MEDIR_MEMORIA_INGESTA):
+    """Recorre los zips de la carpeta en orden de (año, trimestre) y genera de a una las filas
+        de los txt cuyo nombre contiene el prefijo (usu_individual o usu_hogar). Cada zip es un
+        año-trimestre; si se mide la memoria, al terminar cada uno se informa la cantidad de
+        registros y el pico de memoria.
+
+    Args:
+        zip_folder (carpeta): donde estan los archivos zip
+        prefijo (str): "usu_individual" o "usu_hogar"
+        medir_memoria (bool): si es True mide el pico de memoria de cada trimestre con tracemalloc
+            (hace la lectura varias veces mas lenta, ver MEDIR_MEMORIA_INGESTA)
+
+    Yields:
+        dict: una fila de individuos u hogares
+    """
+    iniciar_medicion = medir_memoria and not tracemalloc.is_tracing()
+    if iniciar_medicion:
+        tracemalloc.start()
+    try:
+        for zip_path in zips_por_periodo(zip_folder, prefijo):
+            with zipfile.ZipFile(zip_path) as all_txt:
+                for nombre_txt in buscar_txt(all_txt, prefijo):
+                    if medir_memoria:
+                        tracemalloc.reset_peak()
+                    cantidad = 0
+                    for fila in leer_txt_zip(all_txt, nombre_txt):
+                        cantidad += 1
+                        yield fila
+                    if medir_memoria:
+                        pico = tracemalloc.get_traced_memory()[1]
+                        print(f"📊 {zip_path.name}: {cantidad} registros, pico de memoria {pico / 1024 ** 2:.1f} MB")
+    finally:
+        if iniciar_medicion:
+            tracemalloc.stop()
+
+
+def iterar_zips_entidades(zips, prefijos, procesos=1):
+    """Genera, en el orden de la lista, un diccionario {prefijo: filas} por zip, abriendo cada
+        zip una sola vez. prefijos tiene la lista de prefijos a leer de cada zip. Si procesos
+        es mayor a 1 cada zip se carga en un proceso distinto. Cada zip se entrega apenas esta
+        listo, asi un error en uno no hace perder los anteriores."""
+    if procesos <= 1 or len(zips) <= 1:
+        cargados = (rendimiento.medir_funcion(cargar_zip_entidades, zip_path, lista) for zip_path, lista in zip(zips, prefijos))
+        yield from medir_carga(cargados)
+        return
+    with ProcessPoolExecutor(max_workers=procesos) as executor:
+        yield from medir_carga(cargar_adelantados(executor, zips, prefijos, procesos))
+
+
+def cargar_adelantados(executor, zips, prefijos, adelantados):
+    """Entrega el resultado de cargar cada zip en el orden de la lista, con a lo sumo
+        adelantados zips cargandose (o ya cargados) por delante del que se esta usando, asi no
+        se acumulan en memoria las filas de zips que todavia no se procesaron. Cada proceso
+        mide su carga y la medicion se suma despues (ver src/rendimiento.py)."""
+    tareas = deque()
+    for zip_path, lista in zip(zips, prefijos):
+        if len(tareas) >= adelantados:
+            yield tareas.popleft().result()
+        tareas.append(executor.submit(rendimiento.medir_funcion, cargar_zip_entidades, zip_path, lista))
+    while tareas:
+        yield tareas.popleft().result()
+
+
+def medir_carga(cargados):
+    """Suma al informe de rendimiento la medicion de cada zip cargado y entrega sus filas"""
+    for filas, medicion in cargados:
+        medicion["filas"] = sum(len(filas_prefijo) for filas_prefijo in filas.values())
+        rendimiento.agregar("leer_zip", None, medicion)
+        yield filas
+
+
+def cargar_zips_entidades(zips, prefijos, procesos=1):
+    """Carga cada zip de la lista abriendolo una sola vez y devuelve, en el mismo orden,
+        un diccionario {prefijo: filas} por zip (ver iterar_zips_entidades)."""
+    return list(iterar_zips_entidades(zips, prefijos, procesos))
+
+
+def cargar_zips(zips, prefijo, procesos=1):
+    """Carga cada zip de la lista y devuelve una lista de filas por zip, en el mismo orden.
+        Si procesos es mayor a 1 cada zip se carga en un proceso distinto."""
+    cargadas = cargar_zips_entidades(zips, [[prefijo]] * len(zips), procesos)
+    return [filas[prefijo] for filas in cargadas]
+
+
+def cargar_en_paralelo(zip_folder, prefijo, procesos):
+    """Carga cada zip (un año-trimestre) en un proceso distinto y une los resultados
+        en orden de (año, trimestre), igual que la carga serial.
+
+    Args:
+        zip_folder (carpeta): donde estan los archivos zip
+        prefijo (str): "usu_individual" o "usu_hogar"
+        procesos (int): cantidad de procesos a usar
+
+    Returns:
+        list[dict]: las filas de todos los zips
+    """
+    registros = []
+    for filas in cargar_zips(zips_por_periodo(zip_folder, prefijo), prefijo, procesos):
+        registros.extend(filas)
+    return registros
+
+
+def encabezado_txt(all_txt, nombre_txt):
+    """Devuelve los nombres de columna de un txt del zip leyendo solo su primera linea"""
+    with all_txt.open(nombre_txt) as binario:
+        linea = binario.readline().decode("utf-8").rstrip("\r\n")
+    return next(csv.reader([linea], delimiter=";"))
+
+
+def leer_txt_zip_dataframe(all_txt, nombre_txt, entidad, columnas=None, motor="c"):
+    """Lee un txt del zip directo con el parser de pandas, sin pasar por diccionarios,
+        y devuelve un DataFrame con los tipos del esquema.
+
+    Args:
+        all_txt (zipfile.ZipFile): zip ya abierto
+        nombre_txt (str): nombre del txt dentro del zip
+        entidad (str): "individuos" o "hogares"
+        columnas (list): columnas a leer, None para todas
+        motor (str): "c" (parser de pandas) o "pyarrow" (parser multihilo, si esta instalado)
+    """
+    encabezado = encabezado_txt(all_txt, nombre_txt)
+    # La columna sin nombre que deja el ; final de cada linea no se lee
+    usar = [columna for columna in encabezado if columna and (columnas is None or columna in columnas)]
+    # Se lee sin indicar tipos (pasarle dtype al parser lo hace bastante mas lento) y despues
+    # se convierte cada columna con el esquema
+    with all_txt.open(nombre_txt) as binario:
+        if motor == "pyarrow" and almacen_columnar.PARQUET_DISPONIBLE:
+            df = pd.read_csv(binario, sep=";", engine="pyarrow", usecols=usar)
+        else:
+            df = pd.read_csv(binario, sep=";", usecols=usar, low_memory=False)
+    return esquema.aplicar_esquema(df, entidad)
+
+
+def cargar_zip_dataframe(zip_path, prefijo, columnas=None, motor="c"):
+    """Carga en un DataFrame los txt de un zip (un año-trimestre) cuyo nombre contiene el prefijo.
+        Se usa como tarea de cada proceso en la carga paralela."""
+    entidad = ENTIDADES[prefijo]
+    with zipfile.ZipFile(zip_path) as all_txt:
+        partes = [
+            leer_txt_zip_dataframe(all_txt, nombre_txt, entidad, columnas, motor)
+            for nombre_txt in buscar_txt(all_txt, prefijo)
+        ]
+    if not partes:
+        return pd.DataFrame()
+    return pd.concat(partes, ignore_index=True) if len(partes) > 1 else partes[0]
+
+
+def dataset_dataframe(zip_folder, prefijo, columnas=None, motor="c", procesos=1):
+    """Carga los zips de la carpeta en un DataFrame con los tipos del esquema, leyendo cada txt
+        directo con el parser de pandas (un DataFrame por trimestre que despues se concatenan
+        en orden de año y trimestre). Las columnas quedan como en los zips, sin la limpieza ni
+        las columnas que agrega src/procesamiento.py.
+
+    Args:
+        zip_folder (carpeta): donde estan los archivos zip
+        prefijo (str): "usu_individual" o "usu_hogar"
+        columnas (list): columnas a leer, None para todas
+        motor (str): "c" o "pyarrow"
+        procesos (int): si es mayor a 1 cada zip se carga en un proceso distinto
+
+    Returns:
+        pandas.DataFrame: las filas de todos los trimestres
+    """
+    zips = zips_por_periodo(zip_folder, prefijo)
+    if procesos <= 1 or len(zips) <= 1:
+        partes = [cargar_zip_dataframe(zip_path, prefijo, columnas, motor) for zip_path in zips]
+    else:
+        with ProcessPoolExecutor(max_workers=procesos) as executor:
+            cantidad = len(zips)
+            partes = list(executor.map(cargar_zip_dataframe, zips, [prefijo] * cantidad, [columnas] * cantidad, [motor] * cantidad))
+    if not partes:
+        return pd.DataFrame()
+    # Las categorias de cada trimestre pueden ser distintas y concat las deja como texto
+    df = esquema.aplicar_esquema(pd.concat(partes, ignore_index=True), ENTIDADES[prefijo])
+    print(f"✅ Se cargaron {len(df)} registros de {ENTIDADES[prefijo]}.")
+    return df
+
+
+def dataset_indi_hogares(zip_individuos, zip_hogares, streaming=False, procesos=1, motor="dict"):
+    """Leo todos los archivos individuos.txt (u hogares.txt) dentro de los zips por cada año-trimestre
         para luego guardarlos en la lista de diccionarios.
 
     Args:
-        zip_folder (carpeta): donde estan los archivos zip que dentro tiene un txt de individuos y de hogares
+        zip_individuos (carpeta): donde estan los zips, si se quieren cargar los individuos (sino None)
+        zip_hogares (carpeta): donde estan los zips, si se quieren cargar los hogares (sino None)
+        streaming (bool): si es True no se arma la lista, se devuelve un generador que va
+            leyendo las filas a medida que se consumen (con MEDIR_MEMORIA_INGESTA tambien informa
+            el pico de memoria por trimestre).
+        procesos (int): si es mayor a 1 cada zip se carga en un proceso distinto (no se usa con streaming).
+            El resultado es el mismo que en la carga serial.
+        motor (str): "dict" arma la lista de diccionarios; "c" o "pyarrow" leen cada txt directo
+            con el parser de pandas y devuelven un DataFrame con los tipos del esquema
+            (ver dataset_dataframe).
 
     Returns:
-        all_individuals: devuelve la lista de diccionarios con todos los datos de individuos de cada año-trimestre cargados.
+        list[dict] | generador | pandas.DataFrame: los datos de individuos u hogares de cada año-trimestre.
     """
+    if motor != "dict":
+        if zip_individuos is not None:
+            return dataset_dataframe(zip_individuos, "usu_individual", motor=motor, procesos=procesos)
+        if zip_hogares is not None:
+            return dataset_dataframe(zip_hogares, "usu_hogar", motor=motor, procesos=procesos)
+
     if zip_individuos is not None:
-        all_individuals = []
-        for file in os.listdir(zip_individuos):
-            if file.endswith(".zip"):
-                zip_path = zip_individuos / file
-                with zipfile.ZipFile(zip_path) as all_txt:
-                    for zips_individuals in all_txt.namelist():
-                        if (
-                            "usu_individual" in zips_individuals.lower()
-                            and zips_individuals.endswith(".txt")
-                        ):
-                            with all_txt.open(zips_individuals) as txt_individuals:
-                                reader = csv.DictReader(
-                                    txt_individuals.read().decode("utf-8").splitlines(),
-                                    delimiter=";",
-                                )
-                                all_individuals.extend(reader)
+        if streaming:
+            return iterar_registros(zip_individuos, "usu_individual")
+        if procesos > 1:
+            all_individuals = cargar_en_paralelo(zip_individuos, "usu_individual", procesos)
+        else:
+            all_individuals = list(iterar_registros(zip_individuos, "usu_individual", medir_memoria=False))
         # Verificación
         print(f"✅ Se cargaron {len(all_individuals)} registros de individuos.")
         return all_individuals
 
     if zip_hogares is not None:
-        all_hogares = []
-        for file in os.listdir(zip_hogares):
-            if file.endswith(".zip"):
-                zip_path = zip_hogares / file
-                with zipfile.ZipFile(zip_path) as all_txt:
-                    for zips_hogares in all_txt.namelist():
-                        if "usu_hogar" in zips_hogares.lower() and zips_hogares.endswith(
-                            ".txt"
-                        ):
-                            with all_txt.open(zips_hogares) as txt_hogares:
-                                reader = csv.DictReader(
-                                    txt_hogares.read().decode("utf-8").splitlines(),
-                                    delimiter=";",
-                                )
-                                all_hogares.extend(reader)
+        if streaming:
+            return iterar_registros(zip_hogares, "usu_hogar")
+        if procesos > 1:
+            all_hogares = cargar_en_paralelo(zip_hogares, "usu_hogar", procesos)
+        else:
+            all_hogares = list(iterar_registros(zip_hogares, "usu_hogar", medir_memoria=False))
         # Verificación
         print(f"✅ Se cargaron {len(all_hogares)} registros de hogares.")
         return all_hogares
-    
-# RECIBO LA LISTA DE DICCIONARIOS Y CREO UN ARCHIVO CSV CON ESOS DATOS EN CARPETA DATA
-def guardar_como_csv(nombre_archivo, lista_diccionarios, delimitador=";"):
-    if not lista_diccionarios:
+
+def ruta_csv(nombre_archivo, comprimir=False):
+    """Devuelve la ruta del csv consolidado dentro de la carpeta utils"""
+    extension = ".csv.gz" if comprimir else ".csv"
+    return Path(__file__).resolve().parent.parent / "utils" / f"{nombre_archivo}{extension}"
+
+
+def abrir_csv(ruta, modo="r"):
+    """Abre un csv en modo texto, comprimido con gzip si la ruta termina en .gz"""
+    if str(ruta).endswith(".gz"):
+        return gzip.open(ruta, modo + "t", compresslevel=6, encoding="utf-8", newline="")
+    return open(ruta, mode=modo, newline="", encoding="utf-8", buffering=BUFFER_ESCRITURA)
+
+
+def ruta_temporal(ruta, etiqueta="tmp"):
+    """Archivo temporal junto al csv, con la misma extension para que se comprima igual"""
+    ruta = Path(ruta)
+    return ruta.with_name(f".{etiqueta}_{ruta.name}")
+
+
+def columnas_de(grupos):
+    """Columnas de las filas nuevas, en el orden del esquema. Las filas de un mismo zip tienen
+        todas las mismas claves, asi que alcanza con mirar la primera de cada grupo (si son
+        Registro, su encabezado ya tiene todas las claves que se agregaron en el grupo)."""
+    return esquema.orden_columnas(chain.from_iterable(claves_grupo(filas) for filas in grupos if filas))
+
+
+def claves_grupo(filas):
+    """Claves de la primera fila del grupo o, si es un Registro, las de su encabezado"""
+    if filas[0].__class__ is Registro:
+        return filas[0].encabezado.columnas
+    return filas[0].keys()
+
+
+def escribir_filas(destino, filas, columnas, delimitador=";", numero_inicial=0):
+    """Escribe las filas (diccionarios o Registro) en el archivo abierto, en el orden de columnas y de a
+        bloques de FILAS_POR_BLOQUE. Las claves que falten se escriben vacias.
+
+    Returns:
+        dict: {numero de fila: {columna: valor}} con los valores de columnas que no estaban en
+            el encabezado (normalmente vacio)
+    """
+    writer = csv.writer(destino, delimiter=delimitador)
+    obtener = itemgetter(*columnas) if len(columnas) > 1 else (lambda fila: (fila[columnas[0]],))
+    cantidad = len(columnas)
+    conocidas = set(columnas)
+    sobrantes = {}
+    bloque = []
+    # Para los Registro se toman los valores por posicion, con un selector por encabezado
+    selectores = {}
+    for numero, fila in enumerate(filas, numero_inicial):
+        valores = None
+        if fila.__class__ is Registro:
+            # Si el encabezado tiene justo las columnas del csv, las que le falten a la fila
+            # son las ultimas y se escriben vacias
+            if not fila.ausentes and len(fila.encabezado) == cantidad:
+                selector = selectores.get(fila.encabezado, False)
+                if selector is False:
+                    selector = selectores[fila.encabezado] = fila.encabezado.selector(columnas)
+                if selector is not None:
+                    faltan = cantidad - len(fila.valores)
+                    valores = selector(fila.valores + [""] * faltan if faltan else fila.valores)
+        elif len(fila) == cantidad:
+            try:
+                valores = obtener(fila)
+            except KeyError:
+                pass
+        if valores is None:
+            valores = tuple(fila.get(columna, "") for columna in columnas)
+            extra = {clave: valor for clave, valor in fila.items() if clave not in conocidas}
+            if extra:
+                sobrantes[numero] = extra
+        bloque.append(valores)
+        if len(bloque) >= FILAS_POR_BLOQUE:
+            writer.writerows(bloque)
+            bloque.clear()
+    writer.writerows(bloque)
+    return sobrantes
+
+
+def agregar_columnas_sobrantes(ruta, columnas, sobrantes, delimitador=";"):
+    """Reescribe el csv sumando al encabezado las columnas que aparecieron en algunas filas
+        despues de escribirlo, con sus valores."""
+    nuevas = esquema.orden_columnas(chain(columnas, *(extra.keys() for extra in sobrantes.values())))
+    posicion = {columna: i for i, columna in enumerate(columnas)}
+    temporal = ruta_temporal(ruta, "columnas")
+    with abrir_csv(ruta) as origen, abrir_csv(temporal, "w") as destino:
+        reader = csv.reader(origen, delimiter=delimitador)
+        writer = csv.writer(destino, delimiter=delimitador)
+        next(reader)
+        writer.writerow(nuevas)
+        for numero, valores in enumerate(reader):
+            extra = sobrantes.get(numero, {})
+            writer.writerow([
+                valores[posicion[columna]] if columna in posicion else extra.get(columna, "")
+                for columna in nuevas
+            ])
+    os.replace(temporal, ruta)
+
+
+# RECIBO LAS FILAS (LISTA O CUALQUIER ITERABLE DE DICCIONARIOS) Y CREO UN ARCHIVO CSV CON ESOS DATOS EN CARPETA UTILS
+def guardar_como_csv(nombre_archivo, lista_diccionarios, delimitador=";", columnas=None, comprimir=False):
+    """Guarda las filas en el csv consolidado en una sola pasada, sin armarlas todas en memoria.
+
+    Args:
+        nombre_archivo (str): nombre del csv (ej. "IndividuosTotal")
+        lista_diccionarios (iterable): filas a guardar, puede ser un generador
+        columnas (list): orden de las columnas; si no se indica se toman las claves de la
+            primera fila en el orden del esquema
+        comprimir (bool): si es True se guarda como .csv.gz
+    """
+    filas = iter(lista_diccionarios)
+    primera = next(filas, None)
+    if primera is None:
         print("⚠️ La lista está vacía, no se creó ningún archivo.")
         return
 
-    # Obtener los nombres de columnas del primer diccionario
-    columnas = sorted(set().union(*(d.keys() for d in lista_diccionarios)))
+    if columnas is None:
+        columnas = esquema.orden_columnas(claves_grupo([primera]))
 
-    # Ruta de salida en la carpeta "datos"
+    # Ruta de salida en la carpeta "utils"; se escribe en un temporal y despues se reemplaza
+    ruta_archivo = ruta_csv(nombre_archivo, comprimir)
+    temporal = ruta_temporal(ruta_archivo)
 
-    ruta_archivo = (
-        Path(__file__).resolve().parent.parent / "utils" / f"{nombre_archivo}.csv"
-    )
-
-    with open(ruta_archivo, mode="w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=columnas, delimiter=delimitador)
-        writer.writeheader()
-        writer.writerows(lista_diccionarios)
+    with abrir_csv(temporal, "w") as f:
+        csv.writer(f, delimiter=delimitador).writerow(columnas)
+        sobrantes = escribir_filas(f, chain([primera], filas), columnas, delimitador)
+    if sobrantes:
+        agregar_columnas_sobrantes(temporal, columnas, sobrantes, delimitador)
+    os.replace(temporal, ruta_archivo)
 
     print(f"✅ Archivo {nombre_archivo} guardado en: {ruta_archivo}")
 
 
 def año_trimestre():
     """
-    Devuelve una tupla que contiene tuplas con (año, trimestre) en el archivo de Hogares
+    Devuelve un conjunto con tuplas (año, trimestre) que hay en el archivo de Hogares.
+    Se leen del resumen HogaresTotal.json que deja la ingesta, sin recorrer el csv, en la
+    version publicada de los datos.
     """
 
-    ruta_hogares = Path(__file__).resolve().parent.parent / "utils" / "HogaresTotal.csv"
+    ruta_hogares = publicacion.ruta(Path(__file__).resolve().parent.parent / "utils" / "HogaresTotal.csv")
     
     if not os.path.exists(ruta_hogares):
         return False
 
-    registro = set()
-
-    with open(ruta_hogares, mode="r", encoding="utf-8") as file:
-        reader = csv.DictReader(file, delimiter=";")
-        for r in reader:
-            año = int(r["ANO4"])
-            trimestre = int(r["TRIMESTRE"])
-            registro.add((año, trimestre))
-    
-    return registro
+    return set(manifiesto.periodos_del_csv(ruta_hogares))
@@ -0,0 +1,579 @@
+import os
+import csv
+import shutil
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from pathlib import Path
+
+from src import almacen_columnar, avance, base_sqlite, cache_columnas, esquema, etapas, ids_hogares, manifiesto, procesamiento, proyeccion, publicacion, rendimiento
+from src.DataSet import (
+    CSV_POR_PREFIJO,
+    ENTIDADES,
+    abrir_csv,
+    agregar_columnas_sobrantes,
+    columnas_de,
+    escribir_filas,
+    iterar_zips_entidades,
+    periodo_zip,
+    ruta_csv,
+    ruta_temporal,
+)
+
+
+# Actualizacion incremental de los csv consolidados: se compara la carpeta de zips con el
+# manifiesto (planificar_ingesta), se cargan y procesan de a uno los zips pendientes en orden
+# de (año, trimestre) (preparar_zips) y sus filas se escriben apenas estan listas en el csv de
+# cada entidad y en lo que se arma junto con el (EscrituraCsv, EscrituraIngesta). Todo corre
+# con el bloqueo de escritura y termina publicando una version nueva (ver src/publicacion.py).
+# La lectura de los zips y la escritura fila a fila de los csv estan en src/DataSet.py.
+
+
+class EscrituraCsv:
+    """Escribe el csv consolidado a medida que llegan los trimestres ya procesados, en orden de
+        (año, trimestre), sin tener todas las filas en memoria. Se escribe en un temporal que
+        reemplaza al csv en terminar() (la version publicada comparte el archivo, ver
+        src/publicacion.py). Segun el modo:
+            "nuevo": arma el csv completo con las filas que llegan.
+            "agregar": copia el csv actual byte a byte (sin parsearlo) y agrega las filas al
+                final (solo si los trimestres nuevos son posteriores a los que ya estan). No se
+                agrega sobre el mismo archivo porque la version publicada es un enlace a el y
+                quien la esta leyendo veria un csv a medio escribir; el precio es que la copia
+                crece con el csv completo, aunque lo que se procesa y se resume es solo lo nuevo.
+            "fusionar": copia las filas actuales sin volver a procesarlas, sacando las de los
+                periodos quitados e intercalando las nuevas en orden de (año, trimestre).
+        Las columnas se toman del primer trimestre (y del csv actual); si despues aparecen
+        otras, al terminar se reescribe el csv con el encabezado completo. En modo "agregar"
+        filas_previas es la cantidad de filas del csv actual (del resumen), para ubicar las
+        filas agregadas sin volver a contarlas.
+    """
+
+    def __init__(self, ruta_archivo, modo, periodos_quitados=(), delimitador=";", filas_previas=0):
+        self.ruta = Path(ruta_archivo)
+        self.modo = modo
+        self.periodos_quitados = set(periodos_quitados)
+        self.delimitador = delimitador
+        self.temporal = ruta_temporal(self.ruta)
+        self.destino = None
+        self.origen = None
+        self.siguiente = None
+        self.columnas = None
+        self.sobrantes = {}
+        self.escritas = 0
+        self.nuevas = 0
+        self.filas_previas = filas_previas
+
+    def abrir(self, filas):
+        """Abre el temporal con las columnas del primer trimestre que llega"""
+        columnas_nuevas = columnas_de([filas])
+        previas = []
+        if self.modo != "nuevo":
+            with abrir_csv(self.ruta) as f:
+                previas = next(csv.reader(f, delimiter=self.delimitador), [])
+            # Si trae columnas que el csv no tiene, las filas actuales se reacomodan
+            if self.modo == "agregar" and not set(previas).issuperset(columnas_nuevas):
+                self.modo = "fusionar"
+
+        if self.modo == "agregar":
+            self.columnas = previas
+            # Las filas agregadas se numeran a continuacion de las que ya estan
+            self.escritas = self.filas_previas
+            shutil.copyfile(self.ruta, self.temporal)
+            self.destino = abrir_csv(self.temporal, "a")
+            return
+
+        self.columnas = esquema.orden_columnas(chain(previas, columnas_nuevas))
+        self.destino = abrir_csv(self.temporal, "w")
+        csv.writer(self.destino, delimiter=self.delimitador).writerow(self.columnas)
+        if self.modo == "fusionar":
+            posicion = {columna: i for i, columna in enumerate(previas)}
+            self.reacomodar = None
+            if self.columnas != previas:
+                self.reacomodar = [posicion.get(columna) for columna in self.columnas]
+            self.indices_periodo = posicion["ANO4"], posicion["TRIMESTRE"]
+            self.origen = abrir_csv(self.ruta)
+            self.lector = csv.reader(self.origen, delimiter=self.delimitador)
+            next(self.lector)
+            self.siguiente = next(self.lector, None)
+
+    def copiar_hasta(self, periodo=None):
+        """Copia las filas del csv actual hasta las del periodo (todas las que quedan si es
+            None), salvo las de los periodos quitados"""
+        writer = csv.writer(self.destino, delimiter=self.delimitador)
+        indice_año, indice_trimestre = self.indices_periodo
+        while self.siguiente is not None:
+            valores = self.siguiente
+            periodo_fila = int(valores[indice_año]), int(valores[indice_trimestre])
+            if periodo is not None and periodo_fila > periodo:
+                return
+            if periodo_fila not in self.periodos_quitados:
+                if self.reacomodar is not None:
+                    valores = ["" if i is None else valores[i] for i in self.reacomodar]
+                writer.writerow(valores)
+                self.escritas += 1
+            self.siguiente = next(self.lector, None)
+
+    def agregar(self, periodo, filas):
+        """Escribe las filas de un trimestre; los trimestres tienen que llegar en orden"""
+        if not filas:
+            return
+        if self.destino is None:
+            self.abrir(filas)
+        if self.modo == "fusionar":
+            self.copiar_hasta(periodo)
+        self.sobrantes.update(escribir_filas(self.destino, filas, self.columnas, self.delimitador, self.escritas))
+        self.escritas += len(filas)
+        self.nuevas += len(filas)
+
+    def terminar(self):
+        """Completa el csv y reemplaza al anterior. Devuelve False si no habia nada que escribir."""
+        if self.destino is None:
+            if self.modo != "fusionar":
+                return False
+            # Solo se quitan periodos
+            self.abrir([])
+        if self.modo == "fusionar":
+            self.copiar_hasta()
+        self.cerrar()
+        if self.sobrantes:
+            agregar_columnas_sobrantes(self.temporal, self.columnas, self.sobrantes, self.delimitador)
+        os.replace(self.temporal, self.ruta)
+        return True
+
+    @property
+    def agregado(self):
+        """Indica si el csv quedo igual al anterior con filas agregadas al final"""
+        return self.modo == "agregar" and not self.sobrantes
+
+    def cerrar(self):
+        for archivo in (self.origen, self.destino):
+            if archivo is not None:
+                archivo.close()
+        self.origen = None
+
+    def descartar(self):
+        """Deja el csv como estaba (si la ingesta se corta)"""
+        self.cerrar()
+        if self.temporal.exists():
+            os.remove(self.temporal)
+
+
+def planificar_ingesta(registro, huellas, zip_folder, prefijo, nombre_archivo, version_etapas=None):
+    """Compara los zips de la carpeta con el manifiesto y arma el plan de actualizacion
+        del csv de una entidad.
+
+    Args:
+        version_etapas (str): version del codigo de las etapas del procesamiento (ver
+            src/etapas.py); si es distinta de la de la ultima ingesta se reprocesan todos los zips
+
+    Returns:
+        dict: "entidad", "prefijo", "nombre", "ruta" del csv, "reconstruir" (si hay que armar
+            el csv completo), "pendientes" (zips a cargar), "quitados" (zips que ya no estan),
+            "periodos_previos", "periodos_pendientes" ({zip: periodo}), "periodos_afectados"
+            (periodos cuyas filas cambian), "errores" ({zip: error} de los zips pendientes que
+            no se pudieron leer) y "etapas" (version_etapas)
+    """
+    entidad = ENTIDADES[prefijo]
+    ruta_archivo = ruta_csv(nombre_archivo)
+    # Tambien se reconstruye si el csv tiene ids de hogar de otra version del diccionario o
+    # si cambio el codigo de alguna etapa del procesamiento
+    reconstruir = not manifiesto.csv_al_dia(registro, entidad, ruta_archivo) \
+        or not ids_hogares.al_dia(registro, entidad) \
+        or (version_etapas is not None and manifiesto.registro_entidad(registro, entidad).get("etapas") != version_etapas)
+    procesados = manifiesto.registro_entidad(registro, entidad)["zips"]
+    if reconstruir:
+        procesados.clear()
+
+    periodos_previos = manifiesto.periodos_procesados(registro, entidad)
+    pendientes, quitados = manifiesto.cambios_por_entidad(registro, huellas, entidad)
+
+    # Periodos cuyas filas cambian: los de zips quitados o modificados y los de los zips nuevos.
+    # Un zip dañado no corta la planificacion: se informa y se deja para el final, asi los demas
+    # se procesan (y se guardan sus etapas) antes de que la ingesta se corte en el (ver preparar_zips)
+    periodos_pendientes = {}
+    errores = {}
+    for file in pendientes:
+        try:
+            periodos_pendientes[file] = periodo_zip(Path(zip_folder) / file, prefijo)
+        except Exception as error:
+            print(f"⚠️ No se pudo leer {file} ({entidad}): {error}. Se procesan primero los demas zips.")
+            periodos_pendientes[file] = None
+            errores[file] = error
+    periodos_afectados = {
+        tuple(procesados[file]["periodo"])
+        for file in pendientes + quitados
+        if file in procesados and procesados[file]["periodo"] is not None
+    }
+    periodos_afectados.update(p for p in periodos_pendientes.values() if p is not None)
+    # Otros zips ya procesados del mismo periodo se vuelven a cargar para no perder sus filas
+    if pendientes or quitados:
+        for file, datos in procesados.items():
+            if file in huellas and file not in pendientes and datos["periodo"] is not None \
+                    and tuple(datos["periodo"]) in periodos_afectados:
+                pendientes.append(file)
+                periodos_pendientes[file] = tuple(datos["periodo"])
+
+    return {
+        "entidad": entidad,
+        "prefijo": prefijo,
+        "nombre": nombre_archivo,
+        "ruta": ruta_archivo,
+        "reconstruir": reconstruir,
+        "pendientes": pendientes,
+        "quitados": quitados,
+        "periodos_previos": periodos_previos,
+        "periodos_pendientes": periodos_pendientes,
+        "periodos_afectados": periodos_afectados,
+        "errores": errores,
+        "etapas": version_etapas,
+    }
+
+
+def preparar_zips(planes, procesar, zip_folder, huellas, ids, procesos=1, guardar_etapas=False):
+    """Carga y procesa de a uno los zips pendientes de los planes, en orden de (año, trimestre)
+        y abriendo cada zip una sola vez para todas las entidades, y entrega las filas de cada
+        uno apenas estan listas (ver EscrituraIngesta). A las filas de cada zip se les asigna
+        ID_HOGAR despues de procesarlas, siempre en el mismo orden.
+        Si guardar_etapas es True y el procesamiento es un Grafo de etapas, se guarda la
+        salida de cada etapa apenas se calcula y solo se calculan las que no estaban
+        guardadas; los zips cuya base esta guardada no se abren (ver src/etapas.py). Es lo
+        que permite retomar una ingesta que se corto. Si no, los zips se procesan sin
+        guardar nada. Los zips que no se pudieron leer al planificar van al final y al
+        llegar a ellos se lanza su error, como si hubiera fallado su carga.
+
+    Args:
+        planes (list[dict]): devueltos por planificar_ingesta
+        procesar (dict): {prefijo: funcion que limpia y agrega las columnas nuevas a las filas de un trimestre}
+        ids (dict): diccionario de ids de hogar (ver ids_hogares.leer)
+
+    Yields:
+        tuple: (zip, {prefijo: filas procesadas}) con los prefijos de los planes que lo tienen pendiente
+    """
+    por_etapas = {
+        plan["prefijo"] for plan in planes
+        if guardar_etapas and isinstance(procesar[plan["prefijo"]], etapas.Grafo)
+    }
+    # Zips cuya base esta guardada: no hace falta abrirlos
+    reutilizados = {
+        plan["prefijo"]: {
+            file for file in plan["pendientes"]
+            if plan["prefijo"] in por_etapas and procesar[plan["prefijo"]].base_guardada(huellas[file]["hash"])
+        }
+        for plan in planes
+    }
+
+    errores = {file: error for plan in planes for file, error in plan["errores"].items()}
+
+    # Los csv se escriben a medida que llegan los zips, asi que tienen que llegar en orden de periodo
+    def orden(file):
+        periodos = [plan["periodos_pendientes"][file] for plan in planes if file in plan["pendientes"]]
+        return file in errores, min((periodo for periodo in periodos if periodo is not None), default=(0, 0)), file
+
+    zips = sorted(set().union(*(plan["pendientes"] for plan in planes)), key=orden)
+    a_cargar = {
+        file: [plan["prefijo"] for plan in planes if file in plan["pendientes"] and file not in reutilizados[plan["prefijo"]]]
+        for file in zips if file not in errores
+    }
+    a_cargar = {file: prefijos for file, prefijos in a_cargar.items() if prefijos}
+    cargados = iterar_zips_entidades([Path(zip_folder) / file for file in a_cargar], list(a_cargar.values()), procesos)
+
+    informe = {plan["entidad"]: {} for plan in planes if plan["prefijo"] in por_etapas}
+    filas_procesadas = {plan["entidad"]: 0 for plan in planes}
+    for hechos, file in enumerate(zips, 1):
+        if file in errores:
+            raise errores[file]
+        filas_zip = next(cargados) if file in a_cargar else {}
+        preparados = {}
+        for plan in planes:
+            if file not in plan["pendientes"]:
+                continue
+            prefijo, entidad = plan["prefijo"], plan["entidad"]
+            if prefijo in por_etapas:
+                filas, estados = procesar[prefijo].ejecutar(huellas[file]["hash"], filas_zip.get(prefijo))
+                periodo = plan["periodos_pendientes"][file]
+                informe[entidad][file] = {
+                    "periodo": list(periodo) if periodo is not None else None,
+                    "cargado": prefijo in filas_zip,
+                    "etapas": estados,
+                }
+            else:
+                filas = filas_zip[prefijo]
+                if isinstance(procesar[prefijo], etapas.Grafo):
+                    procesar[prefijo](filas)  # Mide cada una de sus etapas
+                else:
+                    with rendimiento.medir("procesar", entidad, len(filas)):
+                        procesar[prefijo](filas)
+            with rendimiento.medir("asignar_ids", entidad, len(filas)):
+                ids_hogares.asignar(ids, filas)
+            preparados[prefijo] = filas
+            filas_procesadas[entidad] += len(filas)
+        # Se sueltan las filas del zip antes de cargar el siguiente
+        del filas_zip
+        yield file, preparados
+        avance.informar("zips", {"hechos": hechos, "total": len(zips), "ultimo": file})
+        avance.informar("filas", filas_procesadas)
+    if informe:
+        for entidad, zips_entidad in informe.items():
+            etapas.informar(entidad, zips_entidad)
+        etapas.guardar_informe(informe)
+
+
+def informar_escritura(ruta):
+    """Informa cuantos bytes ocupa el archivo (o la carpeta) que se termino de escribir (ver src/avance.py)"""
+    ruta = Path(ruta)
+    if ruta.is_dir():
+        avance.informar("escritura", {f"{ruta.parent.name}/{ruta.name}": sum(
+            archivo.stat().st_size for archivo in ruta.rglob("*") if archivo.is_file()
+        )})
+    elif ruta.exists():
+        avance.informar("escritura", {ruta.name: ruta.stat().st_size})
+
+
+class EscrituraIngesta:
+    """Actualiza con las filas ya procesadas de los zips pendientes del plan el csv
+        consolidado, su resumen, el almacen particionado (si almacen es True), la cache de
+        columnas (si cache es True), el csv de la proyeccion (si proyectar es True) y la
+        seccion de la entidad en el manifiesto (no lo guarda).
+        Cada zip se escribe con agregar() apenas se procesa, asi sus filas no quedan en
+        memoria hasta el final; el almacen guarda las filas de un trimestre solo hasta que
+        llegan todos sus zips. terminar() completa el csv y arma el resto a partir de el.
+
+    Args:
+        plan (dict): devuelto por planificar_ingesta
+    """
+
+    def __init__(self, plan, registro, huellas, almacen=False, delimitador=";", cache=False, proyectar=False):
+        self.plan, self.registro, self.huellas = plan, registro, huellas
+        self.delimitador, self.cache, self.proyectar = delimitador, cache, proyectar
+        self.procesados = manifiesto.registro_entidad(registro, plan["entidad"])["zips"]
+        periodos_previos, periodos_afectados = plan["periodos_previos"], plan["periodos_afectados"]
+        periodos_nuevos = {periodo for periodo in plan["periodos_pendientes"].values() if periodo is not None}
+        # Si solo se suman trimestres posteriores a los que ya estan alcanza con agregarlos al final
+        if plan["reconstruir"]:
+            modo = "nuevo"
+        elif not (periodos_afectados & periodos_previos) \
+                and all(periodo > max(periodos_previos, default=(0, 0)) for periodo in periodos_nuevos):
+            modo = "agregar"
+        else:
+            modo = "fusionar"
+        # Al agregar, el resumen del csv anterior da la cantidad de filas que ya tiene y al
+        # terminar solo se resume lo agregado (ver manifiesto.resumen_con_agregado)
+        self.resumen_previo = None
+        filas_previas = 0
+        if modo == "agregar" and plan["pendientes"]:
+            self.resumen_previo = manifiesto.asegurar_resumen(plan["ruta"], delimitador)
+            filas_previas = sum(datos["filas"] for datos in self.resumen_previo["periodos"])
+        self.csv = EscrituraCsv(plan["ruta"], modo, periodos_afectados, delimitador, filas_previas)
+        self.filas_nuevas = 0
+
+        # Si el almacen todavia no existe se arma al final a partir del csv ya consolidado
+        self.almacen = almacen
+        self.crear_almacen = almacen and not plan["reconstruir"] and not almacen_columnar.disponible(plan["entidad"])
+        self.estadisticas = None
+        if almacen and not self.crear_almacen and (plan["pendientes"] or plan["quitados"]):
+            self.estadisticas = almacen_columnar.iniciar_actualizacion(
+                plan["entidad"], periodos_afectados - periodos_nuevos, plan["reconstruir"])
+        # Zips que faltan de cada trimestre y filas de los que ya llegaron, para el almacen
+        self.zips_faltantes = Counter(plan["periodos_pendientes"][file] for file in plan["pendientes"])
+        self.filas_periodo = {}
+        self.particiones = 0
+
+    def agregar(self, file, filas):
+        """Escribe las filas procesadas de un zip pendiente del plan"""
+        entidad = self.plan["entidad"]
+        periodo = self.plan["periodos_pendientes"][file]
+        self.procesados[file] = {
+            "hash": self.huellas[file]["hash"],
+            "periodo": list(periodo) if periodo is not None else None,
+            "filas": len(filas),
+        }
+        self.filas_nuevas += len(filas)
+        with rendimiento.medir("escribir_csv", entidad, len(filas)):
+            self.csv.agregar(periodo, filas)
+
+        if self.estadisticas is None or periodo is None:
+            return
+        self.filas_periodo.setdefault(periodo, []).extend(filas)
+        self.zips_faltantes[periodo] -= 1
+        if self.zips_faltantes[periodo] == 0:
+            filas_periodo = self.filas_periodo.pop(periodo)
+            with rendimiento.medir("almacen", entidad, len(filas_periodo)):
+                almacen_columnar.escribir_periodo(entidad, periodo, filas_periodo, self.estadisticas)
+            self.particiones += 1
+
+    def terminar(self):
+        """Completa el csv y arma su resumen, el almacen, la cache y la proyeccion"""
+        plan, registro, delimitador = self.plan, self.registro, self.delimitador
+        entidad, nombre_archivo, ruta_archivo = plan["entidad"], plan["nombre"], plan["ruta"]
+        if not plan["pendientes"] and not plan["quitados"]:
+            print(f"✅ {nombre_archivo} ya está actualizado, no hay zips nuevos ni modificados.")
+            manifiesto.asegurar_resumen(ruta_archivo, delimitador)
+            if self.crear_almacen:
+                almacen_columnar.construir_desde_csv(ruta_archivo, entidad, delimitador)
+            if self.cache and not cache_columnas.disponible(entidad, ruta_archivo):
+                cache_columnas.construir(ruta_archivo, entidad)
+            if self.proyectar and not proyeccion.al_dia(registro, entidad, ruta_archivo):
+                proyeccion.escribir(ruta_archivo, entidad, registro, delimitador)
+            return
+
+        for file in plan["quitados"]:
+            del self.procesados[file]
+
+        with rendimiento.medir("escribir_csv", entidad):
+            escrito = self.csv.terminar()
+        agregado = self.csv.agregado
+        if plan["reconstruir"]:
+            if escrito:
+                print(f"✅ Archivo {nombre_archivo} guardado en: {ruta_archivo}")
+            else:
+                print("⚠️ La lista está vacía, no se creó ningún archivo.")
+        elif agregado:
+            print(f"✅ Se agregaron {self.filas_nuevas} registros a {nombre_archivo}.")
+        else:
+            print(f"✅ Se actualizaron {len(plan['periodos_afectados'])} trimestres en {nombre_archivo}.")
+
+        informar_escritura(ruta_archivo)
+
+        # Resumen del csv (periodos, filas, PONDERA y bytes donde esta cada periodo)
+        resumen = None
+        with rendimiento.medir("resumen_csv", entidad) as medicion:
+            if agregado and self.resumen_previo is not None:
+                resumen = manifiesto.resumen_con_agregado(ruta_archivo, self.resumen_previo, delimitador)
+            elif os.path.exists(ruta_archivo):
+                resumen = manifiesto.resumen_desde_csv(ruta_archivo, delimitador)
+            filas_csv = sum(datos["filas"] for datos in resumen["periodos"]) if resumen else 0
+            medicion["filas"] = filas_csv
+
+        if self.almacen:
+            if self.crear_almacen:
+                with rendimiento.medir("almacen", entidad, filas_csv):
+                    almacen_columnar.construir_desde_csv(ruta_archivo, entidad, delimitador)
+            elif self.estadisticas is not None:
+                almacen_columnar.terminar_actualizacion(entidad, self.estadisticas, self.particiones)
+            informar_escritura(almacen_columnar.ruta_entidad(entidad))
+        else:
+            # El almacen de una ingesta anterior ya no corresponde al csv: se borra para que no se lea
+            almacen_columnar.borrar(entidad)
+
+        manifiesto.registro_entidad(registro, entidad)["csv"] = manifiesto.huella_csv(ruta_archivo)
+        if self.cache:
+            with rendimiento.medir("cache_columnas", entidad, filas_csv):
+                cache_columnas.construir(ruta_archivo, entidad)
+            informar_escritura(cache_columnas.ruta_entidad(entidad))
+        if self.proyectar:
+            with rendimiento.medir("proyeccion", entidad, filas_csv):
+                proyeccion.escribir(ruta_archivo, entidad, registro, delimitador)
+            informar_escritura(proyeccion.ruta_proyeccion(entidad))
+
+    def descartar(self):
+        """Deja el csv como estaba si la ingesta se corta antes de terminar"""
+        self.csv.descartar()
+
+
+def actualizar(zip_folder, csv_por_prefijo, procesar, procesos=1, almacen=False, delimitador=";", cache=False,
+               proyectar=False, sqlite=False, guardar_etapas=False):
+    """Actualiza los csv consolidados de las entidades indicadas procesando solo los zips nuevos o
+        modificados desde la ultima ingesta, segun el manifiesto (hash, periodo y cantidad de
+        filas de cada zip). Cada zip pendiente se abre una sola vez con los txt de todas las
+        entidades que lo necesitan. Si un csv no existe o fue modificado por fuera, se
+        reconstruye completo. A cada fila se le agrega ID_HOGAR, el id entero del hogar (ver
+        src/ids_hogares.py). Con guardar_etapas, si una corrida anterior se corto, los zips que
+        ya se habian procesado se retoman de las salidas de sus etapas (ver src/etapas.py). Se
+        ejecuta con el bloqueo de escritura y al terminar publica los datos (ver src/publicacion.py).
+
+    Args:
+        zip_folder (carpeta): donde estan los archivos zip
+        csv_por_prefijo (dict): {prefijo: nombre del csv consolidado} de las entidades a actualizar
+        procesar (dict): {prefijo: funcion que recibe la lista de filas de un trimestre y la
+            limpia y le agrega las columnas nuevas (lo mismo que se le hace al dataset completo)}
+        procesos (int): procesos para cargar los zips pendientes en paralelo
+        almacen (bool): si es True tambien se actualiza el almacen particionado en parquet
+            (solo se reescriben las particiones de los trimestres que cambiaron)
+        cache (bool): si es True tambien se arma la cache de columnas (.npy) que usa Streamlit
+        proyectar (bool): si es True tambien se escribe el csv de la proyeccion con las columnas
+            que usan las paginas y consultas (ver src/proyeccion.py)
+        sqlite (bool): si es True tambien se carga la base SQLite indexada que usan las
+            consultas en SQL (ver src/base_sqlite.py)
+        guardar_etapas (bool): si es True y el procesamiento es un Grafo de etapas, se guarda
+            la salida de cada etapa y solo se calculan las que cambiaron (ver src/etapas.py)
+    """
+    # Un solo proceso actualiza a la vez; al terminar se publica la version nueva
+    with publicacion.bloqueo_escritura():
+        registro = manifiesto.leer_manifiesto()
+        ids = ids_hogares.leer(registro)
+        with rendimiento.medir("planificar"):
+            huellas = manifiesto.huellas_zips(registro, zip_folder)
+            planes = [
+                planificar_ingesta(registro, huellas, zip_folder, prefijo, nombre_archivo,
+                                   etapas.version(procesar[prefijo]))
+                for prefijo, nombre_archivo in csv_por_prefijo.items()
+            ]
+        avance.informar("planificar", {
+            "zips": len(huellas),
+            "pendientes": len(set().union(*(plan["pendientes"] for plan in planes))),
+        })
+        if not any(plan["pendientes"] or plan["quitados"] for plan in planes):
+            rendimiento.sin_cambios()
+
+        # Los ids de hogar se asignan al procesar cada zip y sus filas se escriben enseguida en
+        # el csv de cada entidad. Al final los csv se completan al mismo tiempo, cada uno en un hilo
+        escrituras = {
+            plan["prefijo"]: EscrituraIngesta(plan, registro, huellas, almacen, delimitador, cache, proyectar)
+            for plan in planes
+        }
+        try:
+            for file, preparados in preparar_zips(planes, procesar, zip_folder, huellas, ids, procesos,
+                                                  guardar_etapas):
+                for prefijo, filas in preparados.items():
+                    escrituras[prefijo].agregar(file, filas)
+            terminar_escrituras(list(escrituras.values()))
+        except BaseException:
+            for escritura in escrituras.values():
+                escritura.descartar()
+            raise
+
+        ids_hogares.guardar(ids)
+        for plan in planes:
+            ids_hogares.registrar(registro, plan["entidad"])
+            manifiesto.registro_entidad(registro, plan["entidad"])["etapas"] = plan["etapas"]
+        registro["zips"] = huellas
+        manifiesto.guardar_manifiesto(registro)
+        for plan in planes:
+            if guardar_etapas and plan["etapas"] is not None:
+                etapas.limpiar(procesar[plan["prefijo"]], [huella["hash"] for huella in huellas.values()])
+        if sqlite:
+            entidades = [plan["entidad"] for plan in planes]
+            avance.informar("sqlite", {"entidades": entidades})
+            with rendimiento.medir("sqlite", entidades[0] if len(entidades) == 1 else None):
+                base_sqlite.actualizar(entidades, delimitador)
+        avance.informar("publicar", {})
+        with rendimiento.medir("publicar"):
+            publicacion.publicar()
+
+
+def terminar_escrituras(escrituras):
+    """Completa las escrituras de las entidades: una sola en este hilo, varias cada una en un hilo"""
+    if len(escrituras) == 1:
+        escrituras[0].terminar()
+        return
+    with ThreadPoolExecutor(max_workers=len(escrituras)) as executor:
+        tareas = [executor.submit(escritura.terminar) for escritura in escrituras]
+        for tarea in tareas:
+            tarea.result()
+
+
+def actualizar_incremental(nombre_archivo, zip_folder, prefijo, procesar, procesos=1, almacen=False, delimitador=";",
+                           cache=False, proyectar=False, sqlite=False, guardar_etapas=False):
+    """Actualiza un solo csv consolidado (ej. "IndividuosTotal", con el prefijo "usu_individual")
+        con la funcion procesar de sus filas. Los demas argumentos son los de actualizar()."""
+    actualizar(zip_folder, {prefijo: nombre_archivo}, {prefijo: procesar}, procesos, almacen, delimitador,
+               cache, proyectar, sqlite, guardar_etapas)
+
+
+def actualizar_hogares_e_individuos(zip_folder, procesos=1, almacen=False, delimitador=";", cache=False,
+                                    proyectar=False, sqlite=False, guardar_etapas=False):
+    """Actualiza HogaresTotal.csv e IndividuosTotal.csv con el procesamiento de
+        src/procesamiento.py, abriendo cada zip pendiente una sola vez para las dos entidades.
+        Los argumentos son los de actualizar()."""
+    actualizar(zip_folder, CSV_POR_PREFIJO, procesamiento.PROCESAMIENTO, procesos, almacen, delimitador,
+               cache, proyectar, sqlite, guardar_etapas)
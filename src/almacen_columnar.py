@@ -0,0 +1,251 @@
+import importlib.util
+import json
+import os
+import shutil
+from pathlib import Path
+
+import pandas as pd
+
+# pyarrow es el motor que usa pandas para leer y escribir parquet; solo se verifica que este
+# instalado, pandas lo importa cuando hace falta
+PARQUET_DISPONIBLE = importlib.util.find_spec("pyarrow") is not None
+
+from utils.constantes import ALMACEN_PATH
+from src import esquema, registro
+
+
+# Entidad que corresponde a cada csv consolidado
+ENTIDAD_POR_CSV = {"IndividuosTotal": "individuos", "HogaresTotal": "hogares"}
+
+
+def ruta_entidad(entidad, raiz=ALMACEN_PATH):
+    """Carpeta de la entidad: almacen/<entidad>/ANO4=<año>/TRIMESTRE=<trimestre>/datos.parquet.
+        raiz permite leer el almacen de una version publicada (ver src/publicacion.py)."""
+    return Path(raiz) / entidad
+
+
+def ruta_particion(entidad, periodo, raiz=ALMACEN_PATH):
+    año, trimestre = periodo
+    return ruta_entidad(entidad, raiz) / f"ANO4={año}" / f"TRIMESTRE={trimestre}" / "datos.parquet"
+
+
+def clave_periodo(periodo):
+    return f"{periodo[0]}-{periodo[1]}"
+
+
+def entidad_de_csv(archivo_csv):
+    """Devuelve la entidad (individuos u hogares) de un csv consolidado, o None si no es uno de ellos"""
+    return ENTIDAD_POR_CSV.get(Path(archivo_csv).stem)
+
+
+def disponible(entidad, raiz=ALMACEN_PATH):
+    """Indica si se puede leer la entidad desde el almacen particionado"""
+    return PARQUET_DISPONIBLE and (ruta_entidad(entidad, raiz) / "estadisticas.json").exists()
+
+
+def leer_estadisticas(entidad, raiz=ALMACEN_PATH):
+    """Devuelve las estadisticas por particion: {"año-trimestre": {"periodo", "filas", "bytes", "columnas"}}"""
+    try:
+        with open(ruta_entidad(entidad, raiz) / "estadisticas.json", mode="r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def guardar_estadisticas(entidad, estadisticas):
+    ruta = ruta_entidad(entidad) / "estadisticas.json"
+    temporal = ruta.with_suffix(".tmp")
+    with open(temporal, mode="w", encoding="utf-8") as f:
+        json.dump(estadisticas, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def inferir_tipos(df, entidad):
+    """Convierte a numero las columnas cuyos valores son todos numericos (igual que hace read_csv),
+        el resto quedan como texto. Despues aplica los tipos del esquema, asi todas las
+        particiones guardan cada columna con el mismo tipo."""
+    for columna in df.columns:
+        original = df[columna]
+        numerica = pd.to_numeric(original, errors="coerce")
+        if numerica.isna().sum() == original.isna().sum():
+            df[columna] = numerica
+        else:
+            df[columna] = original.map(lambda v: None if pd.isna(v) else str(v))
+    return esquema.aplicar_esquema(df, entidad)
+
+
+def estadisticas_columna(serie):
+    """Minimo, maximo y cantidad de nulos de una columna, para descartar particiones sin abrirlas"""
+    valores = serie.dropna()
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        valores = valores.astype(str)
+    if valores.empty:
+        return {"min": None, "max": None, "nulos": int(serie.isna().sum())}
+    minimo, maximo = valores.min(), valores.max()
+    if pd.api.types.is_numeric_dtype(serie):
+        minimo, maximo = float(minimo), float(maximo)
+    return {"min": minimo, "max": maximo, "nulos": int(serie.isna().sum())}
+
+
+def escribir_particion(entidad, periodo, df):
+    """Escribe el parquet de un año-trimestre y devuelve sus estadisticas"""
+    ruta = ruta_particion(entidad, periodo)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_suffix(".tmp")
+    df.to_parquet(temporal, index=False)
+    os.replace(temporal, ruta)
+    return {
+        "periodo": list(periodo),
+        "filas": len(df),
+        "bytes": ruta.stat().st_size,
+        "columnas": {columna: estadisticas_columna(df[columna]) for columna in df.columns},
+    }
+
+
+def filas_a_dataframe(filas):
+    """Arma el DataFrame de las filas; si son Registro se usan directo sus listas de valores"""
+    columnas_valores = registro.tabla(filas)
+    if columnas_valores is None:
+        return pd.DataFrame(filas)
+    columnas, valores = columnas_valores
+    return pd.DataFrame(valores, columns=columnas)
+
+
+def iniciar_actualizacion(entidad, periodos_quitados=(), reconstruir=False):
+    """Prepara la actualizacion del almacen: borra las particiones de los periodos quitados (o
+        todo el almacen de la entidad si se reconstruye). Los trimestres nuevos se escriben
+        despues, de a uno, con escribir_periodo.
+
+    Returns:
+        dict: estadisticas a completar con escribir_periodo, o None si no esta pyarrow
+    """
+    if not PARQUET_DISPONIBLE:
+        print("⚠️ pyarrow no está instalado, no se actualizó el almacen particionado.")
+        return None
+    if reconstruir and ruta_entidad(entidad).exists():
+        shutil.rmtree(ruta_entidad(entidad))
+    ruta_entidad(entidad).mkdir(parents=True, exist_ok=True)
+    estadisticas = {} if reconstruir else leer_estadisticas(entidad)
+
+    for periodo in periodos_quitados:
+        estadisticas.pop(clave_periodo(periodo), None)
+        ruta = ruta_particion(entidad, periodo)
+        if ruta.exists():
+            ruta.unlink()
+    return estadisticas
+
+
+def escribir_periodo(entidad, periodo, filas, estadisticas):
+    """Escribe la particion de un trimestre con todas sus filas (de uno o mas zips). Si el
+        trimestre quedo sin filas se borra su particion."""
+    if not filas:
+        estadisticas.pop(clave_periodo(periodo), None)
+        if ruta_particion(entidad, periodo).exists():
+            ruta_particion(entidad, periodo).unlink()
+        return
+    df = inferir_tipos(filas_a_dataframe(filas), entidad)
+    estadisticas[clave_periodo(periodo)] = escribir_particion(entidad, periodo, df)
+
+
+def terminar_actualizacion(entidad, estadisticas, escritas):
+    """Guarda las estadisticas de las particiones al terminar de escribirlas"""
+    guardar_estadisticas(entidad, estadisticas)
+    print(f"✅ Almacen de {entidad} actualizado: {escritas} particiones escritas.")
+
+
+def construir_desde_csv(ruta_csv, entidad=None, delimitador=";", filas_por_bloque=200_000):
+    """Arma el almacen completo de una entidad a partir de su csv consolidado,
+        leyendolo por bloques (sirve para crear el almacen sin volver a procesar los zips)."""
+    if not PARQUET_DISPONIBLE:
+        print("⚠️ pyarrow no está instalado, no se puede crear el almacen particionado.")
+        return
+    entidad = entidad or entidad_de_csv(ruta_csv)
+    if ruta_entidad(entidad).exists():
+        shutil.rmtree(ruta_entidad(entidad))
+    ruta_entidad(entidad).mkdir(parents=True)
+
+    partes = {}
+    for bloque in pd.read_csv(ruta_csv, sep=delimitador, dtype=str, keep_default_na=False,
+                              na_values=[""], chunksize=filas_por_bloque):
+        for (año, trimestre), grupo in bloque.groupby(["ANO4", "TRIMESTRE"], sort=False):
+            partes.setdefault((int(año), int(trimestre)), []).append(grupo)
+
+    estadisticas = {}
+    for periodo, grupos in sorted(partes.items()):
+        df = inferir_tipos(pd.concat(grupos, ignore_index=True), entidad)
+        estadisticas[clave_periodo(periodo)] = escribir_particion(entidad, periodo, df)
+    guardar_estadisticas(entidad, estadisticas)
+    print(f"✅ Almacen de {entidad} creado con {len(estadisticas)} particiones.")
+
+
+def borrar(entidad):
+    """Borra el almacen de la entidad (cuando se deja de actualizar ya no corresponde al csv)"""
+    if ruta_entidad(entidad).exists():
+        shutil.rmtree(ruta_entidad(entidad))
+        print(f"♻️ Se borró el almacen de {entidad}, que ya no corresponde al csv (GUARDAR_ALMACEN está desactivado).")
+
+
+def periodos(entidad, raiz=ALMACEN_PATH):
+    """Devuelve la lista ordenada de (año, trimestre) que hay en el almacen"""
+    return sorted(tuple(datos["periodo"]) for datos in leer_estadisticas(entidad, raiz).values())
+
+
+def podria_cumplir(datos_particion, condiciones):
+    """Usa el minimo y maximo de cada columna para saber si la particion puede tener filas
+        que cumplan las condiciones {columna: valor}"""
+    for columna, valor in condiciones.items():
+        estadistica = datos_particion["columnas"].get(columna)
+        if estadistica is None or estadistica["min"] is None:
+            return False
+        try:
+            if valor < estadistica["min"] or valor > estadistica["max"]:
+                return False
+        except TypeError:
+            continue  # tipos no comparables, no se puede descartar
+    return True
+
+
+def leer(entidad, columnas=None, periodos_buscados=None, condiciones=None, raiz=ALMACEN_PATH):
+    """Lee del almacen solo las particiones y columnas pedidas.
+
+    Args:
+        entidad (str): "individuos" o "hogares"
+        columnas (list): columnas a leer, None para todas
+        periodos_buscados (list[tuple]): (año, trimestre) a leer, None para todos
+        condiciones (dict): {columna: valor} que deben cumplir las filas; con las estadisticas
+            se descartan las particiones que no pueden tenerlas
+        raiz (Path): carpeta del almacen (por defecto la de utils/)
+
+    Returns:
+        pandas.DataFrame: las filas de las particiones elegidas
+    """
+    if periodos_buscados is not None:
+        periodos_buscados = {tuple(map(int, p)) for p in periodos_buscados}
+    condiciones = condiciones or {}
+
+    archivos = []
+    for datos in sorted(leer_estadisticas(entidad, raiz).values(), key=lambda d: d["periodo"]):
+        periodo = tuple(datos["periodo"])
+        if periodos_buscados is not None and periodo not in periodos_buscados:
+            continue
+        if condiciones and not podria_cumplir(datos, condiciones):
+            continue
+        archivos.append((ruta_particion(entidad, periodo, raiz), datos))
+
+    a_leer = None
+    if columnas is not None:
+        a_leer = list(dict.fromkeys(list(columnas) + list(condiciones)))
+
+    partes = []
+    for ruta, datos in archivos:
+        presentes = None if a_leer is None else [c for c in a_leer if c in datos["columnas"]]
+        df = pd.read_parquet(ruta, columns=presentes)
+        for columna, valor in condiciones.items():
+            df = df[df[columna] == valor]
+        partes.append(df)
+
+    if not partes:
+        return pd.DataFrame(columns=a_leer or [])
+    # Las categorias pueden variar entre particiones y concat las deja como texto
+    df = esquema.aplicar_esquema(pd.concat(partes, ignore_index=True), entidad)
+    return df if columnas is None else df[[c for c in columnas if c in df.columns]]
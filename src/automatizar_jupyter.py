@@ -1,8 +1,12 @@
-import nbformat #Permite leer y escribir archivos Jupyter Notebook
-from nbconvert.preprocessors import ExecutePreprocessor #Proporciona una clase que permite ejecutar todas las celdas de un notebook
 import os
+import sys
 from pathlib import Path
 
+# Agrego la raiz del proyecto al path para poder importar src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src import ingesta, publicacion
+
 def ejecutar_notebook(ruta_notebook, tiempo_espera=600, kernel_name='python3'):
     """
     Ejecuta automáticamente todas las celdas de un notebook Jupyter.
@@ -13,6 +17,10 @@ def ejecutar_notebook(ruta_notebook, tiempo_espera=600, kernel_name='python3'):
     tiempo_espera : Tiempo máximo de espera por cada celda (en segundos, default 600)
     kernel_name : Nombre del kernel a utilizar (default 'python3')
     """
+    # Jupyter solo hace falta para ejecutar notebooks, no para actualizar los datos
+    import nbformat #Permite leer y escribir archivos Jupyter Notebook
+    from nbconvert.preprocessors import ExecutePreprocessor #Proporciona una clase que permite ejecutar todas las celdas de un notebook
+
     try:
         # Se lee el notebook y se convierte a estructura de datos Python que representa el notebook (f contiene texto JSON)
         with open(ruta_notebook, 'r', encoding='utf-8') as f:
@@ -31,9 +39,10 @@ def ejecutar_notebook(ruta_notebook, tiempo_espera=600, kernel_name='python3'):
         raise #sirve para relanzar la excepción que fue capturada
 
 def rutas ():
-    """Funcion principal para resetear los csv en base a los archivos disponibles"""
+    """Funcion principal para resetear los csv en base a los archivos disponibles.
+    Se ejecuta la ingesta en este mismo proceso (lo mismo que hace el notebook de ingesta,
+    sin levantar un kernel de Jupyter): arma los dos csv leyendo cada zip una sola vez y
+    publica la version nueva. Si varios piden actualizar al mismo tiempo se ejecuta una sola vez.
+    Devuelve False si el pedido lo resolvio otra actualizacion."""
 
-    ruta_archivo = Path(__file__).resolve().parent.parent / "notebooks" / "individuos.ipynb"
-    ruta_archivo2 = Path(__file__).resolve().parent.parent / "notebooks" / "hogares.ipynb"
-    ejecutar_notebook(ruta_archivo)
-    ejecutar_notebook(ruta_archivo2)
+    return publicacion.actualizar_una_vez(ingesta.ejecutar)
@@ -0,0 +1,17 @@
+# Avance de la ingesta en curso: src/actualizacion.py informa cada paso (zips cargados, filas
+# procesadas, bytes escritos, ...) y quien quiera seguirlo agrega a receptores una funcion que lo recibe.
+# Sin receptores no hace nada. Lo usa el trabajo de fondo del boton "Actualizar" (ver
+# src/trabajos.py), que ademas puede cortar la ingesta lanzando una excepcion desde el receptor.
+
+receptores = []
+
+
+def informar(etapa, datos):
+    """Avisa a los receptores el avance de una etapa de la ingesta.
+
+    Args:
+        etapa (str): "planificar", "zips", "filas", "escritura", "sqlite" o "publicar"
+        datos (dict): valores de la etapa (reemplazan a los que se informaron antes con la misma clave)
+    """
+    for receptor in receptores:
+        receptor(etapa, datos)
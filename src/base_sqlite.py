@@ -0,0 +1,114 @@
+import csv
+import json
+import os
+import shutil
+import sqlite3
+
+from utils.constantes import BASE_SQLITE_PATH, HOGARES_CSV, INDIVIDUOS_CSV
+from src import manifiesto, publicacion
+
+
+# Base SQLite (solo la libreria estandar) con una tabla por entidad, copia de los csv
+# consolidados, para que las consultas resuelvan con SQL e indices lo que antes hacian
+# recorriendo el csv completo. Los valores se guardan como texto, igual que en el csv
+# (asi las comparaciones dan lo mismo que en Python), salvo ANO4 y TRIMESTRE que son enteros.
+# Como los demas archivos que se publican, nunca se modifica en el lugar: se arma una copia
+# y se renombra (ver src/publicacion.py).
+
+CSV_POR_ENTIDAD = {"hogares": HOGARES_CSV, "individuos": INDIVIDUOS_CSV}
+
+COLUMNAS_ENTERAS = ("ANO4", "TRIMESTRE")
+
+# Indices de cada tabla (los que tienen columnas que la tabla no tiene se omiten)
+INDICES = [("ANO4", "TRIMESTRE"), ("AGLOMERADO",), ("REGION",), ("CODUSU", "NRO_HOGAR")]
+
+
+def cargar_tabla(conexion, entidad, ruta_csv, delimitador=";"):
+    """Reemplaza la tabla de la entidad con las filas del csv consolidado y crea sus indices"""
+    conexion.execute(f'DROP TABLE IF EXISTS "{entidad}"')
+    with open(ruta_csv, mode="r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=delimitador)
+        encabezado = next(reader, [])
+        definiciones = ", ".join(
+            f'"{columna}" {"INTEGER" if columna in COLUMNAS_ENTERAS else "TEXT"}' for columna in encabezado
+        )
+        conexion.execute(f'CREATE TABLE "{entidad}" ({definiciones})')
+        marcas = ", ".join("?" * len(encabezado))
+        conexion.executemany(f'INSERT INTO "{entidad}" VALUES ({marcas})', reader)
+    for columnas in INDICES:
+        if set(columnas).issubset(encabezado):
+            lista = ", ".join(f'"{columna}"' for columna in columnas)
+            conexion.execute(f'CREATE INDEX "{entidad}_{"_".join(columnas)}" ON "{entidad}" ({lista})')
+    conexion.execute(
+        "INSERT OR REPLACE INTO origen VALUES (?, ?)",
+        (entidad, json.dumps(manifiesto.huella_csv(ruta_csv), sort_keys=True)),
+    )
+
+
+def origenes(ruta=BASE_SQLITE_PATH):
+    """Devuelve {entidad: huella del csv} de los csv con que se cargo cada tabla"""
+    if not ruta.exists():
+        return {}
+    conexion = sqlite3.connect(ruta)
+    try:
+        return {entidad: json.loads(huella) for entidad, huella in conexion.execute("SELECT * FROM origen")}
+    except sqlite3.DatabaseError:
+        return {}
+    finally:
+        conexion.close()
+
+
+def actualizar(entidades=tuple(CSV_POR_ENTIDAD), delimitador=";"):
+    """Vuelve a cargar las tablas cuyo csv consolidado cambio desde la ultima carga.
+        Se llama al terminar la ingesta, con el bloqueo de escritura tomado."""
+    cargadas = origenes()
+    cambiadas = [
+        entidad for entidad in entidades
+        if CSV_POR_ENTIDAD[entidad].exists() and cargadas.get(entidad) != manifiesto.huella_csv(CSV_POR_ENTIDAD[entidad])
+    ]
+    if not cambiadas:
+        print(f"✅ La base {BASE_SQLITE_PATH.name} ya está al día.")
+        return
+
+    # Se trabaja sobre una copia que despues reemplaza a la base anterior
+    temporal = BASE_SQLITE_PATH.with_name(f".tmp_{BASE_SQLITE_PATH.name}")
+    if BASE_SQLITE_PATH.exists() and cargadas:
+        shutil.copyfile(BASE_SQLITE_PATH, temporal)
+    elif temporal.exists():
+        os.remove(temporal)
+    conexion = sqlite3.connect(temporal)
+    try:
+        conexion.execute("CREATE TABLE IF NOT EXISTS origen (entidad TEXT PRIMARY KEY, csv TEXT)")
+        for entidad in cambiadas:
+            cargar_tabla(conexion, entidad, CSV_POR_ENTIDAD[entidad], delimitador)
+        conexion.commit()
+        conexion.execute("VACUUM")
+    finally:
+        conexion.close()
+    os.replace(temporal, BASE_SQLITE_PATH)
+    print(f"✅ Base {BASE_SQLITE_PATH.name} actualizada ({', '.join(cambiadas)}).")
+
+
+def conectar():
+    """Abre en modo solo lectura la base de la version publicada. Como la base es opcional
+        (GUARDAR_SQLITE), puede faltar o haber quedado de una ingesta anterior: en ese caso
+        se avisa en lugar de responder con datos viejos."""
+    carpeta = publicacion.carpeta_actual()
+    ruta = carpeta / BASE_SQLITE_PATH.name
+    if not ruta.exists():
+        raise FileNotFoundError(f"No se encontró la base {ruta}, se arma con python src/ingesta.py --sqlite (o GUARDAR_SQLITE)")
+    cargadas = origenes(ruta)
+    if any(cargadas.get(entidad) != manifiesto.huella_csv(carpeta / ruta_csv.name)
+           for entidad, ruta_csv in CSV_POR_ENTIDAD.items() if (carpeta / ruta_csv.name).exists()):
+        raise FileNotFoundError(f"La base {ruta} no corresponde a los csv publicados, se actualiza con python src/ingesta.py --sqlite")
+    # Los archivos publicados no cambian, asi que se abre como inmutable (sin bloqueos)
+    return sqlite3.connect(f"{ruta.as_uri()}?mode=ro&immutable=1", uri=True)
+
+
+def consultar(sql, parametros=()):
+    """Ejecuta la consulta sobre la base publicada y devuelve todas las filas"""
+    conexion = conectar()
+    try:
+        return conexion.execute(sql, parametros).fetchall()
+    finally:
+        conexion.close()
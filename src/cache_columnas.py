@@ -0,0 +1,210 @@
+import json
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from utils.constantes import CACHE_COLUMNAS_PATH
+from src import esquema, manifiesto
+
+
+# Como se guarda cada columna en la cache:
+#   "numero": <columna>.npy con los valores
+#   "entero_nulo": <columna>.npy con los valores (0 en los nulos) y <columna>.nulos.npy con la mascara
+#   "categoria": <columna>.npy con los codigos y <columna>.valores.npy con las categorias
+#   "texto": igual que categoria, pero al leer se devuelven los textos (object) como read_csv
+NUMERO, ENTERO_NULO, CATEGORIA, TEXTO = "numero", "entero_nulo", "categoria", "texto"
+
+
+def ruta_entidad(entidad, raiz=CACHE_COLUMNAS_PATH):
+    """Carpeta de la entidad: cache_columnas/<entidad>/<columna>.npy y datos.json.
+        raiz permite leer la cache de una version publicada (ver src/publicacion.py)."""
+    return Path(raiz) / entidad
+
+
+def leer_datos(entidad, raiz=CACHE_COLUMNAS_PATH):
+    """Devuelve el datos.json de la cache de la entidad, o None si no existe"""
+    try:
+        with open(ruta_entidad(entidad, raiz) / "datos.json", mode="r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def disponible(entidad, ruta_csv, raiz=CACHE_COLUMNAS_PATH):
+    """Indica si la cache de la entidad corresponde al csv consolidado tal como esta ahora"""
+    datos = leer_datos(entidad, raiz)
+    return datos is not None and datos["csv"] == manifiesto.huella_csv(ruta_csv)
+
+
+def codificar(serie):
+    """Devuelve (codigos, valores) de una columna de texto o categorica; los nulos quedan en -1.
+        Las categoricas conservan el tipo entero de sus codigos (asi from_codes no los copia),
+        los textos quedan en int32."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.cat.codes.to_numpy(), serie.cat.categories.astype(str).to_numpy()
+    codigos, valores = pd.factorize(serie)
+    return codigos.astype(np.int32), np.asarray([str(v) for v in valores])
+
+
+def descomponer(serie):
+    """Separa una columna en los arrays con que se guarda.
+
+    Returns:
+        tuple: (como se guardo, valores, nulos o None, categorias o None)
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype) or serie.dtype == object:
+        codigos, valores = codificar(serie)
+        tipo = CATEGORIA if isinstance(serie.dtype, pd.CategoricalDtype) else TEXTO
+        return {"tipo": tipo}, codigos, None, valores.astype(str)
+    if isinstance(serie.dtype, pd.api.extensions.ExtensionDtype):
+        # Enteros con nulos del esquema (Int8, Int16, Int32)
+        valores = serie.to_numpy(dtype=serie.dtype.numpy_dtype, na_value=0)
+        return {"tipo": ENTERO_NULO, "dtype": str(serie.dtype)}, valores, serie.isna().to_numpy(), None
+    return {"tipo": NUMERO}, serie.to_numpy(), None, None
+
+
+def componer(datos_columna, valores, nulos=None, categorias=None):
+    """Vuelve a armar la columna con su tipo original a partir de sus arrays, sin copiar
+        los valores salvo en las columnas de texto"""
+    tipo = datos_columna["tipo"]
+    if tipo == NUMERO:
+        return valores
+    if tipo == ENTERO_NULO:
+        return pd.arrays.IntegerArray(valores, nulos)
+    if tipo == CATEGORIA:
+        return pd.Categorical.from_codes(valores, categories=categorias.astype(object))
+    # Texto: se decodifica con los valores y un nulo al final para los codigos -1
+    return np.append(categorias.astype(object), np.nan).take(valores)
+
+
+def guardar_columna(carpeta, columna, serie):
+    """Guarda una columna en la carpeta y devuelve como se guardo"""
+    datos_columna, valores, nulos, categorias = descomponer(serie)
+    np.save(carpeta / f"{columna}.npy", valores)
+    if nulos is not None:
+        np.save(carpeta / f"{columna}.nulos.npy", nulos)
+    if categorias is not None:
+        np.save(carpeta / f"{columna}.valores.npy", categorias)
+    return datos_columna
+
+
+def rangos_por_periodo(df):
+    """Devuelve {"año-trimestre": [inicio, fin]} con las filas de cada periodo si el csv esta
+        ordenado por (año, trimestre); si no lo esta devuelve None"""
+    if "ANO4" not in df.columns or "TRIMESTRE" not in df.columns:
+        return None
+    claves = df["ANO4"].astype("int64").to_numpy() * 10 + df["TRIMESTRE"].astype("int64").to_numpy()
+    if len(claves) and (np.diff(claves) < 0).any():
+        return None
+    cortes = np.flatnonzero(np.diff(claves)) + 1
+    inicios = np.concatenate(([0], cortes))
+    fines = np.concatenate((cortes, [len(claves)]))
+    return {
+        f"{claves[i] // 10}-{claves[i] % 10}": [int(i), int(f)]
+        for i, f in zip(inicios, fines)
+    }
+
+
+def construir(ruta_csv, entidad):
+    """Arma la cache de columnas de la entidad a partir del csv consolidado: cada columna se
+        guarda como un .npy (las de texto y categoricas codificadas con un diccionario), asi
+        crear_dataframe las abre mapeadas a memoria (np.load con mmap_mode) sin volver a
+        parsear el csv."""
+    huella = manifiesto.huella_csv(ruta_csv)
+    if huella is None:
+        return
+    df = esquema.leer_csv(ruta_csv, entidad)
+
+    # Se escribe en una carpeta temporal y despues se reemplaza la anterior
+    carpeta = ruta_entidad(entidad)
+    temporal = carpeta.with_name(f".tmp_{entidad}")
+    if temporal.exists():
+        shutil.rmtree(temporal)
+    temporal.mkdir(parents=True)
+    columnas = {columna: guardar_columna(temporal, columna, df[columna]) for columna in df.columns}
+    datos = {
+        "csv": huella,
+        "filas": len(df),
+        "periodos": rangos_por_periodo(df),
+        "columnas": columnas,
+    }
+    with open(temporal / "datos.json", mode="w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+
+    if carpeta.exists():
+        shutil.rmtree(carpeta)
+    os.replace(temporal, carpeta)
+    print(f"✅ Cache de columnas de {entidad} guardada ({len(columnas)} columnas, {len(df)} filas).")
+
+
+def leer_columna(carpeta, columna, datos_columna, inicio, fin):
+    """Abre el .npy de la columna sin copiarlo a memoria y lo convierte al tipo original.
+        Se mapea en modo "c": las paginas se comparten con los otros procesos que leen la
+        cache y si alguien modifica el DataFrame se copia solo lo que cambia, sin tocar el archivo."""
+    tipo = datos_columna["tipo"]
+    valores = np.asarray(np.load(carpeta / f"{columna}.npy", mmap_mode="c")[inicio:fin])
+    nulos = None
+    if tipo == ENTERO_NULO:
+        nulos = np.asarray(np.load(carpeta / f"{columna}.nulos.npy", mmap_mode="c")[inicio:fin])
+    categorias = None
+    if tipo in (CATEGORIA, TEXTO):
+        categorias = np.load(carpeta / f"{columna}.valores.npy")
+    return componer(datos_columna, valores, nulos, categorias)
+
+
+def armar(datos, leer_columna_rango, columnas=None, periodos_buscados=None):
+    """Arma el DataFrame con las columnas pedidas; si el csv esta ordenado por periodo solo se
+        toman las filas de los periodos buscados.
+
+    Args:
+        datos (dict): filas, periodos y columnas (como el datos.json de la cache)
+        leer_columna_rango (funcion): recibe (columna, inicio, fin) y devuelve esas filas de la columna
+        columnas (list): columnas a leer, None para todas
+        periodos_buscados (list[tuple]): (año, trimestre) a leer, None para todos
+    """
+    nombres = list(datos["columnas"]) if columnas is None else [c for c in columnas if c in datos["columnas"]]
+
+    rangos = [(0, datos["filas"])]
+    if periodos_buscados is not None and datos["periodos"] is not None:
+        claves = {f"{int(año)}-{int(trimestre)}" for año, trimestre in periodos_buscados}
+        rangos = [tuple(rango) for clave, rango in datos["periodos"].items() if clave in claves]
+
+    partes = []
+    for inicio, fin in rangos:
+        partes.append(pd.DataFrame(
+            {c: leer_columna_rango(c, inicio, fin) for c in nombres},
+            columns=nombres,
+            copy=False,
+        ))
+    if not partes:
+        return pd.DataFrame(columns=nombres)
+    if len(partes) == 1:
+        return partes[0]
+    # Todas las partes salen de los mismos arrays, asi que concat mantiene los tipos
+    return pd.concat(partes, ignore_index=True)
+
+
+def leer(entidad, columnas=None, periodos_buscados=None, raiz=CACHE_COLUMNAS_PATH):
+    """Lee de la cache las columnas pedidas; si el csv esta ordenado por periodo solo se
+        toman las filas de los periodos buscados.
+
+    Args:
+        entidad (str): "individuos" o "hogares"
+        columnas (list): columnas a leer, None para todas
+        periodos_buscados (list[tuple]): (año, trimestre) a leer, None para todos
+        raiz (Path): carpeta de la cache (por defecto la de utils/)
+
+    Returns:
+        pandas.DataFrame: las columnas pedidas que esten en la cache
+    """
+    datos = leer_datos(entidad, raiz)
+    carpeta = ruta_entidad(entidad, raiz)
+    return armar(
+        datos,
+        lambda columna, inicio, fin: leer_columna(carpeta, columna, datos["columnas"][columna], inicio, fin),
+        columnas,
+        periodos_buscados,
+    )
@@ -1,7 +1,13 @@
 import csv
+import sys
 from pathlib import Path
 from mayores_nivel_ed import aglomerados_map
 
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src import publicacion
+
 def cargar_datos_hogares(archivo_csv):
     """Carga los datos de hogares desde un archivo CSV."""
     
@@ -46,7 +52,7 @@ def filtrar_y_contar_viviendas_precarias():
         - Busco el máximo entre los aglomerados. 
         - Imprimo el aglomerado con mayor cantidad y cual es."""
     
-    archivo_csv = Path(__file__).resolve().parent.parent.parent / 'utils' / 'HogaresTotal.csv'
+    archivo_csv = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / 'utils' / 'HogaresTotal.csv')
     
     datos_hogares = cargar_datos_hogares(archivo_csv)
     viviendas_precarias = filtrar_viviendas_precarias(datos_hogares)
@@ -10,15 +10,22 @@ sys.path.append(str(ruta_const))
 # Importar la constante de nombres de aglomerados
 from constantes import NOMBRES_AGLOMERADOS
 
+# Agrego la raiz del proyecto para importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from src import manifiesto, publicacion
+
 #Calcula los porcentajes por aglomerado según el tipo de individuo que se pase
 def calcular_porcentajes_por_aglomerado(individuos,NOMBRES_AGLOMERADOS, tipo_individuo, hogares = None):
     
-    #Subfunción para verificar si un hogar tiene condición de habitabilidad insuficiente
+    #Viviendas (CODUSU) con algun hogar en condición de habitabilidad insuficiente (se arma una sola vez)
+    insuficientes = set()
+    if hogares is not None:
+        insuficientes = {hogar['CODUSU'] for hogar in hogares
+                         if hogar["CONDICION_DE_HABITABILIDAD"] == "Insuficiente"}
+
+    #Subfunción para verificar si la vivienda de una persona tiene condición de habitabilidad insuficiente
     def tiene_habitabilidad_insuficiente(cod_usu):
-        for hogar in hogares:
-            if  hogar['CODUSU'] == cod_usu and hogar["CONDICION_DE_HABITABILIDAD"] == "Insuficiente":
-                return True
-        return False
+        return cod_usu in insuficientes
     #Analizo si tengo individuos para analizar
     if individuos is None:
         print("No hay individuos para analizar.")
@@ -52,7 +59,12 @@ def calcular_porcentajes_por_aglomerado(individuos,NOMBRES_AGLOMERADOS, tipo_ind
     #Se devuelve ordenado de menor a mayor porcentaje
     return dict(sorted(porcentajes.items(), key=lambda item: item[1], reverse=False))
 
+#Obtiene el ultimo trimestre del ultimo anio, del resumen IndividuosTotal.json (de la version publicada) si existe
 def obtener_ultimo_trimestre(personas):
+    periodos = manifiesto.periodos_del_csv(publicacion.ruta(Path(__file__).resolve().parents[2] / "utils" / "IndividuosTotal.csv"))
+    if periodos:
+        ult_anio, ult_trim = max(periodos)
+        return str(ult_trim), str(ult_anio)
     ult_anio = max(p["ANO4"] for p in personas)
     trimestres_de_ult_anio = [p["TRIMESTRE"] for p in personas if p["ANO4"] == ult_anio]
     return max(trimestres_de_ult_anio),ult_anio
@@ -65,10 +77,10 @@ def imprimir_porcentajes_por_aglomerado(porcentajes, descripcion):
     for key,value in porcentajes.items():
         print(f"{key} : {value}")
 
-#Lee el archivo de individuos y devuelve la lista de diccionarios
+#Lee el archivo de individuos (de la version publicada) y devuelve la lista de diccionarios
 def obtener_individuos():
         
-        ruta_individuos = Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv"
+        ruta_individuos = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv")
 
         if not ruta_individuos.exists():
             print(f" No se encontró el archivo en: {ruta_individuos.resolve()}")
@@ -78,9 +90,9 @@ def obtener_individuos():
                 individuos = list(csv.DictReader(individuos_file, delimiter=";"))
                 return individuos
 
-#Lee el archivo de hogares y devuelve la lista de diccionarios
+#Lee el archivo de hogares (de la version publicada) y devuelve la lista de diccionarios
 def obtener_hogares():
-        ruta_hogares = Path(__file__).resolve().parent.parent.parent / "utils" / "HogaresTotal.csv"
+        ruta_hogares = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / "utils" / "HogaresTotal.csv")
         
         if not ruta_hogares.exists():
             print(f" No se encontró el archivo en: {ruta_hogares.resolve()}")
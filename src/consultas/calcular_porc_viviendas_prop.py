@@ -1,7 +1,13 @@
 import os
+import sys
 from pathlib import Path
 import csv
 
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src import publicacion
+
 from pathlib import Path
 import csv
 
@@ -65,7 +71,7 @@ def porcentaje_viviendas_propias_por_aglomerado(hogares, nombre_aglomerados):
 
 def obtener_hogares():
     """Lee el archivo de hogares y devuelve la lista de diccionarios"""
-    ruta_hogares = Path(__file__).resolve().parent.parent.parent / "utils" / "HogaresTotal.csv"
+    ruta_hogares = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / "utils" / "HogaresTotal.csv")
 
     if not ruta_hogares.exists():
         print(f" No se encontró el archivo en: {ruta_hogares.resolve()}")
@@ -1,6 +1,12 @@
 import csv
+import sys
 from pathlib import Path
 
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src import manifiesto, proyeccion, publicacion
+
 
 def cargar_datos(archivo_csv):
     """ Carga los datos desde un archivo CSV y devuelve una lista de diccionarios. """
@@ -12,13 +18,19 @@ def cargar_datos(archivo_csv):
     return datos
 
 
-def obtener_años_trimestres(datos):
+def obtener_años_trimestres(datos, archivo_csv=None):
     """
     Obtengo los años  y el último trimestre para cada año en los datos.
     Para devolver un diccionario donde las claves son los años y los valores
     son los últimos trimestres de cada año.
+    Si se pasa el archivo csv se leen del resumen que deja la ingesta, sin recorrer los datos.
     """
     año_trimestre = {}
+    periodos = manifiesto.periodos_del_csv(archivo_csv) if archivo_csv is not None else []
+    if periodos:
+        for año, trimestre in periodos:
+            año_trimestre[str(año)] = max(año_trimestre.get(str(año), 0), trimestre)
+        return año_trimestre
     for row in datos:
         año = row['ANO4']
         trimestre = int(row['TRIMESTRE'])
@@ -31,10 +43,12 @@ def obtener_años_trimestres(datos):
 def calcular_porcentajes_lectura():
     """ Calcula el porcentaje de personas capaces e incapaces de leer por año. """
     
-    archivo_csv = Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv"
-    datos = cargar_datos(archivo_csv)
+    archivo_csv = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv")
+    # Si la proyeccion del dashboard esta al dia se lee esa, que tiene muchas menos columnas
+    columnas = proyeccion.columnas_de("consulta_leer_escribir", "individuos")
+    datos = cargar_datos(proyeccion.ruta_lectura(archivo_csv, "individuos", columnas))
 
-    año_trimestre = obtener_años_trimestres(datos)
+    año_trimestre = obtener_años_trimestres(datos, archivo_csv)
     año_trimestreordenado = sorted(año_trimestre.items())
 
     años = []
@@ -1,8 +1,14 @@
+import sys
 from pathlib import Path
 from consulta_leer_escribir import obtener_años_trimestres
 from aglomerados_sin_baños import cargar_datos_hogares
 from mayores_nivel_ed import aglomerados_map
 
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src import publicacion
+
 def filtrar_datos_por_anio(list_dic_dataset, year):
     """ En 'datos_filtrados' voy a guardar los diccionarios que correspondan con el año ingresado por el ususario
         Para devolverlos en una lista[diccionarios]"""
@@ -60,7 +66,7 @@ def cant_precarius(year, list_dic_dataset):
 
 def precarious_percentage():
     """ calcula y muestra los porcentajes.  """
-    archivo_datos = Path(__file__).resolve().parent.parent.parent / 'utils' / 'HogaresTotal.csv'
+    archivo_datos = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / 'utils' / 'HogaresTotal.csv')
     
     list_dic_dataset = cargar_datos_hogares(archivo_datos)
     anio_trimestre = obtener_años_trimestres(list_dic_dataset)
@@ -4,7 +4,6 @@
 # AÑO = INPUT => TRIMESTRE == 4
 # PUNTO 13 PARTE B
 from pathlib import Path
-import csv
 import sys
 import os
 import importlib
@@ -15,52 +14,79 @@ importlib.reload(materialhogares)
 
 
 sys.path.append(os.path.abspath("../src"))
-ruta_hogares = Path("../utils/HogaresTotal.csv").resolve()
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+from src import base_sqlite, ids_hogares, manifiesto, publicacion
+
+# Csv de utils; se leen en la version publicada (ver src/publicacion.py)
+ruta_hogares = Path(__file__).resolve().parents[2] / "utils" / "HogaresTotal.csv"
+ruta_individuos = Path(__file__).resolve().parents[2] / "utils" / "IndividuosTotal.csv"
 
 NIVEL_EDUCATIVO = "CH12"
-CODIGO_RELACIONAL = 'CODUSU'
 
-def funciones_hogares():
-    with open(ruta_hogares, mode="r", encoding="utf-8") as archivo:
-        lector = csv.DictReader(archivo, delimiter=";")
-        hogares = list(lector)
-    headers = lector.fieldnames
+def funciones_hogares(periodo, carpeta=None):
+    # Solo las filas del periodo, con el indice del resumen del csv
+    hogares = list(manifiesto.filas_de_periodo(publicacion.ruta(ruta_hogares, carpeta), periodo))
     cond = "CONDICION_DE_HABITABILIDAD"
-    if not cond in headers:
+    if hogares and not cond in hogares[0]:
         materialhogares.material_techumbre(hogares)
         cond_hab.condicion_de_habitabilidad(hogares)
     return hogares  
 
 
 def hog_insu():
-    hogares = funciones_hogares()
     anio_usuario = input("Ingrese el año a buscar.")
     hogares_insuficientes = {}
-    ruta_individuos = Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv"
+    # Hogares e individuos de la misma version publicada
+    carpeta = publicacion.carpeta_actual()
 
-    # Primero detectar el trimestre más alto disponible
-    trimestres = []
-    for hogar in hogares:
-        if hogar["ANO4"] == anio_usuario:
-            trimestres.add(int(hogar["TRIMESTRE"]))  # guardamos como int para ordenar bien
+    # Primero detectar el trimestre más alto disponible (del resumen del csv)
+    trimestres = [trimestre for año, trimestre in manifiesto.periodos_del_csv(publicacion.ruta(ruta_hogares, carpeta))
+                  if str(año) == anio_usuario]
 
     if not trimestres:
         print(f"No hay datos para el año {anio_usuario}")
         return
 
     ultimo_trimestre = max(trimestres)
+    periodo = (int(anio_usuario), ultimo_trimestre)
 
-    for hogar in hogares:
-        if hogar['ANO4'] == anio_usuario and hogar['TRIMESTRE'] == str(ultimo_trimestre) and hogar['CONDICION_DE_HABITABILIDAD'] == 'Insuficiente':
-            clave = (hogar[CODIGO_RELACIONAL], hogar["NRO_HOGAR"])
-            hogares_insuficientes[clave] = True
+    for hogar in funciones_hogares(periodo, carpeta):
+        if hogar['CONDICION_DE_HABITABILIDAD'] == 'Insuficiente':
+            hogares_insuficientes[ids_hogares.clave_hogar(hogar)] = True
     contador = 0
-    with open(ruta_individuos, mode='r', encoding='utf-8') as archivo:
-        lector = csv.DictReader(archivo, delimiter=";")
-        for persona in lector:
-            if persona['ANO4'] == anio_usuario and persona['TRIMESTRE'] == str(ultimo_trimestre):
-                clave = (persona[CODIGO_RELACIONAL], persona["NRO_HOGAR"])
-                if clave in hogares_insuficientes and persona[NIVEL_EDUCATIVO] >= "7":
-                    contador += int(persona['PONDERA'])
+    for persona in manifiesto.filas_de_periodo(publicacion.ruta(ruta_individuos, carpeta), periodo):
+        if ids_hogares.clave_hogar(persona) in hogares_insuficientes and persona[NIVEL_EDUCATIVO] >= "7":
+            contador += int(persona['PONDERA'])
+
+    print(f"Cantidad de personas en viviendas con condición insuficiente y nivel universitario o superior: {contador}")
+
+
+def hog_insu_sqlite(anio_usuario=None):
+    """Igual que hog_insu() pero resuelto con SQL: el periodo se busca con el indice de
+        (ANO4, TRIMESTRE) y cada individuo se cruza con su hogar por el indice de
+        (CODUSU, NRO_HOGAR). Necesita la columna CONDICION_DE_HABITABILIDAD en hogares."""
+    if anio_usuario is None:
+        anio_usuario = input("Ingrese el año a buscar.")
+
+    ultimo_trimestre = None
+    if anio_usuario.isdigit():
+        ultimo_trimestre = base_sqlite.consultar(
+            "SELECT MAX(TRIMESTRE) FROM hogares WHERE ANO4 = ?", (int(anio_usuario),)
+        )[0][0]
+    if ultimo_trimestre is None:
+        print(f"No hay datos para el año {anio_usuario}")
+        return
+
+    contador = base_sqlite.consultar(f"""
+        SELECT SUM(CAST(i.PONDERA AS INTEGER))
+        FROM individuos i
+        WHERE i.ANO4 = ? AND i.TRIMESTRE = ? AND i.{NIVEL_EDUCATIVO} >= '7'
+          AND EXISTS (
+              SELECT 1 FROM hogares h
+              WHERE h.CODUSU = i.CODUSU AND h.NRO_HOGAR = i.NRO_HOGAR
+                AND h.ANO4 = i.ANO4 AND h.TRIMESTRE = i.TRIMESTRE
+                AND h.CONDICION_DE_HABITABILIDAD = 'Insuficiente'
+          )
+    """, (int(anio_usuario), ultimo_trimestre))[0][0] or 0
 
     print(f"Cantidad de personas en viviendas con condición insuficiente y nivel universitario o superior: {contador}")
@@ -1,5 +1,11 @@
 from pathlib import Path
 import csv
+import sys
+
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src import publicacion
 
 
 def aglomerados_map():
@@ -46,7 +52,7 @@ def planilla_mas18_con_aglomerado():
     según nivel educativo por aglomerado seleccionado.
     """
     planilla = {}
-    ruta_individuos = Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv"
+    ruta_individuos = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv")
     mapa_aglomerados = aglomerados_map()
 
     print("Aglomerados disponibles:")
@@ -1,5 +1,11 @@
 from pathlib import Path
 import csv
+import sys
+
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src import publicacion
 
 def aglomerados_map ():
     return {
@@ -39,7 +45,7 @@ def aglomerados_map ():
 
 #Lee el archivo de individuos y devuelve la lista de diccionarios
 def obtener_individuos():
-        ruta_individuos = Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv"
+        ruta_individuos = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv")
 
         if not ruta_individuos.exists():
             print(f" No se encontró el archivo en: {ruta_individuos.resolve()}")
@@ -1,13 +1,19 @@
 # PUNTO 3 PARTE B
 import csv
+import sys
 from pathlib import Path
 
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src import base_sqlite, publicacion
+
 ANIO_REGISTRO = 'ANO4'
 ESTADO_LABORAL = 'ESTADO'
 def menor_des():
     desocupacion = {}
 
-    ruta_individuos = Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv"
+    ruta_individuos = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / "utils" / "IndividuosTotal.csv")
 
     with open(ruta_individuos, mode='r', encoding='utf-8') as archivo:
         lector = csv.DictReader(archivo, delimiter=";")
@@ -38,3 +44,24 @@ def menor_des():
     resultado_min = min(resultados, key=lambda x: x['porcentaje_desocupacion'])
 
     print(f"El año {resultado_min['año']} y trimestre {resultado_min['trimestre']} tienen el menor porcentaje de desocupación: {int(resultado_min['porcentaje_desocupacion'])}%.")
+
+
+def menor_des_sqlite():
+    """Igual que menor_des() pero resuelto con SQL sobre la base SQLite de la ingesta.
+        Los grupos salen en el orden en que aparecen en el csv, asi un empate da el mismo periodo."""
+    filas = base_sqlite.consultar(f"""
+        SELECT ANO4, TRIMESTRE,
+               SUM(CASE WHEN {ESTADO_LABORAL} = '2' THEN CAST(PONDERA AS INTEGER) ELSE 0 END),
+               SUM(CAST(PONDERA AS INTEGER))
+        FROM individuos
+        GROUP BY ANO4, TRIMESTRE
+        ORDER BY MIN(rowid)
+    """)
+    resultados = [
+        {'año': anio, 'trimestre': trimestre, 'porcentaje_desocupacion': (desocupados / total) * 100}
+        for anio, trimestre, desocupados, total in filas
+    ]
+
+    resultado_min = min(resultados, key=lambda x: x['porcentaje_desocupacion'])
+
+    print(f"El año {resultado_min['año']} y trimestre {resultado_min['trimestre']} tienen el menor porcentaje de desocupación: {int(resultado_min['porcentaje_desocupacion'])}%.")
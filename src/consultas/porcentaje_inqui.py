@@ -4,10 +4,16 @@
 # PUNTO 8 PARTE B
 from pathlib import Path
 import csv
+import sys
+
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src import base_sqlite, publicacion
 
 
 def porcentaje_inqui():
-    ruta_hogares = Path(__file__).resolve().parent.parent.parent / "utils" / "HogaresTotal.csv"
+    ruta_hogares = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / "utils" / "HogaresTotal.csv")
 
     region_totales = {}
 
@@ -37,3 +43,21 @@ def porcentaje_inqui():
     region_porcentaje.sort(key=lambda x: x["porcentaje_inquilinos"], reverse=True) #me ordena de manera descendente los datos de region_porcentaje con el porcentaje como parametro.
     print(region_porcentaje)
 
+
+def porcentaje_inqui_sqlite():
+    """Igual que porcentaje_inqui() pero resuelto con SQL (usa el indice de REGION)"""
+    filas = base_sqlite.consultar("""
+        SELECT REGION,
+               SUM(CASE WHEN II7 = '3' THEN CAST(PONDERA AS INTEGER) ELSE 0 END),
+               SUM(CAST(PONDERA AS INTEGER))
+        FROM hogares
+        GROUP BY REGION
+        ORDER BY MIN(rowid)
+    """)
+    region_porcentaje = [
+        {'region': region, 'porcentaje_inquilinos': (inquilinos / total * 100)}
+        for region, inquilinos, total in filas
+    ]
+
+    region_porcentaje.sort(key=lambda x: x["porcentaje_inquilinos"], reverse=True)
+    print(region_porcentaje)
@@ -1,29 +1,22 @@
 from pathlib import Path
-import csv
+import sys
 from collections import defaultdict
 
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parents[2]))
+
+from src import base_sqlite, manifiesto, publicacion
+
 
 def max_ano_trimestre(ruta_hogares):
     """
     Encuentra el año y trimestre más reciente en el archivo de hogares.
+    Se toma del resumen HogaresTotal.json que deja la ingesta, sin recorrer el csv.
     """
-    max_ano = 0
-    max_trimestre = 0
-
-    try:
-        with open(ruta_hogares, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter=';')
-            for r in reader:
-                try:
-                    ano = int(r['ANO4'])
-                    trimestre = int(r['TRIMESTRE'])
-
-                    if ano > max_ano or (ano == max_ano and trimestre > max_trimestre):
-                        max_ano, max_trimestre = ano, trimestre
-                except ValueError:
-                    continue
-    except FileNotFoundError:
+    if not Path(ruta_hogares).exists():
         raise FileNotFoundError(f"No se encontró el archivo: {ruta_hogares}")
+    try:
+        max_ano, max_trimestre = max(manifiesto.periodos_del_csv(ruta_hogares), default=(0, 0))
     except Exception as e:
         raise RuntimeError(f"Error al leer el archivo de hogares: {e}")
 
@@ -33,26 +26,23 @@ def max_ano_trimestre(ruta_hogares):
 
 def cargar_individuos(ruta_individuos, ano, trimestre):
     """
-    Carga los datos de individuos ponderando según PONDERA.
+    Carga los datos de individuos ponderando según PONDERA, sumados por vivienda (CODUSU).
+    Con el indice del resumen del csv se leen solo las filas del trimestre.
     """
     individuos_dict = defaultdict(float)
 
-    try:
-        with open(ruta_individuos, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter=';')
-            for ind in reader:
-                try:
-                    if (int(ind['ANO4']) == ano and
-                        int(ind['TRIMESTRE']) == trimestre and
-                        ind.get('NIVEL_ED_str') == 'Superior o universitario'):
-
-                        codusu = ind['CODUSU']
-                        pondera = float(ind.get('PONDERA', '1'))
-                        individuos_dict[codusu] += pondera
-                except ValueError:
-                    continue
-    except FileNotFoundError:
+    if not Path(ruta_individuos).exists():
         raise FileNotFoundError(f"No se encontró el archivo: {ruta_individuos}")
+    try:
+        for ind in manifiesto.filas_de_periodo(ruta_individuos, (ano, trimestre)):
+            try:
+                if ind.get('NIVEL_ED_str') == 'Superior o universitario':
+
+                    codusu = ind['CODUSU']
+                    pondera = float(ind.get('PONDERA', '1'))
+                    individuos_dict[codusu] += pondera
+            except ValueError:
+                continue
     except Exception as e:
         raise RuntimeError(f"Error al leer el archivo de individuos: {e}")
 
@@ -62,28 +52,26 @@ def cargar_individuos(ruta_individuos, ano, trimestre):
 def procesar_hogares(ruta_hogares, ano, trimestre, individuos_dict):
     """
     Procesa los hogares ponderando por PONDERA y genera resultados por aglomerado.
+    Con el indice del resumen del csv se leen solo las filas del trimestre.
     """
     resultados = defaultdict(lambda: {'Total': 0.0, 'Tiene Superior': 0.0})
 
-    try:
-        with open(ruta_hogares, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file, delimiter=';')
-            for r in reader:
-                try:
-                    if int(r['ANO4']) == ano and int(r['TRIMESTRE']) == trimestre:
-                        aglomerado = r['AGLOMERADO']
-                        codusu = r['CODUSU']
-                        ix_tot = int(r['IX_TOT'])
-                        pondera = float(r.get('PONDERA', '1'))
-
-                        resultados[aglomerado]['Total'] += pondera
-
-                        if ix_tot >= 2 and individuos_dict.get(codusu, 0) >= 2:
-                            resultados[aglomerado]['Tiene Superior'] += pondera
-                except ValueError:
-                    continue
-    except FileNotFoundError:
+    if not Path(ruta_hogares).exists():
         raise FileNotFoundError(f"No se encontró el archivo: {ruta_hogares}")
+    try:
+        for r in manifiesto.filas_de_periodo(ruta_hogares, (ano, trimestre)):
+            try:
+                aglomerado = r['AGLOMERADO']
+                codusu = r['CODUSU']
+                ix_tot = int(r['IX_TOT'])
+                pondera = float(r.get('PONDERA', '1'))
+
+                resultados[aglomerado]['Total'] += pondera
+
+                if ix_tot >= 2 and individuos_dict.get(codusu, 0) >= 2:
+                    resultados[aglomerado]['Tiene Superior'] += pondera
+            except ValueError:
+                continue
     except Exception as e:
         raise RuntimeError(f"Error al leer el archivo de hogares: {e}")
 
@@ -118,11 +106,46 @@ def ranking_aglomerados_nivel_sup():
     """
     Función principal que coordina el cálculo del ranking.
     """
-    base_path = Path(__file__).resolve().parent.parent.parent / "utils"
+    # Se leen los datos publicados, asi no se cruzan con una actualizacion en curso
+    base_path = publicacion.ruta(Path(__file__).resolve().parent.parent.parent / "utils")
     ruta_individuos = base_path / "IndividuosTotal.csv"
     ruta_hogares = base_path / "HogaresTotal.csv"
 
     ano, trimestre = max_ano_trimestre(ruta_hogares)
     individuos_dict = cargar_individuos(ruta_individuos, ano, trimestre)
     resultados = procesar_hogares(ruta_hogares, ano, trimestre, individuos_dict)
-    return top5(resultados)
\ No newline at end of file
+    return top5(resultados)
+
+
+def ranking_aglomerados_nivel_sup_sqlite():
+    """
+    Igual que ranking_aglomerados_nivel_sup() pero resuelto con SQL sobre la base SQLite:
+    el trimestre se filtra con el indice de (ANO4, TRIMESTRE) y los hogares se cruzan con
+    los individuos de su vivienda por CODUSU (con el indice de (CODUSU, NRO_HOGAR)).
+    """
+    ultimo = base_sqlite.consultar("SELECT ANO4, TRIMESTRE FROM hogares ORDER BY ANO4 DESC, TRIMESTRE DESC LIMIT 1")
+    ano, trimestre = ultimo[0] if ultimo else (0, 0)
+    print(f"El año seleccionado fue {ano} y el trimestre fue {trimestre}")
+
+    filas = base_sqlite.consultar("""
+        WITH superior AS (
+            SELECT CODUSU, SUM(CAST(PONDERA AS REAL)) AS personas
+            FROM individuos
+            WHERE ANO4 = :ano AND TRIMESTRE = :trimestre AND NIVEL_ED_str = 'Superior o universitario'
+            GROUP BY CODUSU
+        )
+        SELECT h.AGLOMERADO,
+               SUM(CAST(h.PONDERA AS REAL)),
+               SUM(CASE WHEN CAST(h.IX_TOT AS INTEGER) >= 2 AND COALESCE(s.personas, 0) >= 2
+                        THEN CAST(h.PONDERA AS REAL) ELSE 0.0 END)
+        FROM hogares h
+        LEFT JOIN superior s ON s.CODUSU = h.CODUSU
+        WHERE h.ANO4 = :ano AND h.TRIMESTRE = :trimestre
+        GROUP BY h.AGLOMERADO
+        ORDER BY MIN(h.rowid)
+    """, {"ano": ano, "trimestre": trimestre})
+    resultados = {
+        aglomerado: {'Total': total, 'Tiene Superior': superior}
+        for aglomerado, total, superior in filas
+    }
+    return top5(resultados)
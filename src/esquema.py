@@ -0,0 +1,199 @@
+import numpy as np
+import pandas as pd
+
+# Tipos compactos de las columnas de la EPH y de las columnas que agregamos.
+# Los codigos se guardan como enteros chicos, los ponderadores y el ID_HOGAR como int32, los ingresos
+# como float64 y las etiquetas de texto como categorias. Las columnas que no figuran
+# quedan con el tipo que infiera pandas.
+CODIGO = "int8"
+CODIGO_LARGO = "int16"
+PONDERADOR = "int32"
+IDENTIFICADOR = "int32"
+INGRESO = "float64"
+ETIQUETA = "category"
+
+# Texto que se pone en los campos vacios durante la limpieza
+SIN_INFORMACION = "sin información"
+
+COMUNES = {
+    "ID_HOGAR": IDENTIFICADOR,
+    "ANO4": CODIGO_LARGO,
+    "TRIMESTRE": CODIGO,
+    "NRO_HOGAR": CODIGO,
+    "REGION": CODIGO,
+    "MAS_500": ETIQUETA,
+    "AGLOMERADO": CODIGO,
+    "PONDERA": PONDERADOR,
+    "ITF": INGRESO,
+    "IPCF": INGRESO,
+    "DECIFR": CODIGO,
+    "IDECIFR": CODIGO,
+    "RDECIFR": CODIGO,
+    "GDECIFR": CODIGO,
+    "PDECIFR": CODIGO,
+    "ADECIFR": CODIGO,
+    "DECCFR": CODIGO,
+    "IDECCFR": CODIGO,
+    "RDECCFR": CODIGO,
+    "GDECCFR": CODIGO,
+    "PDECCFR": CODIGO,
+    "ADECCFR": CODIGO,
+}
+
+ESQUEMA_HOGARES = {
+    **COMUNES,
+    "REALIZADA": CODIGO,
+    **{f"IV{i}": CODIGO for i in range(1, 12)},
+    "IV12_1": CODIGO,
+    "IV12_2": CODIGO,
+    "IV12_3": CODIGO,
+    "II1": CODIGO,
+    "II2": CODIGO,
+    "II3": CODIGO,
+    "II3_1": CODIGO,
+    "II4_1": CODIGO,
+    "II4_2": CODIGO,
+    "II4_3": CODIGO,
+    "II5": CODIGO,
+    "II5_1": CODIGO,
+    "II6": CODIGO,
+    "II6_1": CODIGO,
+    "II7": CODIGO,
+    "II8": CODIGO,
+    "II9": CODIGO,
+    "IX_TOT": CODIGO,
+    "IX_MEN10": CODIGO,
+    "IX_MAYEQ10": CODIGO,
+    "PONDIH": PONDERADOR,
+    # Columnas agregadas en src/funciones
+    "TIPO_HOGAR": ETIQUETA,
+    "MATERIAL_TECHUMBRE": ETIQUETA,
+    "DENSIDAD_HOGAR": ETIQUETA,
+    "CONDICION_DE_HABITABILIDAD": ETIQUETA,
+}
+
+ESQUEMA_INDIVIDUOS = {
+    **COMUNES,
+    "COMPONENTE": CODIGO,
+    "H15": CODIGO,
+    "CH03": CODIGO,
+    "CH04": CODIGO,
+    "CH06": CODIGO,
+    "CH07": CODIGO,
+    "CH08": CODIGO,
+    "CH09": CODIGO,
+    "CH10": CODIGO,
+    "CH11": CODIGO,
+    "CH12": CODIGO,
+    "CH13": CODIGO,
+    "CH14": CODIGO,
+    "CH15": CODIGO,
+    "CH15_COD": CODIGO_LARGO,
+    "CH16": CODIGO,
+    "CH16_COD": CODIGO_LARGO,
+    "NIVEL_ED": CODIGO,
+    "ESTADO": CODIGO,
+    "CAT_OCUP": CODIGO,
+    "CAT_INAC": CODIGO,
+    "IMPUTA": CODIGO,
+    # PP04A se compara como texto en funciones_streamlit/empleo.py
+    "PP04A": ETIQUETA,
+    "P21": INGRESO,
+    "P47T": INGRESO,
+    "TOT_P12": INGRESO,
+    "DECOCUR": CODIGO,
+    "DECINDR": CODIGO,
+    "PONDII": PONDERADOR,
+    "PONDIIO": PONDERADOR,
+    "PONDERA_IPCF": PONDERADOR,
+    # Columnas agregadas en src/funciones
+    "CH04_str": ETIQUETA,
+    "NIVEL_ED_str": ETIQUETA,
+    "CONDICION_LABORAL": ETIQUETA,
+    "UNIVERSITARIO": CODIGO,
+}
+
+ESQUEMAS = {"hogares": ESQUEMA_HOGARES, "individuos": ESQUEMA_INDIVIDUOS}
+
+# Tipo que admite nulos para cada entero (se usa cuando la columna tiene faltantes)
+ENTERO_CON_NULOS = {"int8": "Int8", "int16": "Int16", "int32": "Int32"}
+
+
+def tipos(entidad, columnas=None):
+    """Devuelve {columna: tipo} del esquema de la entidad, solo para las columnas pedidas"""
+    esquema = ESQUEMAS[entidad]
+    if columnas is None:
+        return dict(esquema)
+    return {columna: esquema[columna] for columna in columnas if columna in esquema}
+
+
+def opciones_read_csv(entidad, columnas=None):
+    """Devuelve los argumentos dtype y na_values para leer un csv con pd.read_csv.
+        Las etiquetas se leen directo como categorias; las columnas numericas se leen como
+        las infiera el parser (con 'sin información' como nulo) y despues aplicar_esquema las
+        pasa a su tipo, que es mucho mas rapido que pedirle al parser enteros con nulos."""
+    dtype = {}
+    na_values = {}
+    for columna, tipo in tipos(entidad, columnas).items():
+        if tipo == ETIQUETA:
+            dtype[columna] = ETIQUETA
+        else:
+            na_values[columna] = [SIN_INFORMACION]
+    return {"dtype": dtype, "na_values": na_values}
+
+
+def convertir_columna(serie, tipo):
+    """Convierte una columna al tipo del esquema. Los valores que no son numeros en una
+        columna numerica quedan como nulos."""
+    if tipo == ETIQUETA:
+        if pd.api.types.is_numeric_dtype(serie):
+            # Codigos que el parser leyo como numero (ej. PP04A): se pasan a texto como en el csv
+            try:
+                enteros = serie.astype("Int64")
+                serie = enteros.astype(str).where(enteros.notna())
+            except (TypeError, ValueError):
+                serie = serie.astype(str).where(serie.notna())
+        return serie.astype(ETIQUETA)
+    if tipo == INGRESO and serie.dtype == object:
+        # Algunos txt de la EPH usan coma decimal
+        serie = serie.str.replace(",", ".", regex=False)
+    numerica = pd.to_numeric(serie, errors="coerce")
+    if tipo == INGRESO:
+        return numerica.astype(INGRESO)
+    rango = np.iinfo(tipo)
+    if numerica.min() < rango.min or numerica.max() > rango.max:
+        raise OverflowError(f"{serie.name} tiene valores fuera de rango para {tipo}")
+    if (numerica.dropna() % 1 != 0).any():
+        raise ValueError(f"{serie.name} tiene valores con decimales")
+    if numerica.isna().any():
+        return numerica.astype(ENTERO_CON_NULOS[tipo])
+    return numerica.astype(tipo)
+
+
+def aplicar_esquema(df, entidad):
+    """Convierte las columnas del DataFrame que figuran en el esquema de la entidad a su tipo
+        compacto. Si la columna ya tiene el tipo se deja como esta."""
+    for columna, tipo in tipos(entidad, df.columns).items():
+        actual = df[columna].dtype
+        if str(actual) in (tipo, ENTERO_CON_NULOS.get(tipo)):
+            continue
+        try:
+            df[columna] = convertir_columna(df[columna], tipo)
+        except (TypeError, ValueError, OverflowError):
+            # Valores fuera de rango o con decimales: se deja la columna como estaba
+            print(f"⚠️ No se pudo convertir la columna {columna} a {tipo}")
+    return df
+
+
+def leer_csv(ruta, entidad, columnas=None, **kwargs):
+    """Lee un csv consolidado aplicando el esquema de la entidad"""
+    usar = None if columnas is None else (lambda col: col in columnas)
+    df = pd.read_csv(ruta, sep=";", usecols=usar, low_memory=False, **opciones_read_csv(entidad, columnas), **kwargs)
+    return aplicar_esquema(df, entidad)
+
+
+def orden_columnas(claves):
+    """Orden de las columnas en los csv consolidados: alfabetico, como se guardaron siempre.
+        Todos los csv de una entidad usan el mismo orden, asi las filas nuevas se pueden
+        agregar al final sin reescribir el encabezado."""
+    return sorted(set(claves))
@@ -0,0 +1,299 @@
+import csv
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import sys
+import time
+
+from utils.constantes import ETAPAS_PATH
+from src import esquema, publicacion, rendimiento
+from src.registro import Registro, leer_registros, tabla
+
+
+# El procesamiento de las filas de cada zip es un grafo de etapas: primero la base (las filas
+# del txt limpias) y despues cada funcion de src/funciones, que agrega sus columnas a partir de
+# la base y de las columnas de las etapas de las que depende. La salida de cada etapa se guarda
+# en etapas/<entidad>/<etapa>.<clave>.csv, donde la clave es un hash del zip, del codigo de la
+# etapa y de las claves de sus dependencias. Si se edita una funcion solo cambian las claves de
+# su etapa y de las que dependen de ella: esas se vuelven a calcular y las demas se toman de
+# aca, sin volver a abrir el zip. La base guarda las filas completas y las demas etapas solo
+# las columnas que agregan (por eso cada etapa declara sus columnas y no puede modificar otras).
+# Como cada salida se guarda apenas se calcula, si la ingesta se corta (un zip dañado, falta de
+# memoria) la proxima corrida retoma desde aca los zips que ya estaban procesados.
+
+REUTILIZADA = "reutilizada"
+CALCULADA = "calculada"
+INFORME = ETAPAS_PATH / "informe.json"
+
+
+def nombres_usados(codigo):
+    """Nombres globales que usa el codigo, incluidos los de sus comprensiones y funciones internas"""
+    nombres = set(codigo.co_names)
+    for constante in codigo.co_consts:
+        if inspect.iscode(constante):
+            nombres |= nombres_usados(constante)
+    return nombres
+
+
+def version_codigo(funcion):
+    """Hash del codigo de la funcion, de las funciones de su mismo modulo que llama y de las
+        constantes del modulo que usa: si se edita cualquiera de ellas cambia la version"""
+    h = hashlib.sha256()
+    pendientes, vistas = [funcion], set()
+    while pendientes:
+        actual = pendientes.pop()
+        if actual in vistas:
+            continue
+        vistas.add(actual)
+        h.update(inspect.getsource(actual).encode("utf-8"))
+        for nombre in sorted(nombres_usados(actual.__code__)):
+            valor = actual.__globals__.get(nombre)
+            if inspect.isfunction(valor) and valor.__module__ == actual.__module__:
+                pendientes.append(valor)
+            elif isinstance(valor, (str, int, float, tuple)):
+                h.update(f"{nombre}={valor!r}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def hash_json(datos):
+    return hashlib.sha256(json.dumps(datos, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def columnas_filas(filas):
+    """Columnas de las filas; si son Registro, todas las de su encabezado"""
+    if not filas:
+        return set()
+    if filas[0].__class__ is Registro:
+        return set(filas[0].encabezado.columnas)
+    return set(filas[0])
+
+
+def guardar_filas(destino, filas):
+    """Guarda las filas completas de la base en un csv. Se escriben en un temporal que despues
+        se renombra, asi un corte a mitad de camino no deja un archivo incompleto. Devuelve
+        False (sin escribir nada) si las filas traen valores sin nombre de columna."""
+    columnas_valores = tabla(filas)
+    if columnas_valores is not None:
+        columnas, valores = columnas_valores
+    else:
+        columnas = {clave for fila in filas for clave in fila}
+        if None not in columnas:
+            columnas = esquema.orden_columnas(columnas)
+        valores = ([fila.get(columna, "") for columna in columnas] for fila in filas)
+    if None in columnas:
+        return False
+
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporal = destino.with_name(f".tmp_{destino.name}")
+    with open(temporal, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        if filas:
+            writer.writerow(columnas)
+            writer.writerows(valores)
+    os.replace(temporal, destino)
+    return True
+
+
+def leer_filas(origen):
+    """Devuelve las filas (Registro) de un csv escrito con guardar_filas()"""
+    with open(origen, mode="r", newline="", encoding="utf-8") as f:
+        return list(leer_registros(csv.reader(f, delimiter=";")))
+
+
+def guardar_columnas(destino, filas, columnas):
+    """Guarda solo las columnas que agrego una etapa, una fila por fila de la base"""
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    temporal = destino.with_name(f".tmp_{destino.name}")
+    with open(temporal, mode="w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(columnas)
+        writer.writerows(zip(*([fila.get(columna, "") for fila in filas] for columna in columnas)))
+    os.replace(temporal, destino)
+
+
+def agregar_columnas(filas, origen):
+    """Agrega a las filas las columnas guardadas por guardar_columnas. Los valores vacios no se
+        agregan, como cuando la funcion no le pone la clave a una fila. Devuelve False (sin
+        cambiar las filas) si el archivo no tiene una fila por cada fila de la base."""
+    with open(origen, mode="r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=";")
+        columnas = next(reader, [])
+        valores = list(reader)
+    if len(valores) != len(filas):
+        return False
+    encabezado = filas[0].encabezado if filas and filas[0].__class__ is Registro else None
+    for indice, columna in enumerate(columnas):
+        posicion = encabezado.agregar(columna) if encabezado is not None else None
+        for fila, valores_fila in zip(filas, valores):
+            valor = valores_fila[indice]
+            if valor == "":
+                continue
+            valor = sys.intern(valor)
+            # Si el Registro termina justo antes de la columna se agrega el valor directamente
+            if posicion is not None and fila.__class__ is Registro and fila.encabezado is encabezado \
+                    and len(fila.valores) == posicion:
+                fila.valores.append(valor)
+            else:
+                fila[columna] = valor
+    return True
+
+
+class Grafo:
+    """Etapas con que se procesan las filas de un txt (hogares o individuos) de cada zip.
+        Se llama como una funcion (grafo(filas)) para procesar sin guardar nada, o con
+        ejecutar() para reutilizar las etapas guardadas."""
+
+    def __init__(self, entidad, etapas):
+        """
+        Args:
+            entidad (str): "hogares" o "individuos"
+            etapas (list[tuple]): (nombre, funcion, columnas que agrega, dependencias) en un
+                orden en que cada etapa esta despues de sus dependencias. La primera es la base:
+                no tiene dependencias y su salida son las filas completas (columnas None).
+        """
+        nombres = set()
+        for posicion, (nombre, _, columnas, dependencias) in enumerate(etapas):
+            if (posicion == 0) != (columnas is None) or (posicion == 0) == bool(dependencias):
+                raise ValueError(f"La etapa {nombre} tiene que ser la base (la primera, sin dependencias ni columnas) o declarar sus columnas y dependencias")
+            if not nombres.issuperset(dependencias):
+                raise ValueError(f"La etapa {nombre} depende de etapas que no estan antes: {sorted(set(dependencias) - nombres)}")
+            nombres.add(nombre)
+        self.entidad = entidad
+        self.etapas = etapas
+        # La base tambien depende de como se leen los txt
+        self.versiones = {nombre: version_codigo(funcion) for nombre, funcion, _, _ in etapas}
+        self.versiones[etapas[0][0]] = hash_json([self.versiones[etapas[0][0]], version_codigo(leer_registros)])
+        self.version = hash_json([[nombre, self.versiones[nombre], columnas, list(dependencias)]
+                                  for nombre, _, columnas, dependencias in etapas])
+
+    def __call__(self, filas):
+        for nombre, funcion, _, _ in self.etapas:
+            with rendimiento.medir(nombre, self.entidad, len(filas)):
+                funcion(filas)
+
+    def claves(self, hash_zip):
+        """{etapa: clave} de las salidas de cada etapa para el zip"""
+        claves = {}
+        for nombre, _, columnas, dependencias in self.etapas:
+            origen = [claves[dependencia] for dependencia in dependencias] or [hash_zip]
+            claves[nombre] = hash_json([nombre, self.versiones[nombre], columnas, origen])
+        return claves
+
+    def ruta(self, nombre, clave):
+        return ETAPAS_PATH / self.entidad / f"{nombre}.{clave[:32]}.csv"
+
+    def base_guardada(self, hash_zip):
+        """Indica si la base del zip esta guardada (entonces no hace falta abrir el zip)"""
+        nombre = self.etapas[0][0]
+        return self.ruta(nombre, self.claves(hash_zip)[nombre]).exists()
+
+    def ejecutar(self, hash_zip, filas=None):
+        """Procesa las filas de un zip calculando solo las etapas que no estan guardadas.
+
+        Args:
+            hash_zip (str): hash del zip (ver manifiesto.huella_zip)
+            filas (list): filas del txt sin procesar, o None si la base esta guardada
+
+        Returns:
+            tuple: (filas procesadas, {etapa: REUTILIZADA o CALCULADA})
+        """
+        claves = self.claves(hash_zip)
+        estados = {}
+        (base, procesar_base, _, _), *derivadas = self.etapas
+        ruta_base = self.ruta(base, claves[base])
+        # Cada etapa se mide en el informe de rendimiento (ver src/rendimiento.py); leer una
+        # salida guardada se mide aparte, como "<etapa> (reutilizada)"
+        if filas is None:
+            with rendimiento.medir(f"{base} ({REUTILIZADA})", self.entidad) as medicion:
+                filas = leer_filas(ruta_base)
+                medicion["filas"] = len(filas)
+            estados[base] = REUTILIZADA
+        else:
+            with rendimiento.medir(base, self.entidad, len(filas)):
+                procesar_base(filas)
+            with rendimiento.medir("guardar_etapas", self.entidad, len(filas)):
+                guardar_filas(ruta_base, filas)
+            estados[base] = CALCULADA
+
+        for nombre, funcion, columnas, _ in derivadas:
+            destino = self.ruta(nombre, claves[nombre])
+            if destino.exists():
+                with rendimiento.medir(f"{nombre} ({REUTILIZADA})", self.entidad, len(filas)):
+                    reutilizada = agregar_columnas(filas, destino)
+                if reutilizada:
+                    estados[nombre] = REUTILIZADA
+                    continue
+            previas = columnas_filas(filas)
+            with rendimiento.medir(nombre, self.entidad, len(filas)):
+                funcion(filas)
+            sobrantes = columnas_filas(filas) - previas - set(columnas)
+            if sobrantes:
+                raise ValueError(f"La etapa {nombre} agrega columnas que no declara: {sorted(sobrantes)}")
+            with rendimiento.medir("guardar_etapas", self.entidad, len(filas)):
+                guardar_columnas(destino, filas, columnas)
+            estados[nombre] = CALCULADA
+        return filas, estados
+
+    def vigentes(self, hashes_zips):
+        """Archivos de las etapas de los zips dados (los demas ya no se usan)"""
+        return {
+            self.ruta(nombre, clave)
+            for hash_zip in hashes_zips
+            for nombre, clave in self.claves(hash_zip).items()
+        }
+
+
+def version(procesar):
+    """Version del codigo con que se procesan las filas, o None si no es un Grafo"""
+    return procesar.version if isinstance(procesar, Grafo) else None
+
+
+def limpiar(grafo, hashes_zips):
+    """Borra las salidas de etapas de la entidad que no corresponden a los zips dados con el
+        codigo actual (de zips que ya no estan o de versiones anteriores de las funciones)"""
+    carpeta = ETAPAS_PATH / grafo.entidad
+    if not carpeta.exists():
+        return
+    vigentes = grafo.vigentes(hashes_zips)
+    for archivo in carpeta.iterdir():
+        if archivo not in vigentes:
+            if archivo.is_dir():
+                shutil.rmtree(archivo)
+            else:
+                os.remove(archivo)
+
+
+def informar(entidad, zips):
+    """Muestra cuantas etapas se reutilizaron y cuales se calcularon"""
+    if not zips:
+        return
+    calculadas = {}
+    reutilizadas = 0
+    for datos in zips.values():
+        for nombre, estado in datos["etapas"].items():
+            if estado == CALCULADA:
+                calculadas[nombre] = calculadas.get(nombre, 0) + 1
+            else:
+                reutilizadas += 1
+    detalle = ", ".join(f"{nombre} x{cantidad}" for nombre, cantidad in calculadas.items()) or "ninguna"
+    print(f"♻️ {entidad}: {reutilizadas} etapas reutilizadas, {sum(calculadas.values())} calculadas ({detalle}).")
+
+
+def guardar_informe(entidades):
+    """Guarda en etapas/informe.json que etapas se reutilizaron y cuales se calcularon en la
+        ultima ingesta, por zip.
+
+    Args:
+        entidades (dict): {entidad: {zip: {"periodo", "cargado" (si se abrio el zip), "etapas"}}}
+    """
+    ETAPAS_PATH.mkdir(parents=True, exist_ok=True)
+    informe = {"fecha": time.time(), "entidades": {}}
+    for entidad, zips in entidades.items():
+        totales = {}
+        for datos in zips.values():
+            for nombre, estado in datos["etapas"].items():
+                totales.setdefault(nombre, {REUTILIZADA: 0, CALCULADA: 0})[estado] += 1
+        informe["entidades"][entidad] = {"zips": zips, "totales": totales}
+    publicacion.guardar_json(INFORME, informe)
@@ -0,0 +1,127 @@
+import time
+
+import streamlit as st
+
+from src import rendimiento, trabajos
+from src.funciones_streamlit.funciones_en_comun import pedir_precarga, precargar_pendientes
+
+# Trabajo de actualizacion que inicio esta sesion (ver src/trabajos.py)
+CLAVE_TRABAJO = "trabajo_actualizacion"
+
+# Texto de cada etapa que informa la ingesta (ver src/avance.py)
+ETAPAS = {
+    "esperando turno": "Esperando que termine otra actualizacion...",
+    "planificar": "Buscando zips nuevos o modificados...",
+    "zips": "Procesando trimestres...",
+    "filas": "Procesando trimestres...",
+    "escritura": "Escribiendo los archivos...",
+    "sqlite": "Cargando la base SQLite...",
+    "publicar": "Publicando la version nueva...",
+}
+
+
+def panel_actualizacion():
+    """Boton "Actualizar" y avance de la actualizacion en curso (la de cualquier sesion).
+        La actualizacion corre en un proceso aparte: la pagina no espera a que termine."""
+    if st.button("Actualizar"):
+        st.session_state[CLAVE_TRABAJO] = trabajos.iniciar()
+    id_trabajo = trabajos.en_curso() or st.session_state.get(CLAVE_TRABAJO)
+    if id_trabajo is None:
+        return
+    corriendo = trabajos.leer(id_trabajo).get("estado") == trabajos.EN_CURSO
+    # Mientras corre, solo esta parte de la pagina se vuelve a ejecutar cada segundo
+    st.fragment(avance_trabajo, run_every=1 if corriendo else None)(id_trabajo, corriendo)
+
+
+def avance_trabajo(id_trabajo, corriendo):
+    trabajo = trabajos.leer(id_trabajo)
+    estado = trabajo.get("estado")
+    if corriendo and estado != trabajos.EN_CURSO:
+        if estado == trabajos.TERMINADO and trabajo.get("version"):
+            # Precarga de las paginas sin hacer esperar a la sesion
+            pedir_precarga(trabajo["version"])
+            precargar_pendientes()
+        # Se vuelve a ejecutar toda la pagina para mostrar los datos nuevos y dejar de consultar
+        st.rerun()
+
+    datos = trabajo.get("avance", {})
+    zips = datos.get("zips", {})
+    if estado == trabajos.EN_CURSO:
+        texto = ETAPAS.get(trabajo.get("etapa"), "Actualizando...")
+        if zips.get("total"):
+            st.progress(zips["hechos"] / zips["total"], text=f"{texto} ({zips['hechos']} de {zips['total']} zips)")
+        else:
+            st.progress(0, text=texto)
+    elif estado == trabajos.TERMINADO:
+        st.success(f"✅ Actualizacion terminada en {trabajo['fin'] - trabajo['inicio']:.0f} segundos.")
+    elif estado == trabajos.CANCELADO:
+        st.warning("⚠️ La actualizacion se cancelo; se siguen mostrando los datos anteriores.")
+    else:
+        st.error(f"⚠️ No se pudo actualizar: {trabajo.get('error', 'error desconocido')}")
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Zips procesados", f"{zips.get('hechos', 0)} / {zips.get('total', datos.get('planificar', {}).get('pendientes', 0))}")
+    col2.metric("Filas procesadas", f"{sum(datos.get('filas', {}).values()):,}")
+    col3.metric("MB escritos", f"{sum(datos.get('escritura', {}).values()) / 1024 / 1024:.1f}")
+    col4.metric("Tiempo", f"{trabajo.get('fin', time.time()) - trabajo.get('inicio', time.time()):.0f} s")
+
+    if estado == trabajos.EN_CURSO:
+        if trabajos.ruta_cancelar(id_trabajo).exists():
+            st.caption("Cancelando...")
+        elif st.button("Cancelar", key=f"cancelar_{id_trabajo}"):
+            trabajos.cancelar(id_trabajo)
+    with st.expander("Detalle de la actualizacion"):
+        st.code("\n".join(trabajos.salida(id_trabajo)) or "Sin mensajes todavia.", language=None)
+
+
+def mostrar_rendimiento():
+    """Informe de rendimiento de la ultima ingesta: tiempo, filas por segundo y memoria de cada
+        etapa (ver src/rendimiento.py), y el tiempo total de las anteriores"""
+    corridas = rendimiento.corridas()
+    if not corridas:
+        return
+    ultima = corridas[-1]
+    fecha = time.strftime("%d/%m/%Y %H:%M", time.localtime(ultima["inicio"]))
+    with st.expander(f"Rendimiento de la ultima actualizacion ({fecha}, {ultima['tiempo']:.1f} s)"):
+        if not ultima["completa"]:
+            st.warning("⚠️ La ultima actualizacion no termino (se cancelo o fallo); se muestra hasta donde llego.")
+        etapas = sorted(ultima["etapas"], key=lambda datos: datos["tiempo"], reverse=True)
+        st.dataframe(
+            [
+                {
+                    "Etapa": datos["etapa"],
+                    "Entidad": datos["entidad"] or "",
+                    "Veces": datos["llamadas"],
+                    "Tiempo (s)": datos["tiempo"],
+                    "CPU (s)": datos["cpu"],
+                    "Filas": datos["filas"],
+                    "Filas/s": datos["filas_por_segundo"],
+                    "Pico de memoria (MB)": datos["pico_mb"],
+                    "Aumento del pico RSS (MB)": datos["aumento_rss_mb"],
+                }
+                for datos in etapas
+            ],
+            hide_index=True,
+        )
+        detalle = f"CPU del proceso: {ultima['cpu']:.1f} s."
+        if ultima.get("pico_rss_mb") is not None:
+            detalle += f" Pico de memoria del proceso: {ultima['pico_rss_mb']:.0f} MB."
+        if not ultima["memoria_medida"]:
+            detalle += " El pico de memoria de cada etapa se mide con MEDIR_MEMORIA_INGESTA (utils/constantes.py)."
+        st.caption(detalle)
+        if len(corridas) > 1:
+            st.markdown("**Actualizaciones anteriores**")
+            st.dataframe(
+                [
+                    {
+                        "Fecha": time.strftime("%d/%m/%Y %H:%M", time.localtime(corrida["inicio"])),
+                        "Tiempo (s)": corrida["tiempo"],
+                        "Filas leidas de los zips": sum(
+                            datos["filas"] for datos in corrida["etapas"] if datos["etapa"] == "leer_zip"
+                        ),
+                        "Completa": "Si" if corrida["completa"] else "No",
+                    }
+                    for corrida in reversed(corridas)
+                ],
+                hide_index=True,
+            )
@@ -1,6 +1,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 from . import funciones_en_comun as fc
+from src import proyeccion
 import streamlit as st
 
 
@@ -9,7 +10,7 @@ def cargar_csv(ruta):
     Carga un DataFrame a traves de una funcion donde le envio las columnas relevantes y la ruta del archivo
     Luego verifico que se encuentren las columnas y elimino filas incompletas.
     """
-    columnas = ["ANO4", "TRIMESTRE", "CH06", "CH04_str", "PONDERA", "AGLOMERADO"]
+    columnas = proyeccion.columnas_de("demografia", "individuos")
     df = fc.crear_dataframe (ruta, columnas)
     if df is None:
         return None
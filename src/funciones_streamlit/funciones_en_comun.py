@@ -1,54 +1,258 @@
 from pathlib import Path
 import sys
 import os
+import io
+import threading
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import pandas as pd
 import matplotlib.pyplot as plt
 
 # Agrega la ruta al módulo utils
 sys.path.append(os.path.abspath("../code"))
 
-from utils.constantes import UTILS_PATH, HOGARES_CSV
+from utils.constantes import UTILS_PATH, HOGARES_CSV, INDIVIDUOS_CSV, CACHE_COLUMNAS_PATH, ALMACEN_PATH, VIGILAR_DATOS
+from utils.constantes import MEMORIA_COMPARTIDA
 from utils.constantes import NOMBRES_AGLOMERADOS
-
-@st.cache_data
-def crear_dataframe(archivo_csv, columnas=None):
+from src import almacen_columnar, cache_columnas, esquema, manifiesto, memoria_compartida, proyeccion, publicacion, vigilancia
+from src.funciones_streamlit import particiones
+
+# Csv de cada entidad y paginas cuyo DataFrame se precarga al publicarse una version nueva
+# (Educacion e Ingresos cargan un año o trimestre a la vez; de esas paginas se precargan los
+# periodos disponibles)
+CSV_POR_ENTIDAD = {"hogares": HOGARES_CSV, "individuos": INDIVIDUOS_CSV}
+PAGINAS_PRECARGADAS = ["demografia", "vivienda", "empleo"]
+
+
+# Versiones publicadas cuyas paginas falta precargar. Se publican desde hilos sin contexto de
+# Streamlit (la vigilancia de la carpeta data), donde no se pueden usar los st.cache_data:
+# la precarga la arranca la proxima ejecucion de una pagina (ver precargar_pendientes)
+precargas_pendientes = set()
+candado_precargas = threading.Lock()
+# Marca el hilo de la precarga, que no muestra advertencias en ninguna pagina (ver advertir)
+precarga = threading.local()
+
+
+def pedir_precarga(version):
+    """Anota la version publicada para que la precargue la proxima ejecucion de una pagina.
+        Se puede llamar desde cualquier hilo."""
+    with candado_precargas:
+        precargas_pendientes.add(version)
+
+
+def precargar_pendientes():
+    """Si hay una version por precargar y es la publicada, la precarga en un hilo con el
+        contexto de esta ejecucion, asi la pagina no la espera"""
+    contexto = get_script_run_ctx()
+    if contexto is None or not precargas_pendientes:
+        return
+    with candado_precargas:
+        versiones = set(precargas_pendientes)
+        precargas_pendientes.clear()
+    version = publicacion.version_actual()
+    if version in versiones:
+        hilo = threading.Thread(target=precargar, args=(version,), daemon=True)
+        add_script_run_ctx(hilo, contexto)
+        hilo.start()
+
+
+def precargar(version):
+    """Arma en el cache de Streamlit los DataFrames de las paginas para la version publicada,
+        asi el primer usuario que entra despues de una actualizacion no espera la carga.
+        Las entradas de la version anterior no se borran: salen solas del cache.
+        Con MEMORIA_COMPARTIDA los DataFrames ya los tiene el proceso cargador, asi que solo
+        se precargan los periodos. Se ejecuta en un hilo con el contexto de una pagina (ver
+        precargar_pendientes); los problemas que encuentre se registran sin mostrarse."""
+    precarga.activa = True
+    try:
+        if not MEMORIA_COMPARTIDA:
+            for pagina in PAGINAS_PRECARGADAS:
+                for entidad, columnas in proyeccion.COLUMNAS_USADAS[pagina].items():
+                    leer_dataframe(CSV_POR_ENTIDAD[entidad], list(columnas), None, version)
+        for archivo_csv in CSV_POR_ENTIDAD.values():
+            leer_periodos(archivo_csv, version)
+    finally:
+        precarga.activa = False
+    print(f"✅ Paginas precargadas con la version {version}.")
+
+
+def advertir(mensaje):
+    """Muestra la advertencia en la pagina, o solo la registra si se esta precargando"""
+    if getattr(precarga, "activa", False):
+        print(mensaje)
+        return
+    st.warning(mensaje)
+
+
+@st.cache_resource(show_spinner=False)
+def iniciar_vigilancia():
+    """Inicia una sola vez por servidor el hilo que ingiere los zips nuevos de la carpeta data
+        (ver src/vigilancia.py) y pide precargar las paginas con cada version que publica"""
+    if not VIGILAR_DATOS:
+        return None
+    return vigilancia.iniciar(al_publicar=pedir_precarga)
+
+
+def crear_dataframe(archivo_csv, columnas=None, periodos=None):
+    """
+    Crea un DataFrame a partir de un archivo CSV ubicado en UTILS_PATH, leyendo siempre la
+    version publicada de los datos (ver src/publicacion.py): mientras se actualizan se sigue
+    usando la anterior, y cuando se publica una nueva el cache de Streamlit no la confunde
+    con la anterior porque la version es parte de la clave, sin tener que vaciarlo.
+    Con MEMORIA_COMPARTIDA, si el proceso cargador tiene la version publicada el DataFrame se
+    arma sobre la memoria compartida (sin copiar los datos ni pasar por el cache de Streamlit).
+    Si se piden columnas y periodos, se cargan solo esas particiones (año, trimestre) a traves
+    del cache con limite de memoria de src/funciones_streamlit/particiones.py.
+    """
+    iniciar_vigilancia()
+    precargar_pendientes()
+    version = publicacion.version_actual()
+    entidad = almacen_columnar.entidad_de_csv(archivo_csv)
+    if MEMORIA_COMPARTIDA and entidad is not None:
+        df = memoria_compartida.leer(entidad, columnas, periodos, version)
+        if df is not None:
+            df = completar_dataframe(filtrar_periodos(df, periodos), columnas)
+            # Copia sin datos: las paginas le agregan columnas sin tocar los arrays compartidos
+            return None if df is None else df.copy(deep=False)
+    if entidad is not None and columnas is not None and periodos is not None:
+        return leer_con_advertencias(lambda: particiones.leer(
+            entidad, columnas, periodos, version,
+            lambda faltantes, periodo: leer_fuente(archivo_csv, faltantes, [periodo], version),
+        ), columnas)
+    return leer_dataframe(archivo_csv, columnas, periodos, version)
+
+
+@st.cache_data(max_entries=64)
+def leer_dataframe(archivo_csv, columnas=None, periodos=None, version=None):
     """
-    Crea un DataFrame a partir de un archivo CSV ubicado en UTILS_PATH.
-    Si se especifican columnas, devuelve solo esas columnas válidas.
+    Crea un DataFrame a partir de un archivo CSV de la version publicada de los datos
+    (ver leer_fuente). Si se especifican columnas, devuelve solo esas columnas válidas.
+    Si se especifican periodos (lista de (año, trimestre)), devuelve solo esas filas.
     Muestra advertencias si el archivo está vacío o si hay columnas inválidas.
     """
-    try:
-        df = pd.read_csv(UTILS_PATH / archivo_csv, sep=';', low_memory=False)
+    return leer_con_advertencias(lambda: leer_fuente(archivo_csv, columnas, periodos, version), columnas)
 
-        if df.empty:
-            print("El archivo está vacío")
-            st.warning("⚠️ ERROR INESPERADO")
-            return None
 
-        if columnas is not None:
-            columnas_validas = [col for col in columnas if col in df.columns]
-            if len(columnas_validas) < len(columnas):
-                columnas_invalidas = set(columnas) - set(columnas_validas)
-                print(f"Algunas columnas no existen y fueron omitidas: {columnas_invalidas}")
-                st.warning("⚠️ ERROR INESPERADO")
-            df = df[columnas_validas]
+def leer_fuente(archivo_csv, columnas=None, periodos=None, version=None):
+    """
+    Lee las columnas y periodos pedidos de un archivo CSV de la version publicada indicada.
+    Todos los archivos (csv, cache, almacen) se toman de la carpeta de esa version, asi una
+    publicacion que ocurre durante la lectura no mezcla datos de dos versiones.
+    Si la cache de columnas (.npy) esta al dia con el CSV se abren desde ahi solo las
+    columnas pedidas; sino, si existe el almacen particionado de ese archivo se lee desde
+    ahi, solo las particiones y columnas pedidas; sino se lee el CSV: solo los tramos de los
+    periodos pedidos si el resumen tiene el indice por bytes (ver src/manifiesto.py), o la
+    proyeccion con las columnas del dashboard si esta al dia y tiene las pedidas (ver
+    src/proyeccion.py), o el CSV completo. En todos los casos
+    las columnas de la EPH quedan con los tipos compactos de src/esquema.py.
+    """
+    entidad = almacen_columnar.entidad_de_csv(archivo_csv)
+    carpeta = publicacion.carpeta_version(version)
+    ruta_csv = publicacion.ruta(UTILS_PATH / archivo_csv, carpeta)
+    cache = publicacion.ruta(CACHE_COLUMNAS_PATH, carpeta)
+    almacen = publicacion.ruta(ALMACEN_PATH, carpeta)
+    if entidad is not None and cache_columnas.disponible(entidad, ruta_csv, cache):
+        df = cache_columnas.leer(entidad, columnas, periodos, cache)
+    elif entidad is not None and almacen_columnar.disponible(entidad, almacen):
+        df = almacen_columnar.leer(entidad, columnas, periodos, raiz=almacen)
+    elif entidad is not None:
+        # Se lee con los tipos compactos del esquema (enteros chicos, categorias). Si se piden
+        # periodos y el resumen tiene el indice por bytes, se lee solo el tramo de cada periodo
+        tramos = None if periodos is None else manifiesto.tramos_de_periodos(ruta_csv, periodos)
+        if tramos is not None:
+            df = esquema.leer_csv(io.BytesIO(tramos), entidad, columnas)
+        else:
+            ruta = proyeccion.ruta_lectura(ruta_csv, entidad, columnas)
+            df = esquema.leer_csv(ruta, entidad, columnas)
+    else:
+        usar = None if columnas is None else (lambda col: col in columnas)
+        df = pd.read_csv(ruta_csv, sep=';', low_memory=False, usecols=usar)
+    return filtrar_periodos(df, periodos)
+
 
+def filtrar_periodos(df, periodos=None):
+    """
+    Deja solo las filas de los periodos pedidos (lista de (año, trimestre)), si se piden.
+    """
+    if periodos is None:
         return df
+    buscados = pd.MultiIndex.from_tuples([tuple(p) for p in periodos])
+    return df[pd.MultiIndex.from_frame(df[['ANO4', 'TRIMESTRE']]).isin(buscados)]
+
+
+def leer_con_advertencias(leer, columnas=None):
+    """
+    Ejecuta leer() y completa el DataFrame que devuelve (ver completar_dataframe).
+    Si falla, muestra una advertencia y devuelve None.
+    """
+    try:
+        return completar_dataframe(leer(), columnas)
 
     except FileNotFoundError:
         print("Error: archivo CSV no encontrado")
-        st.warning("⚠️ ERROR INESPERADO")
+        advertir("⚠️ ERROR INESPERADO")
     except pd.errors.ParserError:
         print("Error al leer el archivo CSV")
-        st.warning("⚠️ ERROR INESPERADO")
+        advertir("⚠️ ERROR INESPERADO")
     except Exception as e:
         print(f"Ocurrió una excepción inesperada: {e} ({type(e).__name__})")
-        st.warning("⚠️ ERROR INESPERADO")
+        advertir("⚠️ ERROR INESPERADO")
 
     return None
 
 
+def completar_dataframe(df, columnas=None):
+    """
+    Deja en el DataFrame leido solo las columnas pedidas que existen.
+    Muestra advertencias si está vacío o si hay columnas inválidas.
+    """
+    if df.empty:
+        print("El archivo está vacío")
+        advertir("⚠️ ERROR INESPERADO")
+        return None
+
+    if columnas is not None:
+        columnas_validas = [col for col in columnas if col in df.columns]
+        if len(columnas_validas) < len(columnas):
+            columnas_invalidas = set(columnas) - set(columnas_validas)
+            print(f"Algunas columnas no existen y fueron omitidas: {columnas_invalidas}")
+            advertir("⚠️ ERROR INESPERADO")
+        df = df[columnas_validas]
+
+    return df
+
+
+def periodos_disponibles(archivo_csv):
+    """
+    Devuelve un DataFrame con los pares (ANO4, TRIMESTRE) que hay en el archivo, en la
+    version publicada de los datos.
+    """
+    iniciar_vigilancia()
+    precargar_pendientes()
+    return leer_periodos(archivo_csv, publicacion.version_actual())
+
+
+@st.cache_data(max_entries=16)
+def leer_periodos(archivo_csv, version=None):
+    """
+    Devuelve un DataFrame con los pares (ANO4, TRIMESTRE) que hay en el archivo.
+    Se obtienen de las estadisticas del almacen particionado o del resumen json
+    del csv, sin leer datos.
+    """
+    entidad = almacen_columnar.entidad_de_csv(archivo_csv)
+    carpeta = publicacion.carpeta_version(version)
+    almacen = publicacion.ruta(ALMACEN_PATH, carpeta)
+    if entidad is not None and almacen_columnar.disponible(entidad, almacen):
+        return pd.DataFrame(almacen_columnar.periodos(entidad, almacen), columns=['ANO4', 'TRIMESTRE'])
+    periodos = manifiesto.periodos_del_csv(publicacion.ruta(UTILS_PATH / archivo_csv, carpeta))
+    if periodos:
+        return pd.DataFrame(periodos, columns=['ANO4', 'TRIMESTRE'])
+    df = leer_dataframe(archivo_csv, ['ANO4', 'TRIMESTRE'], None, version)
+    if df is None:
+        return None
+    return df.drop_duplicates().sort_values(['ANO4', 'TRIMESTRE']).reset_index(drop=True)
+
+
 def filtrar_dataframe_por_anio(df, anio_seleccionado):
     """
     Filtra el DataFrame por un año específico si se selecciona uno.
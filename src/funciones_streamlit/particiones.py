@@ -0,0 +1,85 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+from utils.constantes import MEMORIA_PARTICIONES_MB
+
+
+# Las paginas que miran un año o un trimestre a la vez piden solo esas particiones
+# (ANO4, TRIMESTRE). Cada columna de cada particion se guarda una vez en un cache LRU
+# compartido por todas las sesiones, que no pasa de MEMORIA_PARTICIONES_MB: cuando se llena
+# se descartan las columnas que hace mas tiempo nadie pide. Asi la memoria de la aplicacion
+# no crece con la cantidad de trimestres del archivo.
+
+
+@st.cache_resource(show_spinner=False)
+def cache_particiones():
+    """Cache unico por servidor: {(version, entidad, periodo, columna): serie} en orden de uso"""
+    return {"columnas": OrderedDict(), "bytes": 0, "candado": threading.Lock()}
+
+
+def tamaño(serie):
+    return int(serie.memory_usage(index=False, deep=True))
+
+
+def descartar_frias(cache, en_uso):
+    """Descarta las columnas usadas hace mas tiempo hasta entrar en el presupuesto.
+        Las de la consulta en curso (en_uso) no se descartan aunque no entren."""
+    presupuesto = MEMORIA_PARTICIONES_MB * 1024 * 1024
+    for clave in list(cache["columnas"]):
+        if cache["bytes"] <= presupuesto:
+            break
+        if clave not in en_uso:
+            cache["bytes"] -= tamaño(cache["columnas"].pop(clave))
+
+
+def leer(entidad, columnas, periodos, version, leer_particion):
+    """Devuelve las filas de los periodos pedidos con las columnas pedidas, leyendo solo las
+        columnas de cada particion que no estan en el cache.
+
+    Args:
+        entidad (str): "individuos" o "hogares"
+        columnas (list): columnas a leer
+        periodos (list[tuple]): (año, trimestre) a leer
+        version (str): version publicada de los datos (ver src/publicacion.py)
+        leer_particion (funcion): recibe (columnas, periodo) y devuelve el DataFrame de esa particion
+
+    Returns:
+        pandas.DataFrame: las particiones una detras de otra, con las columnas que existan
+    """
+    cache = cache_particiones()
+    periodos = [(int(año), int(trimestre)) for año, trimestre in periodos]
+    en_uso = {(version, entidad, periodo, columna) for periodo in periodos for columna in columnas}
+    partes = []
+    for periodo in periodos:
+        with cache["candado"]:
+            faltantes = [c for c in columnas if (version, entidad, periodo, c) not in cache["columnas"]]
+        if faltantes:
+            df = leer_particion(faltantes, periodo)
+            with cache["candado"]:
+                for columna in df.columns:
+                    clave = (version, entidad, periodo, columna)
+                    if clave not in cache["columnas"]:
+                        # Copia propia de la columna, asi el cache mide lo que realmente ocupa
+                        serie = df[columna].reset_index(drop=True).copy()
+                        cache["columnas"][clave] = serie
+                        cache["bytes"] += tamaño(serie)
+        with cache["candado"]:
+            series = {}
+            for columna in columnas:
+                clave = (version, entidad, periodo, columna)
+                if clave in cache["columnas"]:
+                    cache["columnas"].move_to_end(clave)
+                    series[columna] = cache["columnas"][clave]
+        # Copia para la pagina: si la modifica no cambia lo que queda en el cache
+        partes.append(pd.DataFrame(series, columns=list(series)))
+    with cache["candado"]:
+        descartar_frias(cache, en_uso)
+
+    if not partes:
+        return pd.DataFrame(columns=columnas)
+    if len(partes) == 1:
+        return partes[0]
+    return pd.concat(partes, ignore_index=True)
@@ -0,0 +1,94 @@
+import csv
+import os
+
+from utils.constantes import IDS_HOGARES_CSV
+
+# Columna que se agrega a hogares e individuos con el id entero del hogar
+COLUMNA = "ID_HOGAR"
+# Un id por hogar de cada trimestre
+CLAVE = ("CODUSU", "NRO_HOGAR", "ANO4", "TRIMESTRE")
+
+
+def leer(manifiesto):
+    """Carga el diccionario {(CODUSU, NRO_HOGAR, ANO4, TRIMESTRE): id} de ids_hogares.csv.
+        Si el archivo no existe o no tiene los ids que registra el manifiesto se empieza uno
+        nuevo con otra version, y los csv que usaban la anterior se reconstruyen.
+
+    Returns:
+        dict: "ids" (el diccionario), "nuevas" (claves agregadas en esta ingesta, en orden
+            de id) y "datos" (la seccion "ids_hogares" del manifiesto: version y cantidad)
+    """
+    datos = manifiesto.setdefault("ids_hogares", {"version": 0, "cantidad": 0})
+    ids = {}
+    if os.path.exists(IDS_HOGARES_CSV):
+        with open(IDS_HOGARES_CSV, mode="r", newline="", encoding="utf-8") as f:
+            reader = csv.reader(f, delimiter=";")
+            next(reader, None)
+            for id_hogar, *clave in reader:
+                ids[tuple(clave)] = int(id_hogar)
+    if datos["version"] == 0 or len(ids) != datos["cantidad"]:
+        ids = {}
+        datos["version"] += 1
+        datos["cantidad"] = 0
+        if os.path.exists(IDS_HOGARES_CSV):
+            os.remove(IDS_HOGARES_CSV)
+    return {"ids": ids, "nuevas": [], "datos": datos}
+
+
+def al_dia(manifiesto, entidad):
+    """Indica si el csv de la entidad tiene los ids de la version actual del diccionario"""
+    return manifiesto["entidades"].get(entidad, {}).get("ids") == manifiesto["ids_hogares"]["version"]
+
+
+def registrar(manifiesto, entidad):
+    """Anota en el manifiesto que el csv de la entidad usa la version actual del diccionario"""
+    manifiesto["entidades"][entidad]["ids"] = manifiesto["ids_hogares"]["version"]
+
+
+def asignar(diccionario, filas):
+    """Agrega a cada fila la columna ID_HOGAR. Los hogares que no estaban en el diccionario
+        reciben ids nuevos consecutivos, en el orden de sus claves, asi hogares e individuos
+        del mismo zip obtienen los mismos ids sin importar cual se procese primero."""
+    ids = diccionario["ids"]
+    claves = [tuple(fila[columna] for columna in CLAVE) for fila in filas]
+    for clave in sorted(set(claves).difference(ids)):
+        ids[clave] = len(ids)
+        diccionario["nuevas"].append(clave)
+    for fila, clave in zip(filas, claves):
+        fila[COLUMNA] = str(ids[clave])
+
+
+def guardar(diccionario):
+    """Agrega al final de ids_hogares.csv las claves nuevas y actualiza la cantidad en el manifiesto"""
+    nuevas = diccionario["nuevas"]
+    if nuevas:
+        primer_id = diccionario["ids"][nuevas[0]]
+        escribir_encabezado = not os.path.exists(IDS_HOGARES_CSV)
+        with open(IDS_HOGARES_CSV, mode="a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f, delimiter=";")
+            if escribir_encabezado:
+                writer.writerow((COLUMNA,) + CLAVE)
+            writer.writerows((id_hogar,) + clave for id_hogar, clave in enumerate(nuevas, primer_id))
+        nuevas.clear()
+    diccionario["datos"]["cantidad"] = len(diccionario["ids"])
+
+
+def claves_por_id():
+    """Devuelve la lista de claves (CODUSU, NRO_HOGAR, ANO4, TRIMESTRE) indexada por id,
+        para volver del id entero al hogar original"""
+    if not os.path.exists(IDS_HOGARES_CSV):
+        return []
+    with open(IDS_HOGARES_CSV, mode="r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f, delimiter=";")
+        next(reader, None)
+        return [tuple(clave) for _, *clave in reader]
+
+
+def clave_hogar(fila):
+    """Clave para cruzar hogares con individuos de un mismo trimestre: el ID_HOGAR entero si
+        el csv lo tiene, sino (CODUSU, NRO_HOGAR) como antes"""
+    id_hogar = fila.get(COLUMNA)
+    if id_hogar:
+        return int(id_hogar)
+    return fila["CODUSU"], fila["NRO_HOGAR"]
+
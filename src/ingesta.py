@@ -0,0 +1,78 @@
+import argparse
+import sys
+from pathlib import Path
+
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.constantes import (
+    DATA_PATH,
+    PROCESOS_INGESTA,
+    GUARDAR_ALMACEN,
+    GUARDAR_CACHE_COLUMNAS,
+    GUARDAR_PROYECCION,
+    GUARDAR_SQLITE,
+    GUARDAR_ETAPAS,
+)
+from src import actualizacion, procesamiento, rendimiento
+
+# Csv consolidado y prefijo de los txt de cada entidad
+ENTIDADES = {
+    "hogares": ("HogaresTotal", "usu_hogar"),
+    "individuos": ("IndividuosTotal", "usu_individual"),
+}
+
+
+def ejecutar(zip_folder=DATA_PATH, entidad=None, procesos=PROCESOS_INGESTA, sqlite=GUARDAR_SQLITE):
+    """Arma los csv consolidados (y lo demas que indican las constantes GUARDAR_*) con los zips
+        nuevos o modificados de la carpeta, en este mismo proceso: se cargan los zips, se
+        limpian, se agregan las columnas nuevas (ver src/procesamiento.py), se guardan y se
+        publica la version nueva. Es lo que ejecutan los notebooks, el boton "Actualizar" y la
+        vigilancia de la carpeta data.
+
+    Args:
+        zip_folder (carpeta): donde estan los archivos zip
+        entidad (str): "hogares" o "individuos" para actualizar solo ese csv; None para los dos
+            (cada zip se abre una sola vez)
+        procesos (int): procesos para cargar los zips pendientes en paralelo
+        sqlite (bool): si es True tambien se carga la base SQLite de las consultas _sqlite
+    """
+    opciones = dict(
+        procesos=procesos,
+        almacen=GUARDAR_ALMACEN,
+        cache=GUARDAR_CACHE_COLUMNAS,
+        proyectar=GUARDAR_PROYECCION,
+        sqlite=sqlite,
+        guardar_etapas=GUARDAR_ETAPAS,
+    )
+    # Cada corrida deja el tiempo, las filas por segundo y la memoria de cada etapa en el
+    # informe de rendimiento (ver src/rendimiento.py)
+    with rendimiento.corrida():
+        if entidad is None:
+            actualizacion.actualizar_hogares_e_individuos(zip_folder, **opciones)
+            return
+        nombre_archivo, prefijo = ENTIDADES[entidad]
+        actualizacion.actualizar_incremental(
+            nombre_archivo, zip_folder, prefijo, procesamiento.PROCESAMIENTO[prefijo], **opciones
+        )
+
+
+def main(argumentos=None):
+    """Punto de entrada para correr la ingesta desde la terminal, sin Jupyter:
+        python src/ingesta.py [--entidad hogares|individuos] [--carpeta DIR] [--procesos N] [--sqlite]"""
+    parser = argparse.ArgumentParser(description="Arma los csv de la EPH con los zips de la carpeta data.")
+    parser.add_argument("--carpeta", type=Path, default=DATA_PATH, help="carpeta con los zips (por defecto utils/data)")
+    parser.add_argument("--entidad", choices=list(ENTIDADES), default=None,
+                        help="actualizar solo hogares o solo individuos (por defecto los dos)")
+    parser.add_argument("--procesos", type=int, default=PROCESOS_INGESTA,
+                        help="procesos para cargar los zips en paralelo (1 = carga serial)")
+    parser.add_argument("--sqlite", action="store_true",
+                        help="cargar tambien la base SQLite de las consultas _sqlite (aunque GUARDAR_SQLITE sea False)")
+    args = parser.parse_args(argumentos)
+    if not args.carpeta.is_dir():
+        parser.error(f"no existe la carpeta {args.carpeta}")
+    ejecutar(args.carpeta, args.entidad, args.procesos, args.sqlite or GUARDAR_SQLITE)
+
+
+if __name__ == "__main__":
+    main()
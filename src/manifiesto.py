@@ -0,0 +1,347 @@
+import csv
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from utils.constantes import MANIFIESTO_INGESTA as RUTA_MANIFIESTO
+
+
+def leer_manifiesto(ruta=RUTA_MANIFIESTO):
+    """Devuelve el manifiesto de ingesta, o uno vacio si todavia no existe o esta dañado.
+        Estructura:
+            "zips": {nombre_zip: {"tamaño", "modificado", "hash"}}
+            "entidades": {"individuos" | "hogares": {
+                "csv": {"tamaño", "modificado"} del csv consolidado,
+                "zips": {nombre_zip: {"hash", "periodo": [año, trimestre], "filas"}}}}
+    """
+    try:
+        with open(ruta, mode="r", encoding="utf-8") as f:
+            manifiesto = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifiesto = {}
+    manifiesto.setdefault("zips", {})
+    manifiesto.setdefault("entidades", {})
+    return manifiesto
+
+
+def guardar_manifiesto(manifiesto):
+    """Guarda el manifiesto reemplazando el anterior de una sola vez"""
+    temporal = RUTA_MANIFIESTO.with_suffix(".tmp")
+    with open(temporal, mode="w", encoding="utf-8") as f:
+        json.dump(manifiesto, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, RUTA_MANIFIESTO)
+
+
+def hash_archivo(ruta, tamaño_bloque=1024 * 1024):
+    """Calcula el sha256 del archivo leyendolo por bloques"""
+    sha = hashlib.sha256()
+    with open(ruta, mode="rb") as f:
+        for bloque in iter(lambda: f.read(tamaño_bloque), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def huella_zip(zip_path, registro=None):
+    """Devuelve tamaño, fecha de modificacion y hash del zip.
+        Si el tamaño y la fecha coinciden con el registro anterior se reutiliza su hash
+        para no volver a leer el zip completo."""
+    estado = os.stat(zip_path)
+    if registro and registro.get("tamaño") == estado.st_size and registro.get("modificado") == estado.st_mtime:
+        contenido = registro["hash"]
+    else:
+        contenido = hash_archivo(zip_path)
+    return {"tamaño": estado.st_size, "modificado": estado.st_mtime, "hash": contenido}
+
+
+def huella_csv(ruta_csv):
+    """Devuelve tamaño y fecha de modificacion del csv consolidado, o None si no existe"""
+    if not os.path.exists(ruta_csv):
+        return None
+    estado = os.stat(ruta_csv)
+    return {"tamaño": estado.st_size, "modificado": estado.st_mtime}
+
+
+def registro_entidad(manifiesto, entidad):
+    """Devuelve (y crea si hace falta) la seccion del manifiesto de una entidad"""
+    return manifiesto["entidades"].setdefault(entidad, {"csv": None, "zips": {}})
+
+
+def csv_al_dia(manifiesto, entidad, ruta_csv):
+    """Indica si el csv consolidado es el mismo que se registro en la ultima ingesta.
+        Si fue borrado o reescrito por fuera del manifiesto hay que reconstruirlo completo."""
+    huella = huella_csv(ruta_csv)
+    return huella is not None and registro_entidad(manifiesto, entidad)["csv"] == huella
+
+
+def huellas_zips(manifiesto, zip_folder):
+    """Devuelve {nombre_zip: huella} de todos los zips de la carpeta"""
+    return {
+        file: huella_zip(Path(zip_folder) / file, manifiesto["zips"].get(file))
+        for file in sorted(os.listdir(zip_folder))
+        if file.endswith(".zip")
+    }
+
+
+def cambios_por_entidad(manifiesto, huellas, entidad):
+    """Compara los zips de la carpeta con lo ya procesado para una entidad.
+
+    Args:
+        manifiesto (dict): manifiesto de ingesta
+        huellas (dict): {nombre_zip: huella} de los zips presentes
+        entidad (str): "individuos" o "hogares"
+
+    Returns:
+        tuple: (pendientes, quitados)
+            pendientes: nombres de zips nuevos o modificados
+            quitados: nombres de zips procesados que ya no estan en la carpeta
+    """
+    procesados = registro_entidad(manifiesto, entidad)["zips"]
+    pendientes = [
+        file
+        for file, huella in huellas.items()
+        if file not in procesados or procesados[file]["hash"] != huella["hash"]
+    ]
+    quitados = [file for file in procesados if file not in huellas]
+    return pendientes, quitados
+
+
+def periodos_procesados(manifiesto, entidad):
+    """Devuelve el conjunto de (año, trimestre) ya cargados en el csv de la entidad"""
+    return {
+        tuple(registro["periodo"])
+        for registro in registro_entidad(manifiesto, entidad)["zips"].values()
+        if registro["periodo"] is not None
+    }
+
+
+# Resumen de cada csv consolidado (HogaresTotal.json, IndividuosTotal.json): periodos que
+# tiene, filas y suma de PONDERA por periodo, y en que byte del csv empieza y termina cada
+# periodo. Se escribe al terminar la ingesta para no tener que recorrer el csv cada vez que
+# se necesitan los trimestres disponibles o las filas de un solo trimestre.
+
+def ruta_resumen(ruta_csv):
+    """Devuelve la ruta del json que acompaña al csv consolidado"""
+    return Path(ruta_csv).with_suffix(".json")
+
+
+def leer_resumen(ruta_csv):
+    """Devuelve el resumen del csv, o None si no existe o si no corresponde al csv actual
+        (por ejemplo si el csv se reescribio por fuera de la ingesta).
+        Estructura:
+            "version": identificador de esta version de los datos
+            "csv": {"tamaño", "modificado"} del csv resumido
+            "ordenado": True si las filas de cada periodo estan juntas (se puede usar el indice)
+            "periodos": [{"ANO4", "TRIMESTRE", "filas", "pondera", "inicio", "fin"}] ordenados
+                por periodo; inicio y fin son posiciones en bytes dentro del csv
+    """
+    try:
+        with open(ruta_resumen(ruta_csv), mode="r", encoding="utf-8") as f:
+            resumen = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    if resumen.get("csv") is None or resumen["csv"] != huella_csv(ruta_csv):
+        return None
+    return resumen
+
+
+def registros_binarios(archivo):
+    """Devuelve (posicion, registro en bytes) de cada fila del csv abierto en binario.
+        Una fila con un campo entre comillas puede ocupar mas de una linea."""
+    posicion = archivo.tell()
+    pendiente = b""
+    for linea in archivo:
+        pendiente += linea
+        if pendiente.count(b'"') % 2:
+            continue
+        yield posicion, pendiente
+        posicion += len(pendiente)
+        pendiente = b""
+    if pendiente:
+        yield posicion, pendiente
+
+
+def escanear_csv(ruta_csv, desde=None, delimitador=";"):
+    """Recorre el csv en binario (desde el principio o desde el byte indicado) y arma las
+        estadisticas de cada periodo con la posicion donde empiezan y terminan sus filas.
+
+    Returns:
+        tuple: ({(año, trimestre): {"filas", "pondera", "inicio", "fin"}}, ordenado)
+            ordenado es False si las filas de algun periodo no estan todas juntas
+    """
+    separador = delimitador.encode("utf-8")
+    estadisticas = {}
+    ordenado = True
+    with open(ruta_csv, mode="rb") as f:
+        encabezado = next(csv.reader([f.readline().decode("utf-8")], delimiter=delimitador))
+        indice_año, indice_trimestre = encabezado.index("ANO4"), encabezado.index("TRIMESTRE")
+        indice_pondera = encabezado.index("PONDERA") if "PONDERA" in encabezado else None
+        if desde is not None:
+            f.seek(desde)
+        actual = None
+        for posicion, registro in registros_binarios(f):
+            if not registro.strip():
+                continue
+            if b'"' in registro:
+                campos = next(csv.reader([registro.decode("utf-8")], delimiter=delimitador))
+            else:
+                campos = registro.rstrip(b"\r\n").split(separador)
+            periodo = int(campos[indice_año]), int(campos[indice_trimestre])
+            if periodo != actual:
+                if periodo in estadisticas:
+                    ordenado = False
+                datos = estadisticas.setdefault(periodo, {"filas": 0, "pondera": 0, "inicio": posicion})
+                actual = periodo
+            datos["filas"] += 1
+            datos["fin"] = posicion + len(registro)
+            if indice_pondera is not None:
+                try:
+                    datos["pondera"] += int(campos[indice_pondera])
+                except ValueError:
+                    pass
+    return estadisticas, ordenado
+
+
+def armar_resumen(ruta_csv, estadisticas, ordenado=True):
+    """Arma el resumen del csv a partir de {(año, trimestre): {"filas", "pondera", "inicio", "fin"}}"""
+    periodos = [
+        {"ANO4": año, "TRIMESTRE": trimestre, **estadisticas[(año, trimestre)]}
+        for año, trimestre in sorted(estadisticas)
+    ]
+    huella = huella_csv(ruta_csv)
+    contenido = json.dumps({"csv": huella, "periodos": periodos}, sort_keys=True)
+    resumen = {
+        "version": hashlib.sha256(contenido.encode("utf-8")).hexdigest()[:16],
+        "csv": huella,
+        "ordenado": ordenado,
+        "periodos": periodos,
+    }
+    return resumen
+
+
+def guardar_resumen(ruta_csv, estadisticas, ordenado=True):
+    """Guarda el resumen del csv a partir de {(año, trimestre): {"filas", "pondera", "inicio", "fin"}}"""
+    resumen = armar_resumen(ruta_csv, estadisticas, ordenado)
+    destino = ruta_resumen(ruta_csv)
+    temporal = destino.with_suffix(".tmp")
+    with open(temporal, mode="w", encoding="utf-8") as f:
+        json.dump(resumen, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, destino)
+    return resumen
+
+
+def resumen_desde_csv(ruta_csv, delimitador=";"):
+    """Arma el resumen recorriendo el csv completo"""
+    estadisticas, ordenado = escanear_csv(ruta_csv, delimitador=delimitador)
+    return guardar_resumen(ruta_csv, estadisticas, ordenado)
+
+
+def resumen_con_agregado(ruta_csv, resumen_previo, delimitador=";"):
+    """Actualiza el resumen despues de agregar filas al final del csv: solo se recorre lo
+        agregado, a partir del tamaño que tenia el csv en el resumen anterior."""
+    if "ordenado" not in resumen_previo:
+        return resumen_desde_csv(ruta_csv, delimitador)
+    estadisticas = estadisticas_del_resumen(resumen_previo)
+    nuevas, ordenado = escanear_csv(ruta_csv, resumen_previo["csv"]["tamaño"], delimitador)
+    ordenado = ordenado and resumen_previo["ordenado"] and not (set(nuevas) & set(estadisticas))
+    for periodo, datos in nuevas.items():
+        if periodo in estadisticas:
+            previos = estadisticas[periodo]
+            datos = {"filas": previos["filas"] + datos["filas"], "pondera": previos["pondera"] + datos["pondera"],
+                     "inicio": previos["inicio"], "fin": datos["fin"]}
+        estadisticas[periodo] = datos
+    return guardar_resumen(ruta_csv, estadisticas, ordenado)
+
+
+def asegurar_resumen(ruta_csv, delimitador=";"):
+    """Devuelve el resumen del csv, armandolo y guardandolo si hace falta (lo usa la ingesta,
+        la unica que escribe resumenes). None si el csv no existe."""
+    if not os.path.exists(ruta_csv):
+        return None
+    resumen = leer_resumen(ruta_csv)
+    # Los resumenes sin "ordenado" son anteriores al indice por bytes
+    if resumen is None or "ordenado" not in resumen:
+        resumen = resumen_desde_csv(ruta_csv, delimitador)
+    return resumen
+
+
+def obtener_resumen(ruta_csv, delimitador=";"):
+    """Devuelve el resumen del csv para quien solo lee los datos: si el que dejo la ingesta
+        falta o no corresponde al csv, se arma recorriendo el csv pero no se guarda (las
+        versiones publicadas no se modifican). None si el csv no existe."""
+    if not os.path.exists(ruta_csv):
+        return None
+    resumen = leer_resumen(ruta_csv)
+    if resumen is None or "ordenado" not in resumen:
+        resumen = armar_resumen(ruta_csv, *escanear_csv(ruta_csv, delimitador=delimitador))
+    return resumen
+
+
+def estadisticas_del_resumen(resumen):
+    """Pasa los periodos del resumen a {(año, trimestre): {"filas", "pondera", "inicio", "fin"}}"""
+    return {
+        (datos["ANO4"], datos["TRIMESTRE"]): {clave: valor for clave, valor in datos.items() if clave not in ("ANO4", "TRIMESTRE")}
+        for datos in resumen["periodos"]
+    }
+
+
+def periodos_del_csv(ruta_csv):
+    """Devuelve la lista ordenada de (año, trimestre) del csv consolidado, o [] si no existe"""
+    resumen = obtener_resumen(ruta_csv)
+    if resumen is None:
+        return []
+    return [(datos["ANO4"], datos["TRIMESTRE"]) for datos in resumen["periodos"]]
+
+
+def filas_de_periodo(ruta_csv, periodo, delimitador=";"):
+    """Devuelve las filas (diccionarios) de un solo (año, trimestre) del csv consolidado.
+        Con el indice del resumen se lee solo el tramo del csv de ese periodo; si no hay
+        indice se recorre el csv completo filtrando."""
+    año, trimestre = int(periodo[0]), int(periodo[1])
+    if not os.path.exists(ruta_csv):
+        return
+    resumen = leer_resumen(ruta_csv)
+    if resumen is None or not resumen.get("ordenado"):
+        with open(ruta_csv, mode="r", newline="", encoding="utf-8") as f:
+            for fila in csv.DictReader(f, delimiter=delimitador):
+                if fila["ANO4"] == str(año) and fila["TRIMESTRE"] == str(trimestre):
+                    yield fila
+        return
+
+    datos = estadisticas_del_resumen(resumen).get((año, trimestre))
+    if datos is None:
+        return
+    with open(ruta_csv, mode="rb") as f:
+        encabezado = next(csv.reader([f.readline().decode("utf-8")], delimiter=delimitador))
+        f.seek(datos["inicio"])
+        lineas = (linea.decode("utf-8") for linea in leer_hasta(f, datos["fin"]))
+        yield from csv.DictReader(lineas, fieldnames=encabezado, delimiter=delimitador)
+
+
+def tramos_de_periodos(ruta_csv, periodos):
+    """Devuelve en bytes el encabezado del csv consolidado seguido de los tramos de los
+        periodos pedidos, leidos con el indice del resumen sin recorrer el resto del csv
+        (los periodos que no estan se omiten). None si no hay un indice que se pueda usar."""
+    resumen = leer_resumen(ruta_csv) if os.path.exists(ruta_csv) else None
+    if resumen is None or not resumen.get("ordenado"):
+        return None
+    estadisticas = estadisticas_del_resumen(resumen)
+    with open(ruta_csv, mode="rb") as f:
+        partes = [f.readline()]
+        for año, trimestre in periodos:
+            datos = estadisticas.get((int(año), int(trimestre)))
+            if datos is not None:
+                f.seek(datos["inicio"])
+                partes.append(f.read(datos["fin"] - datos["inicio"]))
+    return b"".join(partes)
+
+
+def leer_hasta(archivo, fin):
+    """Devuelve las lineas del archivo binario abierto hasta llegar al byte fin"""
+    posicion = archivo.tell()
+    while posicion < fin:
+        linea = archivo.readline()
+        if not linea:
+            return
+        posicion += len(linea)
+        yield linea
@@ -0,0 +1,218 @@
+import os
+import signal
+import sys
+import threading
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+
+# Agrego la raiz del proyecto al path para poder importar src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.constantes import (
+    UTILS_PATH,
+    PUBLICADO_PATH,
+    CACHE_COLUMNAS_PATH,
+    HOGARES_CSV,
+    INDIVIDUOS_CSV,
+    VERSIONES_PUBLICADAS,
+    INTERVALO_VIGILANCIA,
+)
+from src import cache_columnas, esquema, publicacion
+
+if os.name == "posix":
+    from multiprocessing import resource_tracker
+
+
+# Cuando hay varios procesos de Streamlit en el mismo equipo, cada uno cargaba su propia copia
+# de los DataFrames. En este modo un solo proceso (python src/memoria_compartida.py) copia las
+# columnas de hogares e individuos de la version publicada a memoria compartida y anota en
+# publicado/memoria_compartida.json donde quedo cada una; las paginas arman el DataFrame con
+# vistas de solo lectura sobre esos segmentos, sin copiar los datos.
+# Cada columna se guarda con los mismos arrays que la cache de columnas (ver src/cache_columnas.py).
+
+DESCRIPCION = PUBLICADO_PATH / "memoria_compartida.json"
+# Un solo proceso cargador a la vez; si se inicia otro, espera a que el primero termine
+BLOQUEO_CARGADOR = PUBLICADO_PATH / ".memoria_compartida.lock"
+CSV_POR_ENTIDAD = {"hogares": HOGARES_CSV, "individuos": INDIVIDUOS_CSV}
+
+# Segmentos a los que se adjunto este proceso, por version: {version: {nombre: SharedMemory}}.
+# Se mantienen abiertos mientras haya DataFrames que usen sus vistas.
+adjuntos = {}
+candado = threading.Lock()
+
+
+def copiar_a_segmento(array, segmentos):
+    """Copia el array a un segmento nuevo de memoria compartida y devuelve como encontrarlo"""
+    array = np.ascontiguousarray(array)
+    segmento = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=segmento.buf)[...] = array
+    segmentos.append(segmento)
+    return {"nombre": segmento.name, "dtype": array.dtype.str, "forma": list(array.shape)}
+
+
+def leer_publicado(entidad, carpeta):
+    """DataFrame completo de la entidad en la carpeta de una version publicada, con los tipos
+        del esquema"""
+    cache = publicacion.ruta(CACHE_COLUMNAS_PATH, carpeta)
+    ruta_csv = publicacion.ruta(CSV_POR_ENTIDAD[entidad], carpeta)
+    if cache_columnas.disponible(entidad, ruta_csv, cache):
+        return cache_columnas.leer(entidad, raiz=cache)
+    return esquema.leer_csv(ruta_csv, entidad)
+
+
+def cargar(segmentos, version):
+    """Copia a memoria compartida las columnas de cada entidad de la version publicada.
+
+    Args:
+        segmentos (list): se le agregan los SharedMemory creados (hay que conservarlos y
+            liberarlos con liberar())
+        version (str): version publicada; todos los archivos se leen de su carpeta
+
+    Returns:
+        dict: {entidad: filas, periodos y columnas con los segmentos de cada una}
+    """
+    entidades = {}
+    carpeta = publicacion.carpeta_version(version)
+    for entidad, ruta_csv in CSV_POR_ENTIDAD.items():
+        if not publicacion.ruta(ruta_csv, carpeta).exists():
+            continue
+        df = leer_publicado(entidad, carpeta)
+        columnas = {}
+        for columna in df.columns:
+            datos_columna, valores, nulos, categorias = cache_columnas.descomponer(df[columna])
+            datos_columna["segmentos"] = {"valores": copiar_a_segmento(valores, segmentos)}
+            if nulos is not None:
+                datos_columna["segmentos"]["nulos"] = copiar_a_segmento(nulos, segmentos)
+            if categorias is not None:
+                datos_columna["segmentos"]["categorias"] = copiar_a_segmento(categorias, segmentos)
+            columnas[columna] = datos_columna
+        entidades[entidad] = {
+            "filas": len(df),
+            "periodos": cache_columnas.rangos_por_periodo(df),
+            "columnas": columnas,
+        }
+    return entidades
+
+
+def liberar(segmentos):
+    """Borra los segmentos; los procesos que ya tienen vistas sobre ellos las siguen usando"""
+    for segmento in segmentos:
+        segmento.close()
+        try:
+            segmento.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def cargar_version(cargadas, version):
+    """Carga la version en memoria compartida, suelta las que sobran y actualiza la descripcion"""
+    segmentos = []
+    try:
+        cargadas[version] = (cargar(segmentos, version), segmentos)
+    except Exception:
+        liberar(segmentos)
+        raise
+    for vieja in sorted(cargadas)[:-VERSIONES_PUBLICADAS]:
+        liberar(cargadas.pop(vieja)[1])
+    publicacion.guardar_json(DESCRIPCION, {v: entidades for v, (entidades, _) in cargadas.items()})
+    filas = sum(datos["filas"] for datos in cargadas[version][0].values())
+    print(f"✅ Version {version} en memoria compartida ({filas} filas).")
+
+
+def mantener(intervalo=INTERVALO_VIGILANCIA, detener=None):
+    """Proceso cargador: mantiene en memoria compartida las ultimas VERSIONES_PUBLICADAS
+        versiones publicadas y revisa cada intervalo segundos si se publico otra.
+        Al terminar (Ctrl+C, kill o detener) borra los segmentos y la descripcion."""
+    detener = detener or threading.Event()
+    cargadas = {}  # {version: (entidades, segmentos)}
+    with publicacion.bloqueo(BLOQUEO_CARGADOR):
+        try:
+            while not detener.is_set():
+                version = publicacion.version_actual()
+                if version is not None and version not in cargadas:
+                    try:
+                        cargar_version(cargadas, version)
+                    except Exception as e:
+                        # Las paginas siguen leyendo como siempre; se reintenta en la proxima revision
+                        print(f"⚠️ No se pudo cargar la version {version}: {e} ({type(e).__name__})")
+                detener.wait(intervalo)
+        finally:
+            if DESCRIPCION.exists():
+                os.remove(DESCRIPCION)
+            for _, segmentos in cargadas.values():
+                liberar(segmentos)
+
+
+def adjuntar(version, nombre):
+    """Abre un segmento creado por el proceso cargador. No se registra para borrarlo al
+        terminar este proceso: el unico que los borra es el cargador."""
+    segmentos = adjuntos.setdefault(version, {})
+    if nombre not in segmentos:
+        try:
+            segmento = shared_memory.SharedMemory(name=nombre, track=False)  # Python 3.13+
+        except TypeError:
+            segmento = shared_memory.SharedMemory(name=nombre)
+            if os.name == "posix":
+                resource_tracker.unregister(segmento._name, "shared_memory")
+        segmentos[nombre] = segmento
+    return segmentos[nombre]
+
+
+def vista(version, descripcion, inicio=None, fin=None):
+    """Vista de solo lectura (sin copia) de las filas [inicio, fin) de un array compartido"""
+    segmento = adjuntar(version, descripcion["nombre"])
+    array = np.ndarray(descripcion["forma"], dtype=np.dtype(descripcion["dtype"]), buffer=segmento.buf)
+    array.flags.writeable = False
+    return array[inicio:fin]
+
+
+def soltar_anteriores(version):
+    """Cierra los segmentos de otras versiones que ya no usa ningun DataFrame de este proceso"""
+    for anterior in [v for v in adjuntos if v != version]:
+        for nombre, segmento in list(adjuntos[anterior].items()):
+            try:
+                segmento.close()
+            except BufferError:
+                continue  # Todavia hay vistas sobre el segmento, se reintenta con la proxima version
+            del adjuntos[anterior][nombre]
+        if not adjuntos[anterior]:
+            del adjuntos[anterior]
+
+
+def leer(entidad, columnas=None, periodos=None, version=None):
+    """Arma el DataFrame de la entidad con vistas sobre la memoria compartida.
+
+    Returns:
+        pandas.DataFrame o None: None si el cargador no tiene esa version de la entidad
+            (por ejemplo si no esta corriendo), y entonces se lee como siempre
+    """
+    datos = publicacion.leer_json(DESCRIPCION).get(version, {}).get(entidad)
+    if datos is None:
+        return None
+    with candado:
+        soltar_anteriores(version)
+        try:
+            def leer_columna_rango(columna, inicio, fin):
+                segmentos = datos["columnas"][columna]["segmentos"]
+                return cache_columnas.componer(
+                    datos["columnas"][columna],
+                    vista(version, segmentos["valores"], inicio, fin),
+                    vista(version, segmentos["nulos"], inicio, fin) if "nulos" in segmentos else None,
+                    vista(version, segmentos["categorias"]) if "categorias" in segmentos else None,
+                )
+            return cache_columnas.armar(datos, leer_columna_rango, columnas, periodos)
+        except FileNotFoundError:
+            # El cargador ya borro esa version (o se detuvo)
+            return None
+
+
+if __name__ == "__main__":
+    print(f"📊 Cargando en memoria compartida los datos publicados de {UTILS_PATH} (Ctrl+C para terminar)...")
+    # Al recibir kill tambien se borran los segmentos
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        mantener()
+    except KeyboardInterrupt:
+        pass
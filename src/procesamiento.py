@@ -0,0 +1,50 @@
+import sys
+from pathlib import Path
+
+# Agrego la raiz del proyecto al path para poder importar src tambien desde los notebooks
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from src import etapas
+from src.funciones.tipo_hogar import key_tipo_hogar
+from src.funciones.materialhogares import material_techumbre
+from src.funciones.densidad_hogar import key_densidad_hogar
+from src.funciones.cond_hab import condicion_de_habitabilidad
+from src.funciones.generos_str import int_to_str
+from src.funciones.nivel_ed import key_nivel_ed_str
+from src.funciones.cond_lab import condicion_laboral
+from src.funciones.univ_num import add_uni
+
+
+def limpiar_registros(registros):
+    """Saca la columna sin nombre y completa los campos vacios con 'sin información'"""
+    for d in registros:
+        if '' in d:
+            del d['']
+        for clave, valor in d.items():
+            # si es string y está vacío o sólo espacios…
+            if isinstance(valor, str) and valor.strip() == '':
+                d[clave] = 'sin información'
+
+
+# Etapas de hogares e individuos (ver src/etapas.py): (nombre, funcion, columnas que agrega,
+# etapas de cuyas columnas depende). La base limpia las filas del txt; las demas agregan columnas.
+procesar_hogares = etapas.Grafo("hogares", [
+    ("limpiar", limpiar_registros, None, ()),
+    ("tipo_hogar", key_tipo_hogar, ["TIPO_HOGAR"], ("limpiar",)),
+    ("material_techumbre", material_techumbre, ["MATERIAL_TECHUMBRE"], ("limpiar",)),
+    ("densidad_hogar", key_densidad_hogar, ["DENSIDAD_HOGAR"], ("limpiar",)),
+    ("condicion_de_habitabilidad", condicion_de_habitabilidad, ["CONDICION_DE_HABITABILIDAD"],
+     ("limpiar", "material_techumbre")),
+])
+
+procesar_individuos = etapas.Grafo("individuos", [
+    ("limpiar", limpiar_registros, None, ()),
+    ("generos_str", int_to_str, ["CH04_str"], ("limpiar",)),
+    ("nivel_ed", key_nivel_ed_str, ["NIVEL_ED_str"], ("limpiar",)),
+    ("condicion_laboral", condicion_laboral, ["CONDICION_LABORAL"], ("limpiar",)),
+    ("universitario", add_uni, ["UNIVERSITARIO"], ("limpiar",)),
+])
+
+
+# Procesamiento que corresponde a cada txt de los zips
+PROCESAMIENTO = {"usu_individual": procesar_individuos, "usu_hogar": procesar_hogares}
@@ -0,0 +1,122 @@
+import csv
+import os
+from itertools import chain
+from pathlib import Path
+
+from utils.constantes import UTILS_PATH, MANIFIESTO_INGESTA
+from src import manifiesto
+
+
+# Columnas de los csv consolidados que usa cada pagina de Streamlit y cada consulta.
+# Las paginas toman de aca su lista de columnas, asi la proyeccion siempre las incluye.
+COLUMNAS_USADAS = {
+    # Paginas de Streamlit
+    "demografia": {"individuos": ["ANO4", "TRIMESTRE", "CH06", "CH04_str", "PONDERA", "AGLOMERADO"]},
+    "vivienda": {"hogares": ["ANO4", "TRIMESTRE", "PONDERA", "AGLOMERADO", "CONDICION_DE_HABITABILIDAD",
+                             "IV1", "IV3", "IV9", "IV12_3", "II7"]},
+    "empleo": {"individuos": ["ESTADO", "NIVEL_ED", "ANO4", "TRIMESTRE", "AGLOMERADO", "PP04A", "PONDERA"]},
+    "educacion": {"individuos": ["ANO4", "TRIMESTRE", "CH06", "NIVEL_ED", "PONDERA", "CODUSU", "NRO_HOGAR",
+                                 "COMPONENTE"]},
+    "ingresos": {"hogares": ["ANO4", "TRIMESTRE", "CODUSU", "NRO_HOGAR", "IX_TOT", "PONDERA", "AGLOMERADO",
+                             "ITF"]},
+    # Consultas (src/consultas)
+    "aglomerados_sin_baños": {"hogares": ["AGLOMERADO", "PONDERA", "IV8", "IX_TOT"]},
+    "calcular_porc_por_aglomerado": {
+        "hogares": ["CONDICION_DE_HABITABILIDAD", "ID_HOGAR", "CODUSU", "NRO_HOGAR"],
+        "individuos": ["AGLOMERADO", "ANO4", "TRIMESTRE", "CAT_INAC", "CH12", "PONDERA", "ID_HOGAR", "CODUSU",
+                       "NRO_HOGAR"],
+    },
+    "calcular_porc_viviendas_prop": {"hogares": ["AGLOMERADO", "II7", "PONDERA"]},
+    "consulta_leer_escribir": {"individuos": ["ANO4", "TRIMESTRE", "CH06", "CH09", "PONDERA"]},
+    "consulta_materialprecario": {"hogares": ["AGLOMERADO", "ANO4", "MATERIAL_TECHUMBRE", "PONDERA"]},
+    "hog_insu": {
+        "hogares": ["ANO4", "TRIMESTRE", "CONDICION_DE_HABITABILIDAD", "ID_HOGAR", "CODUSU", "NRO_HOGAR"],
+        "individuos": ["CH12", "PONDERA", "ID_HOGAR", "CODUSU", "NRO_HOGAR"],
+    },
+    "mayores_nivel_ed": {"individuos": ["AGLOMERADO", "ANO4", "TRIMESTRE", "CH06", "NIVEL_ED_str", "PONDERA"]},
+    "mayores_sec_inc": {"individuos": ["AGLOMERADO", "ANO4", "TRIMESTRE", "CH06", "NIVEL_ED"]},
+    "menor_des": {"individuos": ["ANO4", "TRIMESTRE", "ESTADO", "PONDERA"]},
+    "porcentaje_ext_uni": {"individuos": ["CH15", "CH12", "PONDERA"]},
+    "porcentaje_inqui": {"hogares": ["REGION", "II7", "PONDERA"]},
+    "ranking5": {
+        "hogares": ["AGLOMERADO", "IX_TOT", "PONDERA", "ID_HOGAR", "CODUSU", "NRO_HOGAR"],
+        "individuos": ["NIVEL_ED_str", "PONDERA", "ID_HOGAR", "CODUSU", "NRO_HOGAR"],
+    },
+}
+
+# Columnas que siempre van en la proyeccion (periodo e id de hogar)
+COLUMNAS_FIJAS = ["ANO4", "TRIMESTRE", "ID_HOGAR"]
+
+# Csv con la proyeccion de cada entidad, junto al consolidado completo
+NOMBRE_PROYECCION = {"hogares": "HogaresDashboard", "individuos": "IndividuosDashboard"}
+
+
+def columnas_de(nombre, entidad):
+    """Columnas que declara una pagina o consulta para la entidad"""
+    return list(COLUMNAS_USADAS[nombre][entidad])
+
+
+def columnas_proyeccion(entidad):
+    """Union de las columnas que declaran las paginas y consultas para la entidad"""
+    usadas = (declaradas.get(entidad, []) for declaradas in COLUMNAS_USADAS.values())
+    return sorted(set(chain(COLUMNAS_FIJAS, *usadas)))
+
+
+def ruta_proyeccion(entidad, carpeta=UTILS_PATH):
+    return Path(carpeta) / f"{NOMBRE_PROYECCION[entidad]}.csv"
+
+
+def escribir(ruta_csv, entidad, registro, delimitador=";"):
+    """Escribe el csv de la proyeccion de la entidad a partir del consolidado completo, con su
+        resumen por periodo, y lo anota en la seccion de la entidad del manifiesto (no lo guarda).
+        Las columnas que no estan en el consolidado se omiten."""
+    ruta = ruta_proyeccion(entidad)
+    temporal = ruta.with_name(f".tmp_{ruta.name}")
+    with open(ruta_csv, mode="r", newline="", encoding="utf-8") as origen, \
+            open(temporal, mode="w", newline="", encoding="utf-8") as destino:
+        reader = csv.reader(origen, delimiter=delimitador)
+        writer = csv.writer(destino, delimiter=delimitador)
+        encabezado = next(reader, [])
+        buscadas = set(columnas_proyeccion(entidad))
+        posiciones = [i for i, columna in enumerate(encabezado) if columna in buscadas]
+        writer.writerow([encabezado[i] for i in posiciones])
+        writer.writerows([valores[i] for i in posiciones] for valores in reader)
+    os.replace(temporal, ruta)
+    manifiesto.resumen_desde_csv(ruta, delimitador)
+
+    manifiesto.registro_entidad(registro, entidad)["proyeccion"] = {
+        "pedidas": columnas_proyeccion(entidad),
+        "origen": manifiesto.huella_csv(ruta_csv),
+        "csv": manifiesto.huella_csv(ruta),
+        "columnas": [encabezado[i] for i in posiciones],
+    }
+    print(f"✅ Proyeccion de {entidad} guardada en {ruta.name} ({len(posiciones)} de {len(encabezado)} columnas).")
+
+
+def al_dia(registro, entidad, ruta_csv):
+    """Indica si la proyeccion de la entidad salio del consolidado actual y con las columnas
+        que declaran hoy las paginas y consultas"""
+    datos = manifiesto.registro_entidad(registro, entidad).get("proyeccion")
+    return (
+        datos is not None
+        and datos["pedidas"] == columnas_proyeccion(entidad)
+        and datos["origen"] == manifiesto.huella_csv(ruta_csv)
+        and datos["csv"] == manifiesto.huella_csv(ruta_proyeccion(entidad))
+    )
+
+
+def ruta_lectura(ruta_csv, entidad, columnas):
+    """Devuelve la ruta del csv de la proyeccion si esta al dia con el consolidado y tiene todas
+        las columnas pedidas; sino devuelve la ruta del consolidado completo. La proyeccion y
+        el manifiesto se buscan en la carpeta del consolidado (utils/ o una version publicada)."""
+    if columnas is None:
+        return ruta_csv
+    carpeta = Path(ruta_csv).parent
+    registro = manifiesto.leer_manifiesto(carpeta / MANIFIESTO_INGESTA.name)
+    datos = registro["entidades"].get(entidad, {}).get("proyeccion")
+    if datos is None or not set(columnas).issubset(datos["columnas"]):
+        return ruta_csv
+    ruta = ruta_proyeccion(entidad, carpeta)
+    if datos["origen"] != manifiesto.huella_csv(ruta_csv) or datos["csv"] != manifiesto.huella_csv(ruta):
+        return ruta_csv
+    return ruta
@@ -0,0 +1,216 @@
+import json
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+from utils.constantes import (
+    UTILS_PATH,
+    PUBLICADO_PATH,
+    VERSIONES_PUBLICADAS,
+    HOGARES_CSV,
+    INDIVIDUOS_CSV,
+    MANIFIESTO_INGESTA,
+    CACHE_COLUMNAS_PATH,
+    ALMACEN_PATH,
+    BASE_SQLITE_PATH,
+)
+from src import manifiesto, proyeccion
+
+
+# La ingesta trabaja sobre los archivos de utils/ y, al terminar, publica una version nueva en
+# publicado/<version>/ con lo que leen las paginas. La version actual se indica en
+# publicado/actual.json, que se reemplaza de una sola vez: quien lee usa la version anterior
+# completa hasta ese momento, nunca un csv a medio escribir.
+# Los archivos de cada version son enlaces (hard links) a los de utils/, asi que publicar no
+# copia datos; por eso la ingesta nunca modifica un archivo en el lugar, siempre escribe uno
+# nuevo y lo renombra.
+
+# Archivos y carpetas de utils/ que se publican
+PUBLICADOS = [
+    *(ruta for csv in (HOGARES_CSV, INDIVIDUOS_CSV) for ruta in (csv, manifiesto.ruta_resumen(csv))),
+    *(ruta for entidad in proyeccion.NOMBRE_PROYECCION
+      for ruta in (proyeccion.ruta_proyeccion(entidad), manifiesto.ruta_resumen(proyeccion.ruta_proyeccion(entidad)))),
+    MANIFIESTO_INGESTA,
+    CACHE_COLUMNAS_PATH,
+    ALMACEN_PATH,
+    BASE_SQLITE_PATH,
+]
+
+PUNTERO = PUBLICADO_PATH / "actual.json"
+# Un solo proceso escribe en utils/ a la vez
+BLOQUEO_ESCRITURA = PUBLICADO_PATH / ".escritura.lock"
+# Los pedidos de actualizacion que llegan juntos se resuelven con una sola ingesta
+BLOQUEO_PEDIDOS = PUBLICADO_PATH / ".pedidos.lock"
+PEDIDOS = PUBLICADO_PATH / "pedidos.json"
+
+
+@contextmanager
+def bloqueo(ruta):
+    """Bloqueo entre procesos sobre un archivo; espera si otro proceso lo tiene.
+        El sistema lo libera solo si el proceso termina sin soltarlo."""
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    with open(ruta, mode="a+") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK deja de reintentar a los 10 segundos
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def bloqueo_escritura():
+    """Bloqueo que toma la ingesta mientras escribe en utils/ y publica"""
+    return bloqueo(BLOQUEO_ESCRITURA)
+
+
+def leer_json(ruta):
+    try:
+        with open(ruta, mode="r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def guardar_json(ruta, datos):
+    """Guarda el json reemplazando el anterior de una sola vez"""
+    temporal = ruta.with_name(f".tmp_{ruta.name}")
+    with open(temporal, mode="w", encoding="utf-8") as f:
+        json.dump(datos, f, indent=2, ensure_ascii=False)
+    os.replace(temporal, ruta)
+
+
+def version_actual():
+    """Devuelve el nombre de la version publicada, o None si todavia no se publico ninguna"""
+    version = leer_json(PUNTERO).get("version")
+    if version is None or not (PUBLICADO_PATH / version).is_dir():
+        return None
+    return version
+
+
+def carpeta_version(version):
+    """Carpeta con los datos de la version publicada; si es None (todavia no se publico
+        ninguna) es utils/"""
+    return UTILS_PATH if version is None else PUBLICADO_PATH / version
+
+
+def carpeta_actual():
+    """Carpeta con los datos publicados; si todavia no hay ninguna version es utils/"""
+    return carpeta_version(version_actual())
+
+
+def ruta(ruta_utils, carpeta=None):
+    """Devuelve la ruta que corresponde, en la version publicada, a un archivo de utils/.
+        Las rutas que no estan dentro de utils/ se devuelven igual. Quien lee varios archivos
+        de la misma version pasa su carpeta (ver carpeta_version), asi no mezcla archivos de
+        dos versiones si se publica otra mientras tanto."""
+    ruta_utils = Path(ruta_utils)
+    try:
+        relativa = ruta_utils.resolve().relative_to(UTILS_PATH)
+    except ValueError:
+        return ruta_utils
+    return (carpeta_actual() if carpeta is None else carpeta) / relativa
+
+
+def huella_publicable():
+    """Tamaño y fecha de modificacion de cada archivo que se publica (el contenido en los json,
+        que se reescriben en cada ingesta aunque no cambien), para saber si cambio algo desde
+        la ultima version"""
+    huella = {}
+    for origen in PUBLICADOS:
+        archivos = [origen] if origen.is_file() else sorted(origen.rglob("*")) if origen.is_dir() else []
+        for archivo in archivos:
+            relativa = archivo.relative_to(UTILS_PATH)
+            if archivo.is_file() and not any(parte.startswith(".") for parte in relativa.parts):
+                if archivo.suffix == ".json":
+                    huella[relativa.as_posix()] = manifiesto.hash_archivo(archivo)
+                else:
+                    estado = archivo.stat()
+                    huella[relativa.as_posix()] = [estado.st_size, estado.st_mtime_ns]
+    return huella
+
+
+def enlazar(origen, destino):
+    """Crea el destino como enlace al origen (o lo copia si el sistema no admite enlaces).
+        Las carpetas se recorren enteras salvo los temporales (que empiezan con '.')."""
+    if origen.is_dir():
+        destino.mkdir()
+        for hijo in origen.iterdir():
+            if not hijo.name.startswith("."):
+                enlazar(hijo, destino / hijo.name)
+        return
+    try:
+        os.link(origen, destino)
+    except OSError:
+        shutil.copy2(origen, destino)
+
+
+def publicar():
+    """Publica una version nueva con los archivos de utils/ que leen las paginas y cambia la
+        version actual. Se llama con el bloqueo de escritura tomado, al terminar la ingesta.
+        Si nada cambio desde la version actual no se publica otra. Se conservan las ultimas
+        VERSIONES_PUBLICADAS versiones para quien todavia este leyendo una anterior."""
+    actual = version_actual()
+    huella = huella_publicable()
+    if actual is not None and leer_json(PUNTERO).get("huella") == huella:
+        print(f"✅ Los datos publicados (version {actual}) ya estan al dia.")
+        return
+    numero = 1 if actual is None else int(actual.lstrip("v")) + 1
+    version = f"v{numero:06d}"
+
+    # Se arma en una carpeta temporal y se renombra entera
+    temporal = PUBLICADO_PATH / f".tmp_{version}"
+    if temporal.exists():
+        shutil.rmtree(temporal)
+    temporal.mkdir(parents=True)
+    for origen in PUBLICADOS:
+        if origen.exists():
+            enlazar(origen, temporal / origen.relative_to(UTILS_PATH))
+    os.replace(temporal, PUBLICADO_PATH / version)
+
+    guardar_json(PUNTERO, {"version": version, "fecha": time.time(), "huella": huella})
+    print(f"✅ Datos publicados como version {version}.")
+
+    versiones = sorted(p.name for p in PUBLICADO_PATH.iterdir() if p.is_dir() and p.name.startswith("v"))
+    for vieja in versiones[:-VERSIONES_PUBLICADAS]:
+        # En Windows puede fallar si alguien todavia tiene un archivo abierto; se borra la proxima vez
+        shutil.rmtree(PUBLICADO_PATH / vieja, ignore_errors=True)
+
+
+def actualizar_una_vez(construir):
+    """Ejecuta construir() (la ingesta) atendiendo los pedidos de actualizacion concurrentes:
+        si mientras se esperaba el turno otra ingesta empezo despues de este pedido y termino
+        bien, esa ya incluye los zips que habia al pedirlo y no se vuelve a ejecutar.
+
+    Returns:
+        bool: True si se ejecuto, False si el pedido se resolvio con otra ingesta
+    """
+    pedido = time.time()
+    with bloqueo(BLOQUEO_PEDIDOS):
+        # Inicio de la ultima ingesta que termino bien
+        if leer_json(PEDIDOS).get("inicio", 0) >= pedido:
+            print("✅ Otra actualizacion que empezo despues de este pedido ya publico los datos.")
+            return False
+        inicio = time.time()
+        construir()
+        guardar_json(PEDIDOS, {"inicio": inicio})
+    return True
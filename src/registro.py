@@ -0,0 +1,186 @@
+import sys
+from collections.abc import MutableMapping
+from operator import itemgetter
+
+class _Ausente:
+    """Marca de una clave que un registro no tiene (el lugar queda en la lista de valores)"""
+
+    __slots__ = ()
+
+    def __reduce__(self):
+        # Al pasar entre procesos se sigue usando la misma marca
+        return "_AUSENTE"
+
+    def __repr__(self):
+        return "<ausente>"
+
+
+_AUSENTE = _Ausente()
+
+
+class Encabezado:
+    """Columnas compartidas por todas las filas de un mismo txt. Cada registro guarda solo
+        sus valores en el orden del encabezado; las columnas que se agregan a un registro
+        (TIPO_HOGAR, CONDICION_LABORAL, ...) se suman al final y las ven todos."""
+
+    __slots__ = ("columnas", "posicion")
+
+    def __init__(self, columnas):
+        self.columnas = []
+        self.posicion = {}
+        for columna in columnas:
+            self.agregar(columna)
+
+    def agregar(self, columna):
+        """Devuelve la posicion de la columna, agregandola al final si no estaba"""
+        indice = self.posicion.get(columna)
+        if indice is None:
+            indice = self.posicion[columna] = len(self.columnas)
+            self.columnas.append(columna)
+        return indice
+
+    def selector(self, columnas):
+        """Devuelve una funcion que toma la lista de valores de un registro y devuelve la
+            tupla de valores de las columnas pedidas, o None si alguna no esta en el encabezado"""
+        if not all(columna in self.posicion for columna in columnas):
+            return None
+        posiciones = [self.posicion[columna] for columna in columnas]
+        if len(posiciones) == 1:
+            return lambda valores: (valores[posiciones[0]],)
+        return itemgetter(*posiciones)
+
+    def __len__(self):
+        return len(self.columnas)
+
+
+class Registro(MutableMapping):
+    """Fila de hogares o individuos que se usa como un diccionario pero guarda solo la lista
+        de valores; los nombres de las columnas estan una sola vez en el Encabezado."""
+
+    __slots__ = ("encabezado", "valores", "ausentes")
+
+    def __init__(self, encabezado, valores):
+        self.encabezado = encabezado
+        self.valores = valores
+        self.ausentes = 0
+
+    def __getitem__(self, clave):
+        try:
+            valor = self.valores[self.encabezado.posicion[clave]]
+        except (KeyError, IndexError):
+            raise KeyError(clave) from None
+        if valor is _AUSENTE:
+            raise KeyError(clave)
+        return valor
+
+    def get(self, clave, defecto=None):
+        try:
+            valor = self.valores[self.encabezado.posicion[clave]]
+        except (KeyError, IndexError):
+            return defecto
+        return defecto if valor is _AUSENTE else valor
+
+    def __contains__(self, clave):
+        return self.get(clave, _AUSENTE) is not _AUSENTE
+
+    def __setitem__(self, clave, valor):
+        indice = self.encabezado.posicion.get(clave)
+        if indice is None:
+            indice = self.encabezado.agregar(clave)
+        faltan = indice - len(self.valores)
+        if faltan >= 0:
+            # Columna que este registro todavia no tenia: se completan los lugares intermedios
+            if faltan:
+                self.valores.extend([_AUSENTE] * faltan)
+                self.ausentes += faltan
+            self.valores.append(valor)
+            return
+        if self.valores[indice] is _AUSENTE:
+            self.ausentes -= 1
+        self.valores[indice] = valor
+
+    def __delitem__(self, clave):
+        indice = self.encabezado.posicion.get(clave)
+        if indice is None or indice >= len(self.valores) or self.valores[indice] is _AUSENTE:
+            raise KeyError(clave)
+        self.valores[indice] = _AUSENTE
+        self.ausentes += 1
+
+    def __iter__(self):
+        columnas = self.encabezado.columnas
+        if not self.ausentes:
+            return iter(columnas[:len(self.valores)])
+        return (columnas[i] for i, valor in enumerate(self.valores) if valor is not _AUSENTE)
+
+    def __len__(self):
+        return len(self.valores) - self.ausentes
+
+    def __repr__(self):
+        return f"Registro({dict(self)!r})"
+
+    def __reduce__(self):
+        # Al pasar las filas entre procesos el encabezado se serializa una sola vez por lista
+        return _reconstruir, (self.encabezado, self.valores, self.ausentes)
+
+
+def tabla(filas):
+    """Devuelve (columnas, lista de valores por fila) si todas las filas son Registro de un
+        mismo encabezado sin claves borradas, para armar un DataFrame sin pasar por los
+        diccionarios. A las filas que no tienen las ultimas columnas se les completa con None.
+        Si no se puede devuelve None."""
+    filas = list(filas)
+    if not filas or filas[0].__class__ is not Registro:
+        return None
+    encabezado = filas[0].encabezado
+    cantidad = len(encabezado)
+    valores = []
+    for fila in filas:
+        if fila.__class__ is not Registro or fila.encabezado is not encabezado or fila.ausentes:
+            return None
+        faltan = cantidad - len(fila.valores)
+        valores.append(fila.valores + [None] * faltan if faltan else fila.valores)
+    return list(encabezado.columnas), valores
+
+
+def _reconstruir(encabezado, valores, ausentes):
+    registro = Registro(encabezado, valores)
+    registro.ausentes = ausentes
+    return registro
+
+
+def leer_registros(reader):
+    """Genera un Registro por fila de un csv.reader, como csv.DictReader pero con un solo
+        encabezado para todas las filas. Las columnas sin nombre (el ';' final de los txt del
+        INDEC) se descartan y los valores se internan, asi cada codigo repetido ("1", "-9",
+        "02", ...) es un unico string en memoria.
+
+    Args:
+        reader (csv.reader): lector ya abierto; la primera fila es el encabezado
+
+    Yields:
+        Registro: una fila del txt
+    """
+    nombres = next(reader, None)
+    if nombres is None:
+        return
+    encabezado = Encabezado(nombre for nombre in nombres if nombre)
+    posiciones = [i for i, nombre in enumerate(nombres) if nombre]
+    usar = None
+    if len(posiciones) != len(nombres):
+        usar = itemgetter(*posiciones) if len(posiciones) > 1 else (lambda fila: (fila[posiciones[0]],))
+    intern = sys.intern
+    for fila in reader:
+        if not fila:
+            continue
+        extra = None
+        if len(fila) != len(nombres):
+            # Igual que DictReader: lo que falta queda en None y lo que sobra va a la clave None
+            extra = fila[len(nombres):] or None
+            fila = fila[:len(nombres)] + [None] * (len(nombres) - len(fila))
+            valores = [intern(v) if v is not None else v for v in (usar(fila) if usar else fila)]
+        else:
+            valores = list(map(intern, usar(fila) if usar else fila))
+        registro = Registro(encabezado, valores)
+        if extra is not None:
+            registro[None] = extra
+        yield registro
@@ -0,0 +1,193 @@
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from utils.constantes import RENDIMIENTO_INGESTA, HISTORIAL_RENDIMIENTO, MEDIR_MEMORIA_INGESTA
+from src import publicacion
+
+
+# Informe de rendimiento de la ingesta: cada etapa (lectura de los zips, limpieza, cada funcion
+# de src/funciones, escritura de los csv, ...) se mide con medir() y, al terminar la corrida,
+# se guarda en rendimiento_ingesta.json junto con las corridas anteriores.
+# De cada etapa se registra el tiempo, el tiempo de CPU (del hilo que la ejecuta), las filas,
+# cuanto subio el pico de memoria del proceso (RSS) y, con MEDIR_MEMORIA_INGESTA, el pico de
+# memoria de Python por encima de la que habia al empezar (tracemalloc; hace la ingesta
+# varias veces mas lenta, por eso no se mide siempre). tracemalloc tiene un solo pico para
+# todo el proceso, asi que el de una etapa solo se registra si no tiene otras etapas adentro
+# ni corre al mismo tiempo que otra en otro hilo (como la escritura de hogares y la de
+# individuos); en esas queda vacio. Las corridas que no tenian nada que actualizar (las
+# revisiones de la vigilancia de la carpeta data) no se guardan.
+
+# {(etapa, entidad): {"llamadas", "tiempo", "cpu", "filas", "pico", "rss"}} de la corrida en curso
+mediciones = {}
+candado = threading.Lock()
+# Etapas que se estan midiendo en este proceso: {"hilo", "compartida"} de cada una
+abiertas = []
+# Si la corrida en curso no tenia zips nuevos, modificados ni quitados (ver sin_cambios)
+estado = {"sin_cambios": False}
+
+
+def pico_rss():
+    """Pico de memoria (RSS) del proceso en bytes, o None si no se puede medir"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico if sys.platform == "darwin" else pico * 1024  # Linux lo da en KB
+
+
+def agregar(etapa, entidad, medicion):
+    """Suma una medicion a la etapa (una etapa se mide una vez por zip o por entidad)"""
+    with candado:
+        total = mediciones.setdefault((etapa, entidad), {
+            "llamadas": 0, "tiempo": 0.0, "cpu": 0.0, "filas": 0, "pico": None, "rss": None,
+        })
+        total["llamadas"] += 1
+        total["tiempo"] += medicion["tiempo"]
+        total["cpu"] += medicion["cpu"]
+        total["filas"] += medicion["filas"]
+        for clave in ("pico", "rss"):
+            if medicion.get(clave) is not None:
+                total[clave] = max(total[clave] or 0, medicion[clave])
+
+
+@contextmanager
+def medir_bloque(medicion):
+    """Mide el tiempo, la CPU y la memoria del bloque y los deja en medicion. El pico de
+        memoria de Python solo se toma si ninguna otra etapa se mide mientras tanto: al empezar
+        otra (adentro o en otro hilo) las que estaban abiertas quedan sin pico."""
+    propia = {"hilo": threading.get_ident(), "compartida": True}
+    memoria = tracemalloc.is_tracing()
+    with candado:
+        if memoria and all(abierta["hilo"] == propia["hilo"] for abierta in abiertas):
+            # Las etapas que la contienen ya no tienen un pico solo suyo
+            propia["compartida"] = False
+            tracemalloc.reset_peak()
+            memoria_inicial = tracemalloc.get_traced_memory()[0]
+        for abierta in abiertas:
+            abierta["compartida"] = True
+        abiertas.append(propia)
+    rss_inicial = pico_rss()
+    inicio, cpu = time.perf_counter(), time.thread_time()
+    try:
+        yield medicion
+    finally:
+        medicion["tiempo"] = time.perf_counter() - inicio
+        medicion["cpu"] = time.thread_time() - cpu
+        if rss_inicial is not None:
+            medicion["rss"] = pico_rss() - rss_inicial
+        with candado:
+            abiertas[:] = [abierta for abierta in abiertas if abierta is not propia]
+            if not propia["compartida"]:
+                medicion["pico"] = max(tracemalloc.get_traced_memory()[1] - memoria_inicial, 0)
+
+
+@contextmanager
+def medir(etapa, entidad=None, filas=0):
+    """Mide el bloque como una ejecucion de la etapa. Devuelve la medicion, para completar
+        las filas cuando se conocen al final (medicion["filas"] = ...)."""
+    medicion = {"filas": filas}
+    try:
+        with medir_bloque(medicion):
+            yield medicion
+    finally:
+        agregar(etapa, entidad, medicion)
+
+
+def medir_funcion(funcion, *args):
+    """Ejecuta funcion(*args) midiendola y devuelve (resultado, medicion). Sirve para las
+        etapas que corren en otro proceso: la medicion se suma despues con agregar()."""
+    iniciar_memoria = MEDIR_MEMORIA_INGESTA and not tracemalloc.is_tracing()
+    if iniciar_memoria:
+        tracemalloc.start()
+    try:
+        medicion = {"filas": 0}
+        with medir_bloque(medicion):
+            resultado = funcion(*args)
+    finally:
+        if iniciar_memoria:
+            tracemalloc.stop()
+    return resultado, medicion
+
+
+def sin_cambios():
+    """Marca la corrida en curso como una que no tenia nada que actualizar, para no guardarla"""
+    estado["sin_cambios"] = True
+
+
+def armar_informe(inicio, tiempo, cpu, completa):
+    etapas = []
+    for (etapa, entidad), datos in mediciones.items():
+        etapas.append({
+            "etapa": etapa,
+            "entidad": entidad,
+            "llamadas": datos["llamadas"],
+            "tiempo": round(datos["tiempo"], 4),
+            "cpu": round(datos["cpu"], 4),
+            "filas": datos["filas"],
+            "filas_por_segundo": round(datos["filas"] / datos["tiempo"]) if datos["filas"] and datos["tiempo"] > 0 else None,
+            "pico_mb": round(datos["pico"] / 1024 ** 2, 2) if datos["pico"] is not None else None,
+            "aumento_rss_mb": round(datos["rss"] / 1024 ** 2, 2) if datos["rss"] is not None else None,
+        })
+    return {
+        "inicio": inicio,
+        "tiempo": round(tiempo, 3),
+        "cpu": round(cpu, 3),
+        "completa": completa,
+        "memoria_medida": MEDIR_MEMORIA_INGESTA,
+        "pico_rss_mb": round(pico_rss() / 1024 ** 2, 1) if resource is not None else None,
+        "etapas": etapas,
+    }
+
+
+def guardar(informe):
+    """Agrega el informe al historial (se conservan las ultimas HISTORIAL_RENDIMIENTO corridas)"""
+    corridas = publicacion.leer_json(RENDIMIENTO_INGESTA).get("corridas", [])
+    corridas.append(informe)
+    publicacion.guardar_json(RENDIMIENTO_INGESTA, {"corridas": corridas[-HISTORIAL_RENDIMIENTO:]})
+
+
+def corridas():
+    """Informes guardados, del mas viejo al mas nuevo"""
+    return publicacion.leer_json(RENDIMIENTO_INGESTA).get("corridas", [])
+
+
+def mostrar(informe, cantidad=5):
+    """Muestra el tiempo total y las etapas que mas tardaron"""
+    print(f"📊 Ingesta en {informe['tiempo']:.1f} s (CPU del proceso {informe['cpu']:.1f} s). Etapas que mas tardaron:")
+    for datos in sorted(informe["etapas"], key=lambda d: d["tiempo"], reverse=True)[:cantidad]:
+        nombre = f"{datos['entidad']}/{datos['etapa']}" if datos["entidad"] else datos["etapa"]
+        velocidad = f", {datos['filas_por_segundo']:,} filas/s" if datos["filas_por_segundo"] else ""
+        pico = f", pico {datos['pico_mb']:.1f} MB" if datos["pico_mb"] is not None else ""
+        print(f"   {nombre}: {datos['tiempo']:.2f} s{velocidad}{pico}")
+
+
+@contextmanager
+def corrida():
+    """Mide una ingesta completa: empieza con las mediciones vacias y al terminar (bien o no)
+        guarda el informe en el historial, salvo que haya terminado sin nada que actualizar"""
+    with candado:
+        mediciones.clear()
+    estado["sin_cambios"] = False
+    iniciar_memoria = MEDIR_MEMORIA_INGESTA and not tracemalloc.is_tracing()
+    if iniciar_memoria:
+        tracemalloc.start()
+    inicio, reloj, cpu = time.time(), time.perf_counter(), time.process_time()
+    completa = False
+    try:
+        yield
+        completa = True
+    finally:
+        if iniciar_memoria:
+            tracemalloc.stop()
+        if not (completa and estado["sin_cambios"]):
+            informe = armar_informe(inicio, time.perf_counter() - reloj, time.process_time() - cpu, completa)
+            guardar(informe)
+            if completa:
+                mostrar(informe)
@@ -0,0 +1,179 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+# Agrego la raiz del proyecto al path para poder importar src
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.append(str(RAIZ))
+
+from utils.constantes import DATA_PATH, TRABAJOS_PATH
+from src import avance, ingesta, publicacion
+
+
+# El boton "Actualizar" no ejecuta la ingesta dentro de la sesion de Streamlit: inicia un
+# trabajo de fondo, un proceso aparte (python src/trabajos.py <id> <carpeta>) que la ejecuta y
+# va guardando su estado y su avance en trabajos/<id>.json (y lo que imprime en trabajos/<id>.log).
+# La pagina lo consulta cada segundo, asi ni esa sesion ni las demas quedan esperando.
+# Para cancelarlo se crea trabajos/<id>.cancelar: el trabajo lo ve en el proximo paso que
+# informa y termina sin publicar. Los zips ya procesados quedan guardados (ver src/etapas.py)
+# y la proxima actualizacion no los vuelve a procesar.
+
+EN_CURSO = "en curso"
+TERMINADO = "terminado"
+CANCELADO = "cancelado"
+ERROR = "error"
+
+LATIDO = 2  # Segundos entre escrituras del estado mientras el trabajo corre
+SIN_LATIDO = 30  # Si el estado no se actualiza en este tiempo es que el proceso se corto
+TRABAJOS_GUARDADOS = 20  # Trabajos anteriores que se conservan en la carpeta
+# Un solo trabajo a la vez: si se pide otro mientras corre uno se devuelve ese
+BLOQUEO_TRABAJOS = TRABAJOS_PATH / ".trabajos.lock"
+
+
+class Cancelado(Exception):
+    """Se pidio cancelar el trabajo"""
+
+
+def ruta(id_trabajo):
+    return TRABAJOS_PATH / f"{id_trabajo}.json"
+
+
+def ruta_salida(id_trabajo):
+    return TRABAJOS_PATH / f"{id_trabajo}.log"
+
+
+def ruta_cancelar(id_trabajo):
+    return TRABAJOS_PATH / f"{id_trabajo}.cancelar"
+
+
+def leer(id_trabajo):
+    """Devuelve el estado del trabajo ({} si no existe). Si sigue en curso pero el proceso dejo
+        de actualizarlo (se corto la luz, se lo mato) se devuelve como error."""
+    trabajo = publicacion.leer_json(ruta(id_trabajo))
+    if trabajo.get("estado") == EN_CURSO and time.time() - trabajo["actualizado"] > SIN_LATIDO:
+        trabajo["estado"] = ERROR
+        trabajo["error"] = "El proceso de la actualizacion se interrumpio."
+    return trabajo
+
+
+def ids_trabajos():
+    """Ids de los trabajos guardados, del mas viejo al mas nuevo"""
+    if not TRABAJOS_PATH.exists():
+        return []
+    return sorted(archivo.stem for archivo in TRABAJOS_PATH.glob("*.json") if not archivo.name.startswith("."))
+
+
+def en_curso():
+    """Devuelve el id del trabajo que esta corriendo, o None"""
+    for id_trabajo in reversed(ids_trabajos()):
+        if leer(id_trabajo).get("estado") == EN_CURSO:
+            return id_trabajo
+    return None
+
+
+def borrar_anteriores():
+    """Borra los archivos de los trabajos terminados mas viejos"""
+    for id_trabajo in ids_trabajos()[:-TRABAJOS_GUARDADOS]:
+        if leer(id_trabajo).get("estado") == EN_CURSO:
+            continue
+        for archivo in (ruta(id_trabajo), ruta_salida(id_trabajo), ruta_cancelar(id_trabajo)):
+            if archivo.exists():
+                os.remove(archivo)
+
+
+def iniciar(carpeta=DATA_PATH):
+    """Inicia la actualizacion en un proceso aparte y devuelve el id del trabajo sin esperar
+        a que termine. Si ya hay una corriendo devuelve el id de esa."""
+    with publicacion.bloqueo(BLOQUEO_TRABAJOS):
+        actual = en_curso()
+        if actual is not None:
+            return actual
+        id_trabajo = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        ahora = time.time()
+        publicacion.guardar_json(ruta(id_trabajo), {
+            "id": id_trabajo,
+            "estado": EN_CURSO,
+            "etapa": "esperando turno",
+            "avance": {},
+            "inicio": ahora,
+            "actualizado": ahora,
+        })
+        with open(ruta_salida(id_trabajo), mode="w", encoding="utf-8") as salida:
+            subprocess.Popen(
+                [sys.executable, "-u", str(Path(__file__).resolve()), id_trabajo, str(carpeta)],
+                cwd=RAIZ,
+                stdout=salida,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,  # Sigue aunque se cierre la sesion que lo inicio
+            )
+        borrar_anteriores()
+    return id_trabajo
+
+
+def cancelar(id_trabajo):
+    """Pide cancelar el trabajo; se detiene en el proximo paso que informe la ingesta"""
+    ruta_cancelar(id_trabajo).touch()
+
+
+def salida(id_trabajo, lineas=20):
+    """Ultimas lineas que imprimio el trabajo"""
+    if not ruta_salida(id_trabajo).exists():
+        return []
+    with open(ruta_salida(id_trabajo), mode="r", encoding="utf-8", errors="replace") as f:
+        return f.read().splitlines()[-lineas:]
+
+
+def ejecutar(id_trabajo, carpeta=DATA_PATH):
+    """Cuerpo del proceso del trabajo: ejecuta la ingesta guardando el avance que informa
+        (ver src/avance.py) y, al terminar, el estado final y la version publicada"""
+    trabajo = publicacion.leer_json(ruta(id_trabajo))
+    trabajo["pid"] = os.getpid()
+    candado = threading.RLock()
+
+    def guardar():
+        with candado:
+            trabajo["actualizado"] = time.time()
+            publicacion.guardar_json(ruta(id_trabajo), trabajo)
+
+    def recibir(etapa, datos):
+        with candado:
+            trabajo["etapa"] = etapa
+            trabajo["avance"].setdefault(etapa, {}).update(datos)
+            guardar()
+        if ruta_cancelar(id_trabajo).exists():
+            raise Cancelado()
+
+    def latir(detener):
+        while not detener.wait(LATIDO):
+            guardar()
+
+    detener = threading.Event()
+    threading.Thread(target=latir, args=(detener,), name="latido_trabajo", daemon=True).start()
+    avance.receptores.append(recibir)
+    guardar()
+    try:
+        publicacion.actualizar_una_vez(lambda: ingesta.ejecutar(carpeta))
+        trabajo["estado"] = TERMINADO
+    except Cancelado:
+        print("⚠️ Actualizacion cancelada, no se publicaron datos nuevos.")
+        trabajo["estado"] = CANCELADO
+    except Exception as e:
+        print(f"⚠️ No se pudo actualizar: {e} ({type(e).__name__})")
+        trabajo["estado"] = ERROR
+        trabajo["error"] = f"{e} ({type(e).__name__})"
+    finally:
+        avance.receptores.remove(recibir)
+        detener.set()
+        trabajo["fin"] = time.time()
+        trabajo["version"] = publicacion.version_actual()
+        guardar()
+        if ruta_cancelar(id_trabajo).exists():
+            os.remove(ruta_cancelar(id_trabajo))
+
+
+if __name__ == "__main__":
+    ejecutar(sys.argv[1], Path(sys.argv[2]) if len(sys.argv) > 2 else DATA_PATH)
@@ -0,0 +1,112 @@
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Agrego la raiz del proyecto al path para poder importar src
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.constantes import DATA_PATH, INTERVALO_VIGILANCIA
+from src import manifiesto, publicacion, trabajos
+
+
+ESPERA_TRABAJO = 1  # Segundos entre consultas del estado del trabajo de fondo
+
+
+def estado_carpeta(carpeta):
+    """Devuelve {nombre_zip: (tamaño, modificado)} de los zips de la carpeta, con los mismos
+        datos que guarda el manifiesto de cada zip"""
+    estado = {}
+    if not os.path.isdir(carpeta):
+        return estado
+    for file in os.listdir(carpeta):
+        if file.endswith(".zip"):
+            datos = os.stat(Path(carpeta) / file)
+            estado[file] = (datos.st_size, datos.st_mtime)
+    return estado
+
+
+def estado_ingerido():
+    """Estado de la carpeta que ya cubre la ultima ingesta, segun el manifiesto. Si al empezar
+        a vigilar los zips son esos, no se vuelven a ingerir."""
+    return {
+        file: (huella["tamaño"], huella["modificado"])
+        for file, huella in manifiesto.leer_manifiesto()["zips"].items()
+    }
+
+
+def esperar(id_trabajo, detener=None):
+    """Espera a que termine el trabajo de fondo y devuelve su estado (si se deja de vigilar
+        antes, devuelve el estado que tenga: el trabajo sigue en su proceso)"""
+    detener = detener or threading.Event()
+    trabajo = trabajos.leer(id_trabajo)
+    while trabajo.get("estado") == trabajos.EN_CURSO and not detener.wait(ESPERA_TRABAJO):
+        trabajo = trabajos.leer(id_trabajo)
+    return trabajo
+
+
+def ingerir(carpeta, detener=None):
+    """Actualiza los csv con los zips nuevos o modificados de la carpeta y publica los datos,
+        con el mismo trabajo de fondo que inicia el boton "Actualizar" (ver src/trabajos.py).
+        Si ya hay uno en curso se espera a ese; si habia empezado antes de este pedido puede no
+        incluir estos zips, asi que al terminar se inicia otro.
+
+    Returns:
+        dict: estado final del trabajo (ver trabajos.leer)
+    """
+    pedido = time.time()
+    while True:
+        trabajo = esperar(trabajos.iniciar(carpeta), detener)
+        if trabajo.get("inicio", 0) >= pedido or (detener is not None and detener.is_set()):
+            return trabajo
+
+
+def vigilar(carpeta=DATA_PATH, al_publicar=None, intervalo=INTERVALO_VIGILANCIA, detener=None):
+    """Revisa la carpeta cada intervalo segundos y, cuando cambian los zips y se mantienen
+        iguales durante una revision (la copia termino), actualiza solo lo nuevo. Al empezar se
+        toman como ingeridos los zips del manifiesto, asi no se repite la ingesta cada vez que
+        se inicia el servidor. Si se publica una version nueva de los datos se llama a
+        al_publicar(version).
+
+    Args:
+        carpeta (Path): carpeta de los zips
+        al_publicar (funcion): recibe el nombre de la version publicada
+        intervalo (float): segundos entre revisiones
+        detener (threading.Event): si se activa, se deja de vigilar
+    """
+    detener = detener or threading.Event()
+    ingerido = estado_ingerido()
+    anterior = None
+    while not detener.is_set():
+        estado = estado_carpeta(carpeta)
+        if estado != ingerido and estado == anterior:
+            version = publicacion.version_actual()
+            # No se reintenta hasta que cambien los zips (por ejemplo si hay uno dañado)
+            try:
+                trabajo = ingerir(carpeta, detener)
+                if trabajo.get("estado") == trabajos.ERROR:
+                    print(f"⚠️ No se pudieron ingerir los zips nuevos: {trabajo.get('error', 'error desconocido')}")
+                elif trabajo.get("estado") == trabajos.CANCELADO:
+                    print("⚠️ Se cancelo la ingesta de los zips nuevos.")
+            except Exception as e:
+                print(f"⚠️ No se pudieron ingerir los zips nuevos: {e} ({type(e).__name__})")
+            ingerido = estado
+            nueva = publicacion.version_actual()
+            if al_publicar is not None and nueva is not None and nueva != version:
+                al_publicar(nueva)
+        anterior = estado
+        detener.wait(intervalo)
+
+
+def iniciar(carpeta=DATA_PATH, al_publicar=None, intervalo=INTERVALO_VIGILANCIA):
+    """Inicia vigilar() en un hilo de fondo y devuelve (hilo, evento para detenerlo)"""
+    detener = threading.Event()
+    hilo = threading.Thread(
+        target=vigilar,
+        args=(carpeta, al_publicar, intervalo, detener),
+        name="vigilancia_zips",
+        daemon=True,
+    )
+    hilo.start()
+    return hilo, detener
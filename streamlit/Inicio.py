@@ -8,7 +8,8 @@ project_root = Path(__file__).parent.parent  # Ajusta según niveles necesarios
 sys.path.append(str(project_root))
 
 from src import DataSet as dt
-from src import automatizar_jupyter as aj
+from src.funciones_streamlit.funciones_en_comun import iniciar_vigilancia
+from src.funciones_streamlit.actualizacion import mostrar_rendimiento, panel_actualizacion
 #from src.DataSet import año_trimestre
 #from src.automatizar_jupyter import rutas
 
@@ -23,6 +24,9 @@ os.makedirs(DATA_FOLDER, exist_ok=True)
 st.set_page_config(page_title='EPH Insight', layout='wide')
 st.title("EPH Insight")
 
+# Hilo de fondo que ingiere los zips nuevos de la carpeta (uno solo por servidor)
+iniciar_vigilancia()
+
 # Ruta relativa para los links
 PAGES_DIR = Path("pages")
 
@@ -66,16 +70,18 @@ with tab2:
     if uploaded_files:
         for uploaded_file in uploaded_files:
             # Guardar el archivo en la carpeta DATA_FOLDER
+            # Se escribe en un temporal (sin extension .zip) para que una actualizacion en curso no lo lea a medias
             file_path = os.path.join(DATA_FOLDER, uploaded_file.name)
-            with open(file_path, "wb") as f:
+            temporal = os.path.join(DATA_FOLDER, f".{uploaded_file.name}.parcial")
+            with open(temporal, "wb") as f:
                 f.write(uploaded_file.getbuffer())
+            os.replace(temporal, file_path)
             st.success(f"Archivo {uploaded_file.name} cargado correctamente.")
     st.markdown("[Descargar los Datos de la EPH aqui](https://www.indec.gob.ar/indec/web/Institucional-Indec-BasesDeDatos)")
-    if st.button("Actualizar"):
-        aj.rutas() 
-        st.cache_data.clear()  # limpia el caché global
-        st.session_state["datos_actualizados"] = True  
-        st.rerun()
+    # La actualizacion corre en segundo plano; no hace falta limpiar el cache: las paginas
+    # leen la version nueva apenas se publica
+    panel_actualizacion()
+    mostrar_rendimiento()
     st.divider()
     st.subheader("Verificación de Datos") 
     rango_fechas = dt.año_trimestre()
@@ -20,10 +20,6 @@ st.info("""**En esta sección se visualizará información relacionada a las car
 la población argentina según la EPH.**
 """)
 
-if st.session_state.get("datos_actualizados", False):
-    st.cache_data.clear()
-    st.session_state["datos_actualizados"] = False
-    
 #Creo el DataFrame
 df = ats.cargar_csv(INDIVIDUOS_CSV) #Cargo el DF con columnas que voy a usar
 
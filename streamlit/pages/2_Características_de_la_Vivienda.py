@@ -21,6 +21,7 @@ sys.path.append(os.path.abspath("../code"))
 # Importa los módulos locales con funciones personalizadas
 import src.funciones_streamlit.viviendas as viviendas
 import src.funciones_streamlit.funciones_en_comun as funciones_en_comun
+from src import proyeccion
 
 # Recarga los módulos por si fueron modificados sin reiniciar Streamlit
 reload(funciones_en_comun)
@@ -54,7 +55,8 @@ from src.funciones_streamlit.viviendas import (
 from utils.constantes import HOGARES_CSV
 
 # Determina las columnas necesarias para el DF, asi no se sobrecarga la memoria
-columnas_necesarias = ['ANO4','TRIMESTRE','PONDERA','AGLOMERADO','CONDICION_DE_HABITABILIDAD','IV1','IV3','IV9','IV12_3','II7']
+# (declaradas en src/proyeccion.py, asi tambien van en la proyeccion del dashboard)
+columnas_necesarias = proyeccion.columnas_de("vivienda", "hogares")
 
 # Crea el dataframe desde el CSV, cargando solo las columnas necesarias
 df_hogares = crear_dataframe(HOGARES_CSV,columnas_necesarias)
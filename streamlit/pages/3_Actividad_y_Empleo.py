@@ -12,6 +12,7 @@ sys.path.append(str(project_root))
 
 from datetime import datetime as dt
 import src.funciones_streamlit.empleo as emp
+from src import proyeccion
 from utils.constantes import (
     INDIVIDUOS_CSV,
     NIVEL_EDUCATIVO,
@@ -43,19 +44,7 @@ st.title("💼⚙️ Actividad y Empleo")
 st.info(
     "En esta sección se visualizará información relacionada a la actividad y empleo según la EPH."
 )
-if st.session_state.get("datos_actualizados", False):
-    st.cache_data.clear()  # fuerza recarga
-    st.session_state["datos_actualizados"] = False
-
-COLUMNAS_NECESARIAS = [
-    "ESTADO",
-    "NIVEL_ED",
-    "ANO4",
-    "TRIMESTRE",
-    "AGLOMERADO",
-    "PP04A",
-    "PONDERA",
-]
+COLUMNAS_NECESARIAS = proyeccion.columnas_de("empleo", "individuos")
 st.divider()
 # cargo datos
 df = crear_dataframe(INDIVIDUOS_CSV,COLUMNAS_NECESARIAS)
@@ -12,12 +12,13 @@ from utils.constantes import INDIVIDUOS_CSV
 
 from src.consultas.consulta_leer_escribir import calcular_porcentajes_lectura
 from src.consultas.ranking5 import ranking_aglomerados_nivel_sup
+from src import proyeccion
 from src.funciones_streamlit import educacion as ed
 from src.funciones_streamlit.funciones_en_comun import (
     selector_anios,
     selector_anio_trimestre,
-    filtrar_dataframe_por_anio_y_trim,
     crear_dataframe,
+    periodos_disponibles,
 )
 
 # ------------------------------------------------------------------------------------
@@ -32,18 +33,12 @@ st.info(
 )
 st.divider()
 
-if st.session_state.get("datos_actualizados", False):
-    st.cache_data.clear()
-    st.session_state["datos_actualizados"] = False
+columnas_necesarias = proyeccion.columnas_de("educacion", "individuos")
 
-columnas_necesarias = [
-        "ANO4", "TRIMESTRE", "CH06", "NIVEL_ED",
-        "PONDERA", "CODUSU", "NRO_HOGAR", "COMPONENTE",
-    ]
+# Solo los periodos disponibles, los individuos se cargan al elegir año o trimestre
+df_periodos = periodos_disponibles(INDIVIDUOS_CSV)
 
-df = crear_dataframe(INDIVIDUOS_CSV, columnas_necesarias)
-
-if df is None or not isinstance(df, pd.DataFrame) or df.empty:
+if df_periodos is None or not isinstance(df_periodos, pd.DataFrame) or df_periodos.empty:
     st.info("Los datos no están disponibles o no pudieron cargarse correctamente.")
     st.stop()
 
@@ -53,14 +48,16 @@ if df is None or not isinstance(df, pd.DataFrame) or df.empty:
 with st.container():
     st.subheader("📅 Resumen trimestral por nivel educativo")
 
-    anio, trimestre = selector_anio_trimestre(df, key="selector_1_6_1")
+    anio, trimestre = selector_anio_trimestre(df_periodos, key="selector_1_6_1")
 
     if anio in [None, "Seleccione un año..."]:
         st.info("Por favor seleccione un año.")
     elif trimestre in [None, "Seleccione un trimestre..."]:
         st.info("Por favor seleccione un trimestre.")
     else:
-        df_trimestral = filtrar_dataframe_por_anio_y_trim(df, anio, trimestre)
+        df_trimestral = crear_dataframe(
+            INDIVIDUOS_CSV, columnas_necesarias, periodos=[(int(anio), int(trimestre))]
+        )
 
         if df_trimestral is None or df_trimestral.empty:
             st.info("No hay datos disponibles para el año/trimestre seleccionado.")
@@ -83,10 +80,16 @@ st.divider()
 with st.container():
     st.subheader("📆 Nivel educativo más común por grupo etario")
 
-    anio_solo = selector_anios(df, key="selector_1_6_2")
+    anio_solo = selector_anios(df_periodos, key="selector_1_6_2")
 
     if anio_solo and anio_solo != "Seleccione un año...":
-        df_por_anio = df[df["ANO4"] == anio_solo].copy()
+        trimestres = df_periodos.loc[df_periodos["ANO4"] == anio_solo, "TRIMESTRE"]
+        df_por_anio = crear_dataframe(
+            INDIVIDUOS_CSV, columnas_necesarias,
+            periodos=[(int(anio_solo), int(t)) for t in trimestres]
+        )
+        if df_por_anio is None:
+            df_por_anio = pd.DataFrame()
         _, df_por_anio = ed.procesar_niveles_educativos(pd.DataFrame(), df_por_anio)
 
         orden_etario = ["20-30", "30-40", "40-50", "50-60", "+60"]
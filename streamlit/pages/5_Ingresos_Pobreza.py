@@ -8,9 +8,11 @@ import sys
 project_root = Path(__file__).parent.parent.parent
 sys.path.append(str(project_root))
 
+from src import proyeccion
 from src.funciones_streamlit.funciones_en_comun import (
     selector_anio_trimestre,
     crear_dataframe,
+    periodos_disponibles,
 )
 from src.funciones_streamlit.ingresos import (
     cargar_datos_canasta_basica,
@@ -46,21 +48,17 @@ st.divider()
 # Mostrar información de carga
 with st.spinner("Cargando datos..."):
     df_canasta = cargar_datos_canasta_basica()
-    
-    columnas_hogares = [
-        'ANO4', 'TRIMESTRE', 'CODUSU', 'NRO_HOGAR', 
-        'IX_TOT', 'PONDERA', 'AGLOMERADO', 'ITF'
-    ]
-    df_hogares = crear_dataframe(HOGARES_CSV, columnas=columnas_hogares)
+    # Solo los periodos disponibles, los hogares se cargan al elegir año y trimestre
+    df_periodos = periodos_disponibles(HOGARES_CSV)
 
-if df_canasta is None or df_hogares is None:
+if df_canasta is None or df_periodos is None:
     st.stop()
 
 # Selectores de filtros
 st.subheader("🔍 Selección de Período")
 
 # Usar la función común selector_anio_trimestre
-anio_seleccionado, trimestre_seleccionado = selector_anio_trimestre(df_hogares)
+anio_seleccionado, trimestre_seleccionado = selector_anio_trimestre(df_periodos)
 
 # Información sobre política de agregación
 with st.expander("ℹ️ Información sobre Cálculo", expanded=False):
@@ -81,6 +79,15 @@ if (anio_seleccionado not in ["Seleccione un año...", None] and
     anio_int = int(anio_seleccionado)
     trimestre_int = int(trimestre_seleccionado)
 
+    columnas_hogares = proyeccion.columnas_de("ingresos", "hogares")
+    with st.spinner("Cargando datos..."):
+        df_hogares = crear_dataframe(
+            HOGARES_CSV, columnas=columnas_hogares,
+            periodos=[(anio_int, trimestre_int)]
+        )
+    if df_hogares is None:
+        st.stop()
+
     st.subheader("📊 Resultados del Análisis")
 
     # Obtener valores de canasta básica usando SIEMPRE promedio
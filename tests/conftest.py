@@ -0,0 +1,103 @@
+import random
+import shutil
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+RAIZ = Path(__file__).resolve().parents[1]
+# Para las pruebas que importan src directamente (sin escribir nada en utils/)
+sys.path.insert(0, str(RAIZ))
+
+AGLOMERADOS = [2, 3, 4, 13, 32, 33, 93]
+COLUMNAS_HOGARES = ["CODUSU", "ANO4", "TRIMESTRE", "NRO_HOGAR", "REALIZADA", "REGION", "MAS_500", "AGLOMERADO",
+                    "PONDERA", "IV1", "IV2", "IV3", "IV4", "IV5", "IV6", "IV7", "IV8", "IV9", "IV10", "IV11",
+                    "IV12_1", "IV12_2", "IV12_3", "II1", "II2", "II7", "IX_TOT", "ITF", "IPCF"]
+COLUMNAS_INDIVIDUOS = ["CODUSU", "ANO4", "TRIMESTRE", "NRO_HOGAR", "COMPONENTE", "H15", "REGION", "MAS_500",
+                       "AGLOMERADO", "PONDERA", "CH04", "CH06", "CH09", "CH12", "CH15", "NIVEL_ED", "ESTADO",
+                       "CAT_OCUP", "CAT_INAC", "PP04A", "P21", "ITF"]
+
+
+def generar_zip(carpeta, año, trimestre, hogares=40, semilla=0):
+    """Escribe en la carpeta un zip de la EPH (EPH_usu_<t>_Trim_<año>_txt.zip) con datos al azar
+        pero repetibles: los txt de hogares y de individuos con las columnas que usa el proyecto.
+        Con otra semilla el zip del mismo periodo tiene otros datos (sirve para simular uno modificado)."""
+    azar = random.Random(f"{año}-{trimestre}-{semilla}")
+    hog, ind = [";".join(COLUMNAS_HOGARES)], [";".join(COLUMNAS_INDIVIDUOS)]
+    for i in range(hogares):
+        codusu = f"TQRMNO{azar.randint(0, 99999):05d}{i:04d}"
+        aglomerado = azar.choice(AGLOMERADOS)
+        pondera = azar.randint(50, 3000)
+        total = azar.randint(1, 7)
+        itf = str(azar.randint(0, 900000))
+        hog.append(";".join(map(str, [
+            codusu, año, trimestre, 1, 1, azar.choice([1, 40, 41, 42, 43, 44]), "S", aglomerado, pondera,
+            azar.randint(1, 6), azar.randint(1, 3), azar.randint(1, 3), azar.choice([1, 2, 5, 7, 9]), 1,
+            azar.randint(1, 3), azar.randint(1, 3), azar.randint(1, 2), azar.randint(1, 3), azar.randint(1, 2),
+            azar.randint(1, 2), 2, 2, azar.randint(1, 2), azar.choice([1, 2, 3, ""]), 1, azar.randint(1, 8),
+            total, itf, "1200",
+        ])))
+        for componente in range(1, total + 1):
+            ind.append(";".join(map(str, [
+                codusu, año, trimestre, 1, componente, 1, 40, "S", aglomerado, pondera, azar.randint(1, 2),
+                azar.randint(-1, 95), azar.randint(1, 2), azar.randint(1, 9), azar.randint(1, 5),
+                azar.randint(1, 7), azar.randint(0, 4), azar.choice([1, 2, 3, 4, 9, ""]), azar.randint(0, 7),
+                azar.choice(["1", "2", "3", ""]), azar.randint(0, 500000), itf,
+            ])))
+    carpeta = Path(carpeta)
+    carpeta.mkdir(parents=True, exist_ok=True)
+    ruta = carpeta / f"EPH_usu_{trimestre}_Trim_{año}_txt.zip"
+    sufijo = f"T{trimestre}{str(año)[2:]}"
+    with zipfile.ZipFile(ruta, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr(f"usu_hogar_{sufijo}.txt", "\r\n".join(hog) + "\r\n")
+        z.writestr(f"usu_individual_{sufijo}.txt", "\r\n".join(ind) + "\r\n")
+    return ruta
+
+
+@pytest.fixture
+def nuevo_proyecto(tmp_path):
+    """Devuelve una funcion que arma una copia del proyecto en tmp_path (src y utils sin datos
+        generados), asi la ingesta escribe su utils/ sin tocar el del repositorio."""
+    def armar(nombre="proyecto"):
+        destino = tmp_path / nombre
+        shutil.copytree(RAIZ / "src", destino / "src", ignore=shutil.ignore_patterns("__pycache__"))
+        (destino / "utils" / "data").mkdir(parents=True)
+        for archivo in ("__init__.py", "constantes.py"):
+            shutil.copy(RAIZ / "utils" / archivo, destino / "utils" / archivo)
+        for archivo in (RAIZ / "utils" / "data").iterdir():
+            if archivo.is_file() and archivo.suffix != ".zip":
+                shutil.copy(archivo, destino / "utils" / "data" / archivo.name)
+        return destino
+    return armar
+
+
+@pytest.fixture
+def proyecto(nuevo_proyecto):
+    return nuevo_proyecto()
+
+
+def correr(proyecto, codigo, entrada=None):
+    """Ejecuta codigo Python en otro proceso con la copia del proyecto como raiz (las constantes
+        de utils/constantes.py apuntan a ella). Devuelve el proceso terminado."""
+    return subprocess.run(
+        [sys.executable, "-c", f"import sys; sys.path.insert(0, {str(proyecto)!r})\n{codigo}"],
+        cwd=proyecto, input=entrada, capture_output=True, text=True, timeout=300,
+    )
+
+
+def ingerir(proyecto, carpeta, *opciones):
+    """Corre la ingesta del proyecto (python src/ingesta.py) sobre la carpeta de zips"""
+    proceso = subprocess.run(
+        [sys.executable, "src/ingesta.py", "--carpeta", str(carpeta), *opciones],
+        cwd=proyecto, capture_output=True, text=True, timeout=300,
+    )
+    assert proceso.returncode == 0, proceso.stdout + proceso.stderr
+    return proceso.stdout
+
+
+def leer_csv(proyecto, nombre):
+    """Lee un csv consolidado de utils/ como texto, igual que esta escrito"""
+    return pd.read_csv(Path(proyecto) / "utils" / f"{nombre}.csv", sep=";", dtype=str, keep_default_na=False)
@@ -0,0 +1,55 @@
+from conftest import generar_zip, ingerir, leer_csv
+from src import manifiesto
+
+PERIODOS = [(2023, 3), (2023, 4), (2024, 1)]
+
+
+def igual_a_carga_completa(proyecto, carpeta, completo):
+    """Compara los csv del proyecto con los de una carga desde cero de la misma carpeta.
+        ID_HOGAR no se compara: depende del orden en que se vieron los hogares."""
+    ingerir(completo, carpeta)
+    for nombre in ("HogaresTotal", "IndividuosTotal"):
+        incremental, desde_cero = leer_csv(proyecto, nombre), leer_csv(completo, nombre)
+        assert list(incremental.columns) == list(desde_cero.columns)
+        assert incremental.drop(columns="ID_HOGAR").equals(desde_cero.drop(columns="ID_HOGAR")), nombre
+
+        # El resumen que deja la ingesta es el mismo que sale de recorrer el csv entero
+        ruta = proyecto / "utils" / f"{nombre}.csv"
+        resumen = manifiesto.leer_resumen(ruta)
+        assert resumen is not None
+        estadisticas, ordenado = manifiesto.escanear_csv(ruta)
+        assert resumen["periodos"] == manifiesto.armar_resumen(ruta, estadisticas, ordenado)["periodos"]
+
+
+def test_agregar_modificar_y_quitar_igual_a_carga_completa(tmp_path, proyecto, nuevo_proyecto):
+    carpeta = tmp_path / "data"
+    for año, trimestre in PERIODOS:
+        generar_zip(carpeta, año, trimestre)
+    ingerir(proyecto, carpeta)
+
+    # Zip nuevo: se agrega al final del csv
+    generar_zip(carpeta, 2024, 2)
+    assert "Se agregaron" in ingerir(proyecto, carpeta)
+    igual_a_carga_completa(proyecto, carpeta, nuevo_proyecto("agregado"))
+
+    # Zip modificado: se reescribe solo su periodo
+    generar_zip(carpeta, 2023, 4, semilla=1)
+    assert "Se actualizaron 1 trimestres" in ingerir(proyecto, carpeta)
+    igual_a_carga_completa(proyecto, carpeta, nuevo_proyecto("modificado"))
+
+    # Zip quitado: sus filas salen del csv
+    (carpeta / "EPH_usu_1_Trim_2024_txt.zip").unlink()
+    assert "Se actualizaron 1 trimestres" in ingerir(proyecto, carpeta)
+    igual_a_carga_completa(proyecto, carpeta, nuevo_proyecto("quitado"))
+
+
+def test_sin_cambios_no_reescribe_los_csv(tmp_path, proyecto):
+    carpeta = tmp_path / "data"
+    for año, trimestre in PERIODOS:
+        generar_zip(carpeta, año, trimestre)
+    ingerir(proyecto, carpeta)
+    antes = {ruta.name: ruta.stat().st_mtime_ns for ruta in (proyecto / "utils").glob("*Total.csv")}
+
+    ingerir(proyecto, carpeta)
+    despues = {ruta.name: ruta.stat().st_mtime_ns for ruta in (proyecto / "utils").glob("*Total.csv")}
+    assert antes == despues
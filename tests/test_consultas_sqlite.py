@@ -0,0 +1,42 @@
+import json
+
+from conftest import correr, generar_zip, ingerir
+
+# Corre cada consulta y su version _sqlite y devuelve lo que retornan y lo que muestran
+CONSULTAS = """
+import builtins, contextlib, io, json, sys
+sys.path[:0] = ["src/consultas", "src/funciones"]
+import hog_insu, menor_des, porcentaje_inqui, ranking5
+
+def resultado(consulta, *argumentos):
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        devuelto = consulta(*argumentos)
+    return [repr(devuelto), salida.getvalue()]
+
+builtins.input = lambda *_: {anio!r}
+print(json.dumps({{
+    "menor_des": [resultado(menor_des.menor_des), resultado(menor_des.menor_des_sqlite)],
+    "porcentaje_inqui": [resultado(porcentaje_inqui.porcentaje_inqui),
+                         resultado(porcentaje_inqui.porcentaje_inqui_sqlite)],
+    "ranking5": [resultado(ranking5.ranking_aglomerados_nivel_sup),
+                 resultado(ranking5.ranking_aglomerados_nivel_sup_sqlite)],
+    "hog_insu": [resultado(hog_insu.hog_insu), resultado(hog_insu.hog_insu_sqlite, {anio!r})],
+}}))
+"""
+
+
+def test_consultas_sqlite_responden_lo_mismo(tmp_path, proyecto):
+    carpeta = tmp_path / "data"
+    for año, trimestre in [(2023, 3), (2023, 4), (2024, 1), (2024, 2)]:
+        generar_zip(carpeta, año, trimestre, hogares=120)
+    ingerir(proyecto, carpeta, "--sqlite")
+
+    # 2023 tiene cuarto trimestre y 2022 no esta cargado
+    for anio in ("2023", "2022"):
+        proceso = correr(proyecto, CONSULTAS.format(anio=anio))
+        assert proceso.returncode == 0, proceso.stdout + proceso.stderr
+        resultados = json.loads(proceso.stdout.splitlines()[-1])
+        for consulta, (python, sqlite) in resultados.items():
+            assert python[1], consulta
+            assert python == sqlite, consulta
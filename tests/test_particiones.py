@@ -0,0 +1,88 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import pytest
+
+from src.funciones_streamlit import particiones
+
+PERIODOS = [(2023, 3), (2023, 4), (2024, 1), (2024, 2)]
+
+
+@pytest.fixture
+def presupuesto(monkeypatch):
+    """Achica el cache de particiones a 64 KB y lo vacia antes y despues de la prueba"""
+    monkeypatch.setattr(particiones, "MEMORIA_PARTICIONES_MB", 1 / 16)
+    particiones.cache_particiones.clear()
+    yield particiones.MEMORIA_PARTICIONES_MB * 1024 * 1024
+    particiones.cache_particiones.clear()
+
+
+def cache_con(series):
+    cache = {"columnas": OrderedDict(), "bytes": 0, "candado": threading.Lock()}
+    for clave, serie in series.items():
+        cache["columnas"][clave] = serie
+        cache["bytes"] += particiones.tamaño(serie)
+    return cache
+
+
+def serie(filas):
+    return pd.Series(range(filas), dtype="int64")
+
+
+def test_descartar_frias_entra_en_el_presupuesto(presupuesto):
+    # 20 columnas de 8 KB cada una: el doble del presupuesto
+    cache = cache_con({("v1", "hogares", (2023, 3), f"C{i}"): serie(1000) for i in range(20)})
+    assert cache["bytes"] > presupuesto
+
+    particiones.descartar_frias(cache, en_uso=set())
+    assert cache["bytes"] <= presupuesto
+    assert cache["bytes"] == sum(particiones.tamaño(s) for s in cache["columnas"].values())
+    # Se descartan las usadas hace mas tiempo: quedan las ultimas
+    restantes = [clave[3] for clave in cache["columnas"]]
+    assert restantes == [f"C{i}" for i in range(20 - len(restantes), 20)]
+
+
+def test_descartar_frias_conserva_las_de_la_consulta_en_curso(presupuesto):
+    claves = [("v1", "hogares", (2023, 3), f"C{i}") for i in range(20)]
+    cache = cache_con({clave: serie(1000) for clave in claves})
+    # Las de la consulta en curso son las mas viejas y solas ya ocupan mas que el presupuesto
+    en_uso = set(claves[:10])
+
+    particiones.descartar_frias(cache, en_uso)
+    assert set(cache["columnas"]) == en_uso
+    assert cache["bytes"] == sum(particiones.tamaño(s) for s in cache["columnas"].values())
+
+
+def test_leer_no_pasa_del_presupuesto(presupuesto):
+    datos = {
+        periodo: pd.DataFrame({
+            "AGLOMERADO": range(indice, indice + 2000),
+            "PONDERA": range(2000),
+            "CH04": [i % 2 + 1 for i in range(2000)],
+        })
+        for indice, periodo in enumerate(PERIODOS)
+    }
+    pedidas = []
+
+    def leer_particion(columnas, periodo):
+        pedidas.append((periodo, tuple(columnas)))
+        return datos[periodo][columnas]
+
+    # Cada periodo ocupa 32 KB: los cuatro no entran juntos y en la segunda vuelta se releen
+    for _ in range(2):
+        for periodo in PERIODOS:
+            df = particiones.leer("individuos", ["AGLOMERADO", "PONDERA"], [periodo], "v1", leer_particion)
+            pd.testing.assert_frame_equal(df, datos[periodo][["AGLOMERADO", "PONDERA"]])
+            assert particiones.cache_particiones()["bytes"] <= presupuesto
+    assert len(pedidas) > len(PERIODOS)
+
+    # Varios periodos juntos, en el orden pedido
+    df = particiones.leer("individuos", ["CH04"], PERIODOS[:2], "v1", leer_particion)
+    esperado = pd.concat([datos[p][["CH04"]] for p in PERIODOS[:2]], ignore_index=True)
+    pd.testing.assert_frame_equal(df, esperado)
+
+    # Un periodo que sigue en el cache no se vuelve a leer
+    antes = len(pedidas)
+    particiones.leer("individuos", ["CH04"], PERIODOS[1:2], "v1", leer_particion)
+    assert len(pedidas) == antes
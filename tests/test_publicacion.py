@@ -0,0 +1,33 @@
+import json
+
+from conftest import generar_zip, ingerir
+
+
+def leer_puntero(proyecto):
+    with open(proyecto / "utils" / "publicado" / "actual.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_publicar_sin_cambios_no_crea_otra_version(tmp_path, proyecto):
+    carpeta = tmp_path / "data"
+    generar_zip(carpeta, 2023, 4)
+    generar_zip(carpeta, 2024, 1)
+    ingerir(proyecto, carpeta)
+    puntero = leer_puntero(proyecto)
+    assert puntero["version"] == "v000001"
+
+    # Los archivos publicados son enlaces a los de utils/, no copias
+    for nombre in ("HogaresTotal.csv", "IndividuosTotal.csv"):
+        publicado = proyecto / "utils" / "publicado" / "v000001" / nombre
+        assert publicado.stat().st_ino == (proyecto / "utils" / nombre).stat().st_ino
+
+    salida = ingerir(proyecto, carpeta)
+    assert "(version v000001) ya estan al dia" in salida
+    assert leer_puntero(proyecto) == puntero
+    versiones = sorted(p.name for p in (proyecto / "utils" / "publicado").iterdir() if p.is_dir())
+    assert versiones == ["v000001"]
+
+    # Con un zip nuevo si se publica otra version
+    generar_zip(carpeta, 2024, 2)
+    ingerir(proyecto, carpeta)
+    assert leer_puntero(proyecto)["version"] == "v000002"
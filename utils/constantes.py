@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 PROJECT_PATH = Path(__file__).parents[1].resolve() #Raiz del proyecto
@@ -13,6 +14,30 @@ HOGARES_CSV = UTILS_PATH / 'HogaresTotal.csv' #Archivo CSV de Hogares
 INDIVIDUOS_CSV = UTILS_PATH / 'IndividuosTotal.csv' #Archivo CSV de Individuos
 CANASTA_BASICA_CSV = DATA_PATH / "valores-canasta-basica-alimentos-canasta-basica-total-mensual-2016.csv" # Constantes específicas para ingresos
 
+#Ingesta
+MANIFIESTO_INGESTA = UTILS_PATH / 'manifiesto_ingesta.json' # Registro de los zips ya procesados
+IDS_HOGARES_CSV = UTILS_PATH / 'ids_hogares.csv' # Diccionario del ID_HOGAR entero a (CODUSU, NRO_HOGAR, ANO4, TRIMESTRE)
+PROCESOS_INGESTA = os.cpu_count() or 1 # Procesos usados para leer los zips en paralelo (1 = carga serial)
+GUARDAR_ALMACEN = False # Ademas de los csv guarda el dataset particionado por año y trimestre en parquet (opcional, requiere pyarrow)
+ALMACEN_PATH = UTILS_PATH / 'almacen' # Carpeta del dataset particionado
+GUARDAR_CACHE_COLUMNAS = False # Ademas de los csv guarda cada columna en un .npy para que Streamlit las abra sin parsear el csv (opcional)
+CACHE_COLUMNAS_PATH = UTILS_PATH / 'cache_columnas' # Carpeta de la cache de columnas
+GUARDAR_PROYECCION = False # Opcional: ademas de los csv completos guarda HogaresDashboard.csv e IndividuosDashboard.csv solo con las columnas que usan las paginas y consultas (ver src/proyeccion.py)
+GUARDAR_SQLITE = False # Ademas de los csv guarda una base SQLite indexada para las consultas _sqlite (ver src/base_sqlite.py); tambien se pide con python src/ingesta.py --sqlite
+BASE_SQLITE_PATH = UTILS_PATH / 'eph.sqlite' # Base SQLite con las tablas hogares e individuos
+GUARDAR_ETAPAS = True # Guarda la salida de cada etapa del procesamiento de cada zip para no recalcular las que no cambiaron (ver src/etapas.py)
+ETAPAS_PATH = UTILS_PATH / 'etapas' # Salidas de las etapas del procesamiento y el informe de la ultima ingesta
+PUBLICADO_PATH = UTILS_PATH / 'publicado' # Versiones publicadas de los datos que leen las paginas (ver src/publicacion.py)
+VERSIONES_PUBLICADAS = 2 # Versiones que se conservan para quien todavia este leyendo una anterior
+TRABAJOS_PATH = UTILS_PATH / 'trabajos' # Estado, avance y salida de las actualizaciones que se ejecutan en segundo plano (ver src/trabajos.py)
+RENDIMIENTO_INGESTA = UTILS_PATH / 'rendimiento_ingesta.json' # Tiempo, filas por segundo y memoria de cada etapa de las ultimas ingestas (ver src/rendimiento.py)
+HISTORIAL_RENDIMIENTO = 50 # Ingestas que se conservan en el informe de rendimiento
+MEDIR_MEMORIA_INGESTA = False # Mide el pico de memoria de Python de cada etapa con tracemalloc (hace la ingesta unas 10 veces mas lenta)
+VIGILAR_DATOS = True # Streamlit revisa en segundo plano la carpeta data e ingiere los zips nuevos sin esperar al boton "Actualizar"
+INTERVALO_VIGILANCIA = 10 # Segundos entre revisiones de la carpeta data
+MEMORIA_COMPARTIDA = False # Las paginas arman los DataFrames sobre la memoria compartida que carga python src/memoria_compartida.py, para varios procesos de Streamlit en el mismo equipo (ver src/memoria_compartida.py)
+MEMORIA_PARTICIONES_MB = 256 # Memoria maxima del cache de particiones (año, trimestre) que comparten las sesiones de Streamlit (ver src/funciones_streamlit/particiones.py)
+
 NOMBRES_AGLOMERADOS = {
     "2": "Gran La Plata",
     "3": "Bahía Blanca - Cerri",